@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 from app.api.v1.endpoints import (
-    etl_mis, quote, policy, sales, auth
+    etl_mis, quote, policy, sales, auth, admin
 )
 
 
@@ -36,4 +36,10 @@ router.include_router(
     auth.router,
     prefix="/auth",
     tags=["Auth"]
-)
\ No newline at end of file
+)
+
+router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["Admin"]
+)
@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Optional
+
+import anyio
+from fastapi import APIRouter, Depends, Query
+
+from app.core.dependencies import require_admin
+from app.db import sqlserver
+from app.services.etl_lease import active_leases
+from app.services.slow_query_log import slow_query_log
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow_queries")
+async def slowQueries(
+    limit: int = Query(100, ge=1, le=5_000),
+    fingerprint: Optional[str] = Query(None),
+    service_method: Optional[str] = Query(None),
+    request_id: Optional[str] = Query(None),
+    min_elapsed_ms: float = Query(0, ge=0),
+    since: Optional[datetime] = Query(None),
+):
+    # reads and parses up to (backups + 1) log files: off the event loop
+    entries = await anyio.to_thread.run_sync(lambda: slow_query_log.query(
+        limit=limit,
+        fingerprint=fingerprint,
+        service_method=service_method,
+        request_id=request_id,
+        min_elapsed_ms=min_elapsed_ms,
+        since=since,
+    ))
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "count": len(entries),
+        "entries": entries,
+    }
+
+
+@router.get("/slow_queries/summary")
+async def slowQueriesSummary(
+    since: Optional[datetime] = Query(None),
+    top: int = Query(20, ge=1, le=500),
+):
+    groups = await anyio.to_thread.run_sync(lambda: slow_query_log.summary(since=since, top=top))
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "groups": groups,
+    }
+
+
+@router.get("/read_replica")
+async def readReplicaStatus(refresh: bool = Query(False)):
+    """Where report reads are going and the replica's last measured lag."""
+    if sqlserver.mis_read is None:
+        return {"configured": False, "serving": "primary"}
+    return await anyio.to_thread.run_sync(lambda: sqlserver.mis_read.status(refresh=refresh))
+
+
+@router.get("/etl_leases")
+async def etlLeases():
+    """ETL leases in MIS; an expired one is reclaimed by the next run of that table."""
+    return {"leases": await anyio.to_thread.run_sync(active_leases)}
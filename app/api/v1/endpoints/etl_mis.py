@@ -1,27 +1,22 @@
 import asyncio
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, status
 import pandas as pd
 from datetime import date, timedelta
+from typing import List, Literal
 from sqlalchemy.engine import Engine
 from app.db.sqlserver import (
     get_mis_db_engine, get_uk_uts_engine,
     get_nz_uts_engine, get_au_uts_engine,
     get_at_uts_engine, get_de_uts_engine
 )
+from app.services.crm_dedup import dedupe_crm
 from app.services.etl import ETL
-from app.db.sql_server_queries.crm_query import CRM_Mkt_Query
+from app.services.etl_jobs import etl_jobs
+from app.services.etl_lease import etl_lease
+from app.services.etl_pipelines import CRM_PIPELINE, PIPELINES, build_regions
 
 import logging
 
-from app.db.sql_server_queries.au_nz_quote_query import AU_NZ_QUOTE_Query
-from app.db.sql_server_queries.uk_de_at_quote_query import UK_DE_AT_QUOTE_Query
-
-from app.db.sql_server_queries.au_nz_sales_query import AU_NZ_SALES_Query
-from app.db.sql_server_queries.uk_de_at_sales_query import UK_DE_AT_SALES_Query
-
-from app.db.sql_server_queries.au_nz_free_policy_query import AU_NZ_FREE_POLICY_Query
-from app.db.sql_server_queries.uk_de_at_free_policy_query import UK_DE_AT_FREE_POLICY_Query
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
@@ -31,6 +26,32 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def start_etl_job(
+    pipelines: List[str] = Query(default=list(PIPELINES)),
+    start_date: date = Query(default=date.today() - timedelta(days=365)),
+    end_date: date = Query(default=date.today()),
+):
+    """etl_route as a background job; poll GET /jobs/{job_id} for progress."""
+    job = etl_jobs.submit(pipelines, start_date, end_date, triggered_by="api")
+    return job.as_dict()
+
+
+@router.get("/jobs")
+async def list_etl_jobs(limit: int = Query(20, ge=1, le=500)):
+    return {"jobs": await etl_jobs.recent(limit)}
+
+
+@router.get("/jobs/{job_id}")
+async def get_etl_job(job_id: str):
+    return await etl_jobs.get(job_id)
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_etl_job(job_id: str):
+    return etl_jobs.cancel(job_id)
+
+
 @router.get("/etl_route")
 async def etl_route(
     nz_db: Engine = Depends(get_nz_uts_engine),
@@ -40,20 +61,25 @@ async def etl_route(
     at_db: Engine = Depends(get_at_uts_engine),
     de_db: Engine = Depends(get_de_uts_engine),
     start_date: date = Query(default=date.today() - timedelta(days=365)),
-    end_date: date = Query(default=date.today())
+    end_date: date = Query(default=date.today()),
+    stream: bool = Query(False),
+    lease_wait_seconds: int = Query(0, ge=0, le=3600),
 ):
     # Run the three ETL steps concurrently and await their results
     quote_task = await etl_quote(
         nz_db=nz_db, au_db=au_db, mis_db=mis_db, uk_db=uk_db,
-        at_db=at_db, de_db=de_db, start_date=start_date, end_date=end_date
+        at_db=at_db, de_db=de_db, start_date=start_date, end_date=end_date,
+        stream=stream, lease_wait_seconds=lease_wait_seconds,
     )
     sales_task = await etl_sales(
         nz_db=nz_db, au_db=au_db, mis_db=mis_db, uk_db=uk_db,
-        at_db=at_db, de_db=de_db, start_date=start_date, end_date=end_date
+        at_db=at_db, de_db=de_db, start_date=start_date, end_date=end_date,
+        stream=stream, lease_wait_seconds=lease_wait_seconds,
     )
     fp_task = await etl_free_policies(
         nz_db=nz_db, au_db=au_db, mis_db=mis_db, uk_db=uk_db,
-        at_db=at_db, de_db=de_db, start_date=start_date, end_date=end_date
+        at_db=at_db, de_db=de_db, start_date=start_date, end_date=end_date,
+        stream=stream, lease_wait_seconds=lease_wait_seconds,
     )
 
     # quote_res, sales_res, fp_res = await asyncio.gather(quote_task, sales_task, fp_task)
@@ -75,57 +101,68 @@ async def etl_quote(
     at_db: Engine = Depends(get_at_uts_engine),
     de_db: Engine = Depends(get_de_uts_engine),
     start_date: date = Query(default=date.today() - timedelta(days=365)),
-    end_date: date = Query(default=date.today())
+    end_date: date = Query(default=date.today()),
+    stream: bool = Query(False),
+    lease_wait_seconds: int = Query(0, ge=0, le=3600),
 ):
     logger.info('quote etl starts')
-    table_name = "Quote"
 
-    regions = [
-        {"country_code": "NZ", "country_name": "New Zealand", "engine": nz_db, "query":AU_NZ_QUOTE_Query},
-        {"country_code": "AU", "country_name": "Australia", "engine": au_db, "query":AU_NZ_QUOTE_Query},
-        {"country_code": "UK", "country_name": "United Kingdom", "engine": uk_db, "query":UK_DE_AT_QUOTE_Query},
-        {"country_code": "DE", "country_name": "Germany", "engine": de_db, "query":UK_DE_AT_QUOTE_Query},
-        {"country_code": "AT", "country_name": "Austria", "engine": at_db, "query":UK_DE_AT_QUOTE_Query},
-    ]
+    pipeline = PIPELINES["quote"]
+    regions = build_regions(pipeline, {
+        "NZ": nz_db, "AU": au_db, "UK": uk_db, "DE": de_db, "AT": at_db,
+    })
 
+    table_name = pipeline.table_name
     iso_start_date = start_date.isoformat()
     iso_end_date = end_date.isoformat()
 
-    async def extract_and_transform(region):
-        extracted_data = await ETL.extraction(
-            engine=region["engine"],
-            start_date=iso_start_date,
-            end_date=iso_end_date,
-            country_code=region["country_code"],
-            country_name=region["country_name"],
-            query=region["query"]
-        )
-        return await ETL.transform(
-            extracted_data,
-            [
-                'CreatedDate', 'QuoteStartDate', 'QuoteExpiryDate',
-                'PolicyStartDate', 'PolicyEndDate', 'PetBirthDate',
-                'ETLDateUploaded'
-            ]
+    cleanup_dates = list(pipeline.cleanup_dates)
+
+    # one run per table and date range (409, or wait up to lease_wait_seconds)
+    async with etl_lease(table_name, iso_start_date, iso_end_date, "api:etl_quote", lease_wait_seconds) as lease:
+        if stream:
+            return await ETL.stream_load(
+                regions, table_name, mis_db, iso_start_date, iso_end_date,
+                cleanup_dates, extraction_type="quote", lease=lease,
+            )
+
+        async def extract_and_transform(region):
+            extracted_data = await ETL.extraction(
+                engine=region["engine"],
+                start_date=iso_start_date,
+                end_date=iso_end_date,
+                country_code=region["country_code"],
+                country_name=region["country_name"],
+                query=region["query"],
+                table_name=table_name,
+            )
+            return await ETL.transform(
+                extracted_data,
+                cleanup_dates,
+                table_name=table_name,
+                region=region["country_code"],
+            )
+
+        tasks = [extract_and_transform(region) for region in regions]
+        all_transformed_data = await asyncio.gather(*tasks)
+
+        combined_data = ETL.combine(all_transformed_data)
+
+        logger.info(
+            f"Combined {len(combined_data)} rows from {', '.join([r['country_code'] for r in regions])}"  # noqa
         )
 
-    tasks = [extract_and_transform(region) for region in regions]
-    all_transformed_data = await asyncio.gather(*tasks)
+        # a run that lost its lease must not delete and insert on top of the new holder
+        lease.check()
+        load_msg = ETL.load(combined_data, table_name, mis_db, start_date=iso_start_date,
+                end_date=iso_end_date,)
 
-    combined_data = pd.concat(all_transformed_data, ignore_index=True)
-
-    logger.info(
-        f"Combined {len(combined_data)} rows from {', '.join([r['country_code'] for r in regions])}"  # noqa
-    )
-
-    load_msg = ETL.load(combined_data, table_name, mis_db, start_date=iso_start_date,
-            end_date=iso_end_date,)
-
-    return {
-        # "message": "ETL process completed successfully.",
-        "rows_loaded": len(combined_data),
-        "load_status": load_msg
-    }
+        return {
+            # "message": "ETL process completed successfully.",
+            "rows_loaded": len(combined_data),
+            "load_status": load_msg,
+            "memory_saved_bytes": combined_data.attrs.get("memory_saved_bytes", 0),
+        }
 
 
 
@@ -138,54 +175,69 @@ async def etl_sales(
     at_db: Engine = Depends(get_at_uts_engine),
     de_db: Engine = Depends(get_de_uts_engine),
     start_date: date = Query(default=date.today() - timedelta(days=365)),
-    end_date: date = Query(default=date.today())
+    end_date: date = Query(default=date.today()),
+    stream: bool = Query(False),
+    lease_wait_seconds: int = Query(0, ge=0, le=3600),
 ):
     logger.info('Sales etl starts')
-    table_name = "Sales"
 
-    regions = [
-        {"country_code": "NZ", "country_name": "New Zealand", "engine": nz_db, "query":AU_NZ_SALES_Query},
-        {"country_code": "AU", "country_name": "Australia", "engine": au_db, "query":AU_NZ_SALES_Query},
-        {"country_code": "UK", "country_name": "United Kingdom", "engine": uk_db, "query":UK_DE_AT_SALES_Query},
-        {"country_code": "DE", "country_name": "Germany", "engine": de_db, "query":UK_DE_AT_SALES_Query},
-        {"country_code": "AT", "country_name": "Austria", "engine": at_db, "query":UK_DE_AT_SALES_Query},
-    ]
+    pipeline = PIPELINES["sales"]
+    regions = build_regions(pipeline, {
+        "NZ": nz_db, "AU": au_db, "UK": uk_db, "DE": de_db, "AT": at_db,
+    })
 
+    table_name = pipeline.table_name
     iso_start_date = start_date.isoformat()
     iso_end_date = end_date.isoformat()
 
-    async def extract_and_transform(region):
-        extracted_data = await ETL.extraction(
-            engine=region["engine"],
-            start_date=iso_start_date,
-            end_date=iso_end_date,
-            country_code=region["country_code"],
-            country_name=region["country_name"],
-            query=region["query"],
-            extraction_type = "sales"
+    cleanup_dates = list(pipeline.cleanup_dates)
+
+    # one run per table and date range (409, or wait up to lease_wait_seconds)
+    async with etl_lease(table_name, iso_start_date, iso_end_date, "api:etl_sales", lease_wait_seconds) as lease:
+        if stream:
+            return await ETL.stream_load(
+                regions, table_name, mis_db, iso_start_date, iso_end_date,
+                cleanup_dates, extraction_type="sales", lease=lease,
+            )
+
+        async def extract_and_transform(region):
+            extracted_data = await ETL.extraction(
+                engine=region["engine"],
+                start_date=iso_start_date,
+                end_date=iso_end_date,
+                country_code=region["country_code"],
+                country_name=region["country_name"],
+                query=region["query"],
+                extraction_type = "sales",
+                table_name=table_name,
+            )
+            return await ETL.transform(
+                extracted_data,
+                cleanup_dates,
+                table_name=table_name,
+                region=region["country_code"],
+            )
+
+        tasks = [extract_and_transform(region) for region in regions]
+        all_transformed_data = await asyncio.gather(*tasks)
+
+        combined_data = ETL.combine(all_transformed_data)
+
+        logger.info(
+            f"Combined {len(combined_data)} rows from {', '.join([r['country_code'] for r in regions])}"  # noqa
         )
-        return await ETL.transform(
-            extracted_data,
-            ['CreatedDate', 'ActualStartDate', 'ETLDateUploaded', 'QuoteCreatedDate']
-        )
-
-    tasks = [extract_and_transform(region) for region in regions]
-    all_transformed_data = await asyncio.gather(*tasks)
 
-    combined_data = pd.concat(all_transformed_data, ignore_index=True)
+        # a run that lost its lease must not delete and insert on top of the new holder
+        lease.check()
+        load_msg = ETL.load(combined_data, table_name, mis_db, start_date=iso_start_date,
+                end_date=iso_end_date,)
 
-    logger.info(
-        f"Combined {len(combined_data)} rows from {', '.join([r['country_code'] for r in regions])}"  # noqa
-    )
-
-    load_msg = ETL.load(combined_data, table_name, mis_db, start_date=iso_start_date,
-            end_date=iso_end_date,)
-
-    return {
-        # "message": "ETL process completed successfully.",
-        "rows_loaded": len(combined_data),
-        "load_status": load_msg
-    }
+        return {
+            # "message": "ETL process completed successfully.",
+            "rows_loaded": len(combined_data),
+            "load_status": load_msg,
+            "memory_saved_bytes": combined_data.attrs.get("memory_saved_bytes", 0),
+        }
 
 
 @router.get("/etl_free_policies")
@@ -197,51 +249,140 @@ async def etl_free_policies(
     at_db: Engine = Depends(get_at_uts_engine),
     de_db: Engine = Depends(get_de_uts_engine),
     start_date: date = Query(default=date.today() - timedelta(days=365)),
-    end_date: date = Query(default=date.today())
+    end_date: date = Query(default=date.today()),
+    stream: bool = Query(False),
+    lease_wait_seconds: int = Query(0, ge=0, le=3600),
 ):
     logger.info('FreePolicy etl starts')
-    table_name = "FreePolicySales"
 
-    regions = [
-        {"country_code": "NZ", "country_name": "New Zealand", "engine": nz_db, "query":AU_NZ_FREE_POLICY_Query},
-        {"country_code": "AU", "country_name": "Australia", "engine": au_db, "query":AU_NZ_FREE_POLICY_Query},
-        {"country_code": "UK", "country_name": "United Kingdom", "engine": uk_db, "query":UK_DE_AT_FREE_POLICY_Query},
-        {"country_code": "DE", "country_name": "Germany", "engine": de_db, "query":UK_DE_AT_FREE_POLICY_Query},
-        {"country_code": "AT", "country_name": "Austria", "engine": at_db, "query":UK_DE_AT_FREE_POLICY_Query},
-    ]
+    pipeline = PIPELINES["free_policies"]
+    regions = build_regions(pipeline, {
+        "NZ": nz_db, "AU": au_db, "UK": uk_db, "DE": de_db, "AT": at_db,
+    })
 
+    table_name = pipeline.table_name
     iso_start_date = start_date.isoformat()
     iso_end_date = end_date.isoformat()
 
-    async def extract_and_transform(region):
-        extracted_data = await ETL.extraction(
-            engine=region["engine"],
-            start_date=iso_start_date,
-            end_date=iso_end_date,
-            country_code=region["country_code"],
-            country_name=region["country_name"],
-            query=region["query"],
-            extraction_type = "sales"
-        )
-        return await ETL.transform(
-            extracted_data,
-            ['CreatedDate', 'ETLDateUploaded']
+    cleanup_dates = list(pipeline.cleanup_dates)
+
+    # one run per table and date range (409, or wait up to lease_wait_seconds)
+    async with etl_lease(table_name, iso_start_date, iso_end_date, "api:etl_free_policies", lease_wait_seconds) as lease:
+        if stream:
+            return await ETL.stream_load(
+                regions, table_name, mis_db, iso_start_date, iso_end_date,
+                cleanup_dates, extraction_type="sales", lease=lease,
+            )
+
+        async def extract_and_transform(region):
+            extracted_data = await ETL.extraction(
+                engine=region["engine"],
+                start_date=iso_start_date,
+                end_date=iso_end_date,
+                country_code=region["country_code"],
+                country_name=region["country_name"],
+                query=region["query"],
+                extraction_type = "sales",
+                table_name=table_name,
+            )
+            return await ETL.transform(
+                extracted_data,
+                cleanup_dates,
+                table_name=table_name,
+                region=region["country_code"],
+            )
+
+        tasks = [extract_and_transform(region) for region in regions]
+        all_transformed_data = await asyncio.gather(*tasks)
+
+        combined_data = ETL.combine(all_transformed_data)
+
+        logger.info(
+            f"Combined {len(combined_data)} rows from {', '.join([r['country_code'] for r in regions])}"  # noqa
         )
 
-    tasks = [extract_and_transform(region) for region in regions]
-    all_transformed_data = await asyncio.gather(*tasks)
+        # a run that lost its lease must not delete and insert on top of the new holder
+        lease.check()
+        load_msg = ETL.load(combined_data, table_name, mis_db, start_date=iso_start_date,
+                end_date=iso_end_date,)
 
-    combined_data = pd.concat(all_transformed_data, ignore_index=True)
+        return {
+            # "message": "ETL process completed successfully.",
+            "rows_loaded": len(combined_data),
+            "load_status": load_msg,
+            "memory_saved_bytes": combined_data.attrs.get("memory_saved_bytes", 0),
+        }
 
-    logger.info(
-        f"Combined {len(combined_data)} rows from {', '.join([r['country_code'] for r in regions])}"  # noqa
-    )
 
-    load_msg = ETL.load(combined_data, table_name, mis_db, start_date=iso_start_date,
-            end_date=iso_end_date,)
+@router.get("/etl_crm")
+async def etl_crm(
+    nz_db: Engine = Depends(get_nz_uts_engine),
+    au_db: Engine = Depends(get_au_uts_engine),
+    mis_db: Engine = Depends(get_mis_db_engine),
+    uk_db: Engine = Depends(get_uk_uts_engine),
+    at_db: Engine = Depends(get_at_uts_engine),
+    de_db: Engine = Depends(get_de_uts_engine),
+    start_date: date = Query(default=date.today() - timedelta(days=365)),
+    end_date: date = Query(default=date.today()),
+    shard: Literal["none", "week", "month"] = Query("month"),
+    lease_wait_seconds: int = Query(0, ge=0, le=3600),
+):
+    """
+    CRM marketing list for quotes with a QuoteDate in [start_date, end_date].
+    Each region is read in QuoteDate shards, merged and deduplicated per pet
+    and policy (app.services.crm_dedup) before the window is replaced.
+    """
+    logger.info('CRM etl starts')
+
+    pipeline = CRM_PIPELINE
+    regions = build_regions(pipeline, {
+        "NZ": nz_db, "AU": au_db, "UK": uk_db, "DE": de_db, "AT": at_db,
+    })
+
+    table_name = pipeline.table_name
+    iso_start_date = start_date.isoformat()
+    iso_end_date = end_date.isoformat()
+
+    cleanup_dates = list(pipeline.cleanup_dates)
+
+    # one run per table and date range (409, or wait up to lease_wait_seconds)
+    async with etl_lease(table_name, iso_start_date, iso_end_date, "api:etl_crm", lease_wait_seconds) as lease:
+
+        async def extract_and_transform(region):
+            candidates = await ETL.extraction(
+                engine=region["engine"],
+                start_date=iso_start_date,
+                end_date=iso_end_date,
+                country_code=region["country_code"],
+                country_name=region["country_name"],
+                query=region["query"],
+                extraction_type="crm",
+                table_name=table_name,
+                shard=shard,
+            )
+            return await ETL.transform(
+                dedupe_crm(candidates),
+                cleanup_dates,
+                table_name=table_name,
+                region=region["country_code"],
+            )
+
+        tasks = [extract_and_transform(region) for region in regions]
+        all_transformed_data = await asyncio.gather(*tasks)
+
+        combined_data = ETL.combine(all_transformed_data)
+
+        logger.info(
+            f"Combined {len(combined_data)} rows from {', '.join([r['country_code'] for r in regions])}"  # noqa
+        )
 
-    return {
-        # "message": "ETL process completed successfully.",
-        "rows_loaded": len(combined_data),
-        "load_status": load_msg
-    }
+        # a run that lost its lease must not delete and insert on top of the new holder
+        lease.check()
+        load_msg = ETL.load(combined_data, table_name, mis_db, start_date=iso_start_date,
+                end_date=iso_end_date, date_column=pipeline.date_column)
+
+        return {
+            "rows_loaded": len(combined_data),
+            "load_status": load_msg,
+            "memory_saved_bytes": combined_data.attrs.get("memory_saved_bytes", 0),
+        }
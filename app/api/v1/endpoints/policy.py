@@ -1,16 +1,21 @@
 from fastapi import APIRouter, Depends, Query
 from datetime import date
 from sqlalchemy.engine import Engine
-from app.db.sqlserver import get_mis_db_engine
+from app.db.replica import get_report_engine
+from app.db.sqlserver import get_mis_read_engine
 from app.services.policy import Policy
 from app.services.policy_stream import PolicyStream
 from enum import Enum
 
 from dateutil.relativedelta import relativedelta
-from app.core.dependencies import require_authentication
+from app.core.dependencies import conditional_get, require_authentication
 
 
-router = APIRouter(dependencies=[Depends(require_authentication)])
+router = APIRouter(dependencies=[
+    Depends(require_authentication),
+    # ETag/304 keyed on the data versions of the tables these endpoints read
+    Depends(conditional_get("CRM", "Sales", "FreePolicySales")),
+])
 
 
 class PolicyStatus(str, Enum):
@@ -32,7 +37,7 @@ class FreePolicy(str, Enum):
 
 @router.get("/policy_summary")
 async def PolicySummary(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1) - relativedelta(months=12)),
     end_date: date = Query(default_factory=date.today),
     regions: str = Query(default="all"),
@@ -58,7 +63,7 @@ async def PolicySummary(
 
 @router.get("/policy_data")
 async def PolicyData(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1) - relativedelta(months=12)),
     end_date: date = Query(default_factory=date.today),
     regions: str = Query(default="all"),
@@ -70,7 +75,10 @@ async def PolicyData(
     filename: str = Query("Policy.csv"),
     historical_months: int = 7,    
     brands: str = Query(default="all"),
-    pet_types: str = Query(default="all")
+    pet_types: str = Query(default="all"),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
     if download:
         return await PolicyStream.stream_policy_status_raw_csv(
@@ -102,7 +110,9 @@ async def PolicyData(
         order="DESC",
         months=historical_months,        
         brands=brands,
-        pet_types=pet_types
-
+        pet_types=pet_types,
+        include_total=include_total,
+        approximate_total=approximate_total,
+        stream=stream,
     )
     return result
@@ -1,22 +1,27 @@
 from fastapi import APIRouter, Depends, Query
 from datetime import date
 from sqlalchemy.engine import Engine
-from app.db.sqlserver import get_mis_db_engine
+from app.db.replica import get_report_engine
+from app.db.sqlserver import get_mis_read_engine
 from app.services.quote import Quote
 from app.services.quote_stream import QuoteStream
 from dateutil.relativedelta import relativedelta
 
 from app.core.enums import ReportTypeEnum, QuoteStatusEnum
-from app.core.dependencies import require_authentication
+from app.core.dependencies import conditional_get, require_authentication
 
-router = APIRouter(dependencies=[Depends(require_authentication)])
+router = APIRouter(dependencies=[
+    Depends(require_authentication),
+    # ETag/304 keyed on the data versions of the tables these endpoints read
+    Depends(conditional_get("Quote")),
+])
 
 
 
 
 @router.get("/quote_summary")
 async def quoteSummary(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -36,7 +41,7 @@ async def quoteSummary(
 
 @router.get("/quote_data")
 async def quoteData(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -46,7 +51,10 @@ async def quoteData(
     filename: str = Query("quote.csv"),    
     brands: str = Query(default="all"),
     pet_types: str = Query(default="all"),
-    reportType: ReportTypeEnum = Query(default=ReportTypeEnum.TOTAL_QUOTES)
+    reportType: ReportTypeEnum = Query(default=ReportTypeEnum.TOTAL_QUOTES),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
     if download:
         return await QuoteStream.stream_quote_csv(
@@ -69,14 +77,17 @@ async def quoteData(
         limit=limit,
         brands=brands,
         pet_types=pet_types,
-        report_type=reportType        
+        report_type=reportType,
+        include_total=include_total,
+        approximate_total=approximate_total,
+        stream=stream,
     )
     return result
 
 
 @router.get("/quote_summary_by_pet_type")
 async def quoteSummaryByPetType(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -96,7 +107,7 @@ async def quoteSummaryByPetType(
 
 @router.get("/quote_data_by_pet_type")
 async def quoteDataByPetType(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -107,7 +118,10 @@ async def quoteDataByPetType(
     download: bool = Query(False),
     filename: str = Query("quote_by_pet_type.csv"),    
     brands: str = Query(default="all"),
-    pet_types: str = Query(default="all")
+    pet_types: str = Query(default="all"),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
     if download:
         return await QuoteStream.stream_quote_by_pet_type_csv(
@@ -131,14 +145,17 @@ async def quoteDataByPetType(
         skip=skip,
         limit=limit,
         brands=brands,
-        pet_types=pet_types
+        pet_types=pet_types,
+        include_total=include_total,
+        approximate_total=approximate_total,
+        stream=stream,
     )
     return result
 
 
 @router.get("/quote_conversion_summary")
 async def quoteConversionSummary(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -158,7 +175,7 @@ async def quoteConversionSummary(
 
 @router.get("/quote_conversion_data")
 async def quoteConversionData(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -167,7 +184,10 @@ async def quoteConversionData(
     download: bool = Query(False),
     filename: str = Query("quote_conversion.csv"),    
     brands: str = Query(default="all"),
-    pet_types: str = Query(default="all")
+    pet_types: str = Query(default="all"),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
     if download:
         return await QuoteStream.stream_quote_conversion_csv(
@@ -189,14 +209,17 @@ async def quoteConversionData(
         skip=skip,
         limit=limit,        
         brands=brands,
-        pet_types=pet_types
+        pet_types=pet_types,
+        include_total=include_total,
+        approximate_total=approximate_total,
+        stream=stream,
     )
     return result
 
 
 @router.get("/quote_rmth_same_period_summary")
 async def quoteReceiveMethodSamePeriod(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1) - relativedelta(months=6)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -219,7 +242,7 @@ async def quoteReceiveMethodSamePeriod(
 
 @router.get("/quote_rmth_same_period_report")
 async def quoteReceiveMethodSamePeriodData(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1) - relativedelta(months=6)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -229,7 +252,9 @@ async def quoteReceiveMethodSamePeriodData(
     filename: str = Query("quote_receive_method.csv"),
     historical_months: int = 7,
     brands: str = Query(default="all"),
-    pet_types: str = Query(default="all")
+    pet_types: str = Query(default="all"),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
 ):
     if download:
         return await QuoteStream.stream_quote_receive_method_csv(
@@ -253,5 +278,7 @@ async def quoteReceiveMethodSamePeriodData(
         limit=limit,
         months=historical_months,
         brands=brands,
-        pet_types=pet_types
+        pet_types=pet_types,
+        include_total=include_total,
+        approximate_total=approximate_total,
     )
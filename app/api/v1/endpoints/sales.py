@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Query
 from datetime import date
 from sqlalchemy.engine import Engine
-from app.db.sqlserver import get_mis_db_engine
+from app.db.replica import get_report_engine
+from app.db.sqlserver import get_mis_read_engine
 from app.services.quote import Quote
 from app.services.sales import Sales
 from app.services.quote_stream import QuoteStream
@@ -9,16 +10,20 @@ from dateutil.relativedelta import relativedelta
 
 from app.core.enums import ReportTypeEnum, QuoteStatusEnum
 from app.services.policy_stream import PolicyStream
-from app.core.dependencies import require_authentication
+from app.core.dependencies import conditional_get, require_authentication
 
-router = APIRouter(dependencies=[Depends(require_authentication)])
+router = APIRouter(dependencies=[
+    Depends(require_authentication),
+    # ETag/304 keyed on the data versions of the tables these endpoints read
+    Depends(conditional_get("Quote", "Sales", "FreePolicySales")),
+])
 
 
 
 
 @router.get("/sales_summary")
 async def salesSummary(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -38,7 +43,7 @@ async def salesSummary(
 
 @router.get("/sales_data")
 async def salesData(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -48,7 +53,10 @@ async def salesData(
     filename: str = Query("sales.csv"),    
     brands: str = Query(default="all"),
     pet_types: str = Query(default="all"),
-    reportType: ReportTypeEnum = Query(default=ReportTypeEnum.TOTAL_QUOTES)
+    reportType: ReportTypeEnum = Query(default=ReportTypeEnum.TOTAL_QUOTES),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
     if download:
         return await PolicyStream.stream_sales_raw_csv(
@@ -71,14 +79,17 @@ async def salesData(
         limit=limit,
         brands=brands,
         pet_types=pet_types,
-        report_type=reportType        
+        report_type=reportType,
+        include_total=include_total,
+        approximate_total=approximate_total,
+        stream=stream,
     )
     return result
 
 
 @router.get("/sales_by_pet_type")
 async def salesByPetType(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -97,7 +108,7 @@ async def salesByPetType(
 
 @router.get("/free_policy_sales")
 async def freePolicySales(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -117,7 +128,7 @@ async def freePolicySales(
 
 @router.get("/free_policy_data")
 async def freePolicyData(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -127,7 +138,10 @@ async def freePolicyData(
     filename: str = Query("free_policy.csv"),    
     brands: str = Query(default="all"),
     pet_types: str = Query(default="all"),
-    reportType: ReportTypeEnum = Query(default=ReportTypeEnum.TOTAL_QUOTES)
+    reportType: ReportTypeEnum = Query(default=ReportTypeEnum.TOTAL_QUOTES),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
     if download:
         return await PolicyStream.stream_free_policy_raw_csv(
@@ -150,13 +164,16 @@ async def freePolicyData(
         limit=limit,
         brands=brands,
         pet_types=pet_types,
-        report_type=reportType        
+        report_type=reportType,
+        include_total=include_total,
+        approximate_total=approximate_total,
+        stream=stream,
     )
     return result
 
 @router.get("/sales_rmth_same_period")
 async def salesReceiveMethodSamePeriod(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1) - relativedelta(months=6)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -181,7 +198,7 @@ async def salesReceiveMethodSamePeriod(
 
 @router.get("/quote_data_by_pet_type")
 async def quoteDataByPetType(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -192,7 +209,10 @@ async def quoteDataByPetType(
     download: bool = Query(False),
     filename: str = Query("quote_by_pet_type.csv"),    
     brands: str = Query(default="all"),
-    pet_types: str = Query(default="all")
+    pet_types: str = Query(default="all"),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
     if download:
         return await QuoteStream.stream_quote_by_pet_type_csv(
@@ -216,14 +236,17 @@ async def quoteDataByPetType(
         skip=skip,
         limit=limit,
         brands=brands,
-        pet_types=pet_types
+        pet_types=pet_types,
+        include_total=include_total,
+        approximate_total=approximate_total,
+        stream=stream,
     )
     return result
 
 
 @router.get("/quote_conversion_summary")
 async def quoteConversionSummary(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_report_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -243,7 +266,7 @@ async def quoteConversionSummary(
 
 @router.get("/quote_conversion_data")
 async def quoteConversionData(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -252,7 +275,10 @@ async def quoteConversionData(
     download: bool = Query(False),
     filename: str = Query("quote_conversion.csv"),    
     brands: str = Query(default="all"),
-    pet_types: str = Query(default="all")
+    pet_types: str = Query(default="all"),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
     if download:
         return await QuoteStream.stream_quote_conversion_csv(
@@ -274,14 +300,17 @@ async def quoteConversionData(
         skip=skip,
         limit=limit,        
         brands=brands,
-        pet_types=pet_types
+        pet_types=pet_types,
+        include_total=include_total,
+        approximate_total=approximate_total,
+        stream=stream,
     )
     return result
 
 
 @router.get("/quote_rmth_same_period_report")
 async def quoteReceiveMethodSamePeriodData(
-    mis_db: Engine = Depends(get_mis_db_engine),
+    mis_db: Engine = Depends(get_mis_read_engine),
     start_date: date = Query(default_factory=lambda: date.today().replace(day=1) - relativedelta(months=6)),
     end_date: date = Query(default_factory=date.today),
     country_codes: str = Query(default="all"),
@@ -291,7 +320,9 @@ async def quoteReceiveMethodSamePeriodData(
     filename: str = Query("quote_receive_method.csv"),
     historical_months: int = 7,
     brands: str = Query(default="all"),
-    pet_types: str = Query(default="all")
+    pet_types: str = Query(default="all"),
+    include_total: bool = Query(True),
+    approximate_total: bool = Query(False),
 ):
     if download:
         return await QuoteStream.stream_quote_receive_method_csv(
@@ -315,5 +346,7 @@ async def quoteReceiveMethodSamePeriodData(
         limit=limit,
         months=historical_months,
         brands=brands,
-        pet_types=pet_types
+        pet_types=pet_types,
+        include_total=include_total,
+        approximate_total=approximate_total,
     )
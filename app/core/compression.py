@@ -0,0 +1,255 @@
+"""
+Response compression: gzip, plus brotli ("br") and zstd when the brotli /
+zstandard packages are installed. Both are pinned in requirements.txt but
+optional: a deployment without them negotiates only the encodings it has.
+
+The encoding is the client's most preferred (Accept-Encoding q-values) of
+COMPRESSION_ENCODINGS, ties going to the order of that setting. Bodies are
+compressed message by message as the app sends them, so a StreamingResponse
+(CSV exports) is never buffered whole: each message is compressed and
+flushed on its own, and the client keeps receiving bytes as the export
+runs. Large messages are compressed in a worker thread (zlib, brotli and
+zstd all release the GIL), so a multi-MB JSON page does not hold up the
+event loop.
+
+Left alone:
+- responses smaller than COMPRESSION_MINIMUM_SIZE (Content-Length, or a
+  single-message body);
+- responses that already have a Content-Encoding, and types that do not
+  compress (only text/*, JSON, NDJSON, XML, JS and SVG are compressed);
+- HEAD requests, 204/304 and partial content.
+
+A strong ETag is weakened on a compressed response, since the bytes differ
+from the identity representation. Ratio and CPU time per compressed
+response are exported as mis_compression_* metrics.
+"""
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+
+from app.core.config import settings
+from app.core.metrics import observe_compression
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Messages at least this large are compressed off the event loop
+_THREAD_MIN_BYTES = 64 * 1024
+
+_COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class _Gzip:
+    def __init__(self):
+        self._z = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self):
+        self._c = brotli.Compressor(mode=brotli.MODE_TEXT, quality=settings.compression_brotli_quality)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._c.process(data)
+        return out + self._c.flush() if flush else out
+
+    def finish(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._c = zstandard.ZstdCompressor(level=settings.compression_zstd_level).compressobj()
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._c.compress(data)
+        return out + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+
+    def finish(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+COMPRESSORS = {"gzip": _Gzip}
+if brotli is not None:
+    COMPRESSORS["br"] = _Brotli
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _Zstd
+
+
+def available_encodings() -> List[str]:
+    """COMPRESSION_ENCODINGS in preference order, minus those not installed."""
+    names = [e.strip().lower() for e in settings.compression_encodings.split(",")]
+    return [e for e in names if e in COMPRESSORS]
+
+
+def _parse_accept_encoding(value: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for item in value.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, v = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The encoding to use for this Accept-Encoding, or None for identity."""
+    accepted = _parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for name in available_encodings():
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _compressible(headers: Dict[bytes, bytes]) -> bool:
+    if b"content-encoding" in headers or b"content-range" in headers:
+        return False
+    content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+    return content_type.startswith(_COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+class _Encoder:
+    """Compresses one response body; counts bytes and CPU time as it goes."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self._compressor = COMPRESSORS[encoding]()
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.cpu_seconds = 0.0
+
+    def _run(self, data: bytes, final: bool) -> bytes:
+        started = time.thread_time()
+        out = self._compressor.finish(data) if final else self._compressor.compress(data, flush=True)
+        self.cpu_seconds += time.thread_time() - started
+        return out
+
+    async def encode(self, data: bytes, final: bool) -> bytes:
+        self.raw_bytes += len(data)
+        if len(data) >= _THREAD_MIN_BYTES:
+            out = await anyio.to_thread.run_sync(self._run, data, final)
+        else:
+            out = self._run(data, final)
+        self.compressed_bytes += len(out)
+        return out
+
+
+def _with_header(headers: List[Tuple[bytes, bytes]], name: bytes, value: bytes) -> List[Tuple[bytes, bytes]]:
+    return [(k, v) for k, v in headers if k.lower() != name] + [(name, value)]
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.compression_enabled or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                length = headers.get(b"content-length")
+                if (
+                    message["status"] in (204, 206, 304)
+                    or not _compressible(headers)
+                    or (length is not None and int(length) < settings.compression_minimum_size)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                # held until the first body message shows whether it is worth it
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < settings.compression_minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding)
+                headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"content-length"]
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                vary = next((v for k, v in headers if k.lower() == b"vary"), None)
+                if vary is None:
+                    headers.append((b"vary", b"Accept-Encoding"))
+                elif b"accept-encoding" not in vary.lower():
+                    headers = _with_header(headers, b"vary", vary + b", Accept-Encoding")
+                etag = next((v for k, v in headers if k.lower() == b"etag"), None)
+                if etag is not None and not etag.startswith(b"W/"):
+                    headers = _with_header(headers, b"etag", b"W/" + etag)
+                await send({**start_message, "headers": headers})
+
+            await send({
+                "type": "http.response.body",
+                "body": await encoder.encode(body, final=not more_body),
+                "more_body": more_body,
+            })
+            if not more_body:
+                route = scope.get("route")
+                observe_compression(
+                    getattr(route, "path", None) or "unmatched",
+                    encoder.encoding,
+                    encoder.raw_bytes,
+                    encoder.compressed_bytes,
+                    encoder.cpu_seconds,
+                )
+
+        await self.app(scope, receive, send_compressed)
@@ -1,6 +1,18 @@
-from fastapi import Header, HTTPException, Query, status
+import hashlib
+from datetime import date
 
+import anyio
+from fastapi import Depends, Header, HTTPException, Query, Request, Response, status
+
+from app.core.config import settings
+from app.core.request_context import get_request_context
 from app.core.security import verify_token
+from app.services.data_version import data_versions
+
+# comma-separated filters that select the same rows in any order or case
+_LIST_FILTERS = {"country_codes", "brands", "pet_types"}
+# query parameters that do not change the response body
+_IGNORED_PARAMS = {"auth_token"}
 
 
 async def require_authentication(
@@ -45,4 +57,69 @@ async def optional_authentication(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired authentication token.",
         )
+    ctx = get_request_context()
+    if ctx is not None:
+        ctx.user_sub = payload.get("sub")
+    return payload
+
+
+async def require_admin(payload: dict = Depends(require_authentication)):
+    if payload.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required.",
+        )
     return payload
+
+
+def _canonical_query(request: Request) -> str:
+    items = []
+    for name, value in sorted(request.query_params.multi_items()):
+        if name in _IGNORED_PARAMS:
+            continue
+        if name in _LIST_FILTERS:
+            value = ",".join(sorted({v.strip().upper() for v in value.split(",") if v.strip()}))
+        items.append(f"{name}={value}")
+    return "&".join(items)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison (RFC 9110): W/ prefixes are ignored
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def conditional_get(*tables: str):
+    """
+    Router dependency: ETag and Cache-Control on the report responses, and
+    304 Not Modified, before the endpoint runs any SQL, when If-None-Match
+    carries the current ETag.
+
+    The ETag hashes the path, the canonical query (filter lists sorted and
+    upper-cased), today's date (the date filters default to it) and the
+    data versions of `tables`, which ETL.load bumps. It is weak, as the same
+    data can be sent gzip'd or not. When the versions cannot be read no
+    ETag is sent and the request runs as usual.
+    """
+    async def dependency(request: Request, response: Response) -> None:
+        if not settings.report_etags_enabled or request.method != "GET" or "_profile" in request.query_params:
+            return
+        versions = data_versions.cached(tables)
+        if versions is None:
+            versions = await anyio.to_thread.run_sync(data_versions.refresh, tables)
+            if versions is None:
+                return
+        key = "|".join([
+            request.url.path, _canonical_query(request), date.today().isoformat(),
+            ",".join(f"{t}:{v}" for t, v in zip(tables, versions)),
+        ])
+        etag = f'W/"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+        headers = {"ETag": etag, "Cache-Control": settings.report_cache_control}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        # merged into the endpoint's JSON response (not into a returned StreamingResponse)
+        response.headers.update(headers)
+
+    return dependency
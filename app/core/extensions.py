@@ -2,6 +2,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 from fastapi.security import OAuth2PasswordBearer
 
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+
 # from jose import JWTError, jwt
 # from .config import settings
 
@@ -19,7 +23,19 @@ def add_extensions(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-        expose_headers=["Content-Disposition"], 
+        expose_headers=["Content-Disposition", "ETag", "X-Read-Source", "X-Replica-Lag-Seconds"],
     )
 
+    # Admin '?_profile=1' hook; needs the request context, so it is added
+    # before (i.e. inside) MetricsMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
+    # gzip/br/zstd response bodies; inside MetricsMiddleware so the size
+    # metrics count compressed bytes
+    app.add_middleware(CompressionMiddleware)
+
+    # Request context + response size/latency metrics (outermost so it
+    # sees the final bytes on the wire)
+    app.add_middleware(MetricsMiddleware)
+
     # Additional extensions can be added here
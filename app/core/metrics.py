@@ -0,0 +1,301 @@
+import functools
+import inspect
+import os
+import time
+import uuid
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.requests import Request
+
+from app.core.request_context import (
+    RequestContext,
+    get_request_context,
+    reset_request_context,
+    set_request_context,
+)
+from app.utils.sql_fingerprint import fingerprint_sql
+
+# -------- metric definitions --------
+QUERY_LATENCY = Histogram(
+    "mis_query_duration_seconds",
+    "Wall time spent executing a report query (including fetch).",
+    ["endpoint", "method", "fingerprint"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40),
+)
+QUERY_ROWS = Histogram(
+    "mis_query_rows",
+    "Rows returned by a report query.",
+    ["endpoint", "method", "fingerprint"],
+    buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+RESPONSE_BYTES = Histogram(
+    "mis_response_bytes",
+    "Bytes serialized into an HTTP response body.",
+    ["endpoint", "method"],
+    buckets=(256, 1_024, 10_240, 102_400, 1_048_576, 10_485_760, 104_857_600),
+)
+REQUEST_LATENCY = Histogram(
+    "mis_request_duration_seconds",
+    "End-to-end HTTP request time as seen by the app.",
+    ["endpoint", "method"],
+)
+EXPORT_BYTES = Counter(
+    "mis_export_streamed_bytes_total",
+    "Bytes streamed by CSV exports and NDJSON (stream=true) pages.",
+    ["endpoint", "method", "fingerprint"],
+)
+ETL_STAGE_DURATION = Histogram(
+    "mis_etl_stage_duration_seconds",
+    "Duration of an ETL stage (extract/transform/delete/insert).",
+    ["table", "stage", "region"],
+    buckets=(0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1_200, 2_400),
+)
+ETL_STAGE_ROWS = Counter(
+    "mis_etl_stage_rows_total",
+    "Rows processed by an ETL stage.",
+    ["table", "stage", "region"],
+)
+ETL_ROWS_PER_SECOND = Gauge(
+    "mis_etl_rows_per_second",
+    "Throughput of the most recent run of an ETL stage.",
+    ["table", "stage", "region"],
+)
+ETL_MEMORY_SAVED = Gauge(
+    "mis_etl_memory_saved_bytes",
+    "Bytes saved by the transform's dtype optimisation in the most recent run.",
+    ["table", "region"],
+)
+
+ETL_EXTRACT_RETRIES = Counter(
+    "mis_etl_extract_retries_total",
+    "Source query shards re-run after a transient failure.",
+    ["table", "region"],
+)
+AUTH_TOKEN_CACHE = Counter(
+    "mis_auth_token_cache_total",
+    "Bearer token checks by outcome (hit, miss, expired, invalid, revoked).",
+    ["result"],
+)
+AUTH_TOKEN_CACHE_SIZE = Gauge(
+    "mis_auth_token_cache_entries",
+    "Verified token payloads held by the token cache.",
+    multiprocess_mode="livesum",
+)
+EMAIL_OUTBOX = Counter(
+    "mis_email_outbox_total",
+    "Outbound emails by outcome (queued, sent, retried, failed, rejected).",
+    ["result"],
+)
+COMPRESSION_RATIO = Histogram(
+    "mis_compression_ratio",
+    "Uncompressed / compressed size of a compressed response body.",
+    ["endpoint", "encoding"],
+    buckets=(1, 1.5, 2, 3, 5, 8, 12, 20, 40),
+)
+COMPRESSION_CPU = Histogram(
+    "mis_compression_cpu_seconds",
+    "CPU time spent compressing one response body.",
+    ["endpoint", "encoding"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+COMPRESSION_BYTES = Counter(
+    "mis_compression_bytes_total",
+    "Response body bytes before (in) and after (out) compression.",
+    ["encoding", "direction"],
+)
+
+
+def _labels():
+    ctx = get_request_context()
+    if ctx is None:
+        return "none", "none"
+    return ctx.endpoint, ctx.service_method
+
+
+# -------- observation hooks --------
+def observe_query(sql: str, elapsed: float, rows: int) -> str:
+    """Records latency/row histograms for one statement; returns its fingerprint."""
+    fingerprint, _ = fingerprint_sql(sql)
+    endpoint, method = _labels()
+    QUERY_LATENCY.labels(endpoint, method, fingerprint).observe(elapsed)
+    QUERY_ROWS.labels(endpoint, method, fingerprint).observe(rows)
+    return fingerprint
+
+
+class ExportMetrics:
+    """
+    Metric children for one CSV export. Labels are resolved up-front because
+    the generator runs in the threadpool after the service method returned.
+    """
+
+    def __init__(self, sql: str):
+        fingerprint, _ = fingerprint_sql(sql)
+        endpoint, method = _labels()
+        self.streamed_bytes = EXPORT_BYTES.labels(endpoint, method, fingerprint)
+        self._latency = QUERY_LATENCY.labels(endpoint, method, fingerprint)
+        self._rows = QUERY_ROWS.labels(endpoint, method, fingerprint)
+
+    def observe(self, elapsed: float, rows: int) -> None:
+        self._latency.observe(elapsed)
+        self._rows.observe(rows)
+
+
+def observe_etl_stage(table: str, stage: str, region: str, elapsed: float, rows: int) -> None:
+    ETL_STAGE_DURATION.labels(table, stage, region).observe(elapsed)
+    ETL_STAGE_ROWS.labels(table, stage, region).inc(rows)
+    if elapsed > 0:
+        ETL_ROWS_PER_SECOND.labels(table, stage, region).set(rows / elapsed)
+
+
+def observe_etl_memory(table: str, region: str, saved_bytes: int) -> None:
+    ETL_MEMORY_SAVED.labels(table, region).set(saved_bytes)
+
+
+def observe_etl_retry(table: str, region: str) -> None:
+    ETL_EXTRACT_RETRIES.labels(table, region).inc()
+
+
+def observe_token_cache(result: str) -> None:
+    AUTH_TOKEN_CACHE.labels(result).inc()
+
+
+def set_token_cache_size(entries: int) -> None:
+    AUTH_TOKEN_CACHE_SIZE.set(entries)
+
+
+def observe_email(result: str) -> None:
+    EMAIL_OUTBOX.labels(result).inc()
+
+
+def observe_compression(endpoint: str, encoding: str, raw: int, compressed: int, cpu_seconds: float) -> None:
+    if compressed:
+        COMPRESSION_RATIO.labels(endpoint, encoding).observe(raw / compressed)
+    COMPRESSION_CPU.labels(endpoint, encoding).observe(cpu_seconds)
+    COMPRESSION_BYTES.labels(encoding, "in").inc(raw)
+    COMPRESSION_BYTES.labels(encoding, "out").inc(compressed)
+
+
+# -------- service method labelling --------
+def instrument_service(cls):
+    """
+    Class decorator: every public async staticmethod records its qualified
+    name (e.g. 'Quote.QuoteSummary') on the request context so queries run
+    inside it are labelled with the service method.
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not isinstance(attr, staticmethod):
+            continue
+        func = attr.__func__
+        if not inspect.iscoroutinefunction(func):
+            continue
+        setattr(cls, name, staticmethod(_wrap_service_method(func, f"{cls.__name__}.{name}")))
+    return cls
+
+
+def _wrap_service_method(func, qualified_name: str):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        ctx = get_request_context()
+        if ctx is None:
+            return await func(*args, **kwargs)
+        previous = ctx.service_method
+        ctx.service_method = qualified_name
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            if ctx.profile is not None and previous == "unknown":
+                ctx.profile.service_seconds += time.perf_counter() - started
+            # Nested calls (QuoteConversionSummary -> SalesSummary) hand the
+            # label back; the outermost name is kept for the response metrics.
+            if previous != "unknown":
+                ctx.service_method = previous
+
+    return wrapper
+
+
+# -------- route labelling --------
+async def label_route(request: Request) -> None:
+    """
+    App-wide dependency: labels the request context with the matched route's
+    template, so query metrics get one series per route, not per URL.
+    """
+    ctx = get_request_context()
+    route = request.scope.get("route")
+    if ctx is not None and route is not None:
+        ctx.endpoint = getattr(route, "path", ctx.endpoint)
+
+
+# -------- ASGI middleware --------
+class MetricsMiddleware:
+    """
+    Sets up the request context (labels, request id) and records response
+    size/latency. The request id is taken from X-Request-ID when the proxy
+    sends one and echoed back so log lines can be correlated.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        ctx = RequestContext(
+            path=scope.get("path"),
+            request_id=request_id or uuid.uuid4().hex,
+        )
+        token = set_request_context(ctx)
+        body_bytes = 0
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal body_bytes
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", ctx.request_id.encode("latin-1")))
+                if ctx.read_source is not None:
+                    headers.append((b"x-read-source", ctx.read_source.encode("latin-1")))
+                    if ctx.replica_lag_seconds is not None:
+                        headers.append((b"x-replica-lag-seconds", f"{ctx.replica_lag_seconds:g}".encode("latin-1")))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_request_context(token)
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(endpoint, ctx.service_method).observe(
+                time.perf_counter() - started
+            )
+            RESPONSE_BYTES.labels(endpoint, ctx.service_method).observe(body_bytes)
+
+
+# -------- exposition --------
+def render_metrics():
+    """Returns (payload, content_type) for the /metrics endpoint."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # uvicorn/gunicorn with several workers: aggregate the per-process files
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
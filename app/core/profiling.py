@@ -0,0 +1,261 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+from app.core.request_context import get_request_context
+from app.core.security import verify_token
+from app.utils.sql_fingerprint import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CORE_DIR = os.path.join(APP_ROOT, "core")
+PANDAS_OPS = ("pivot_table", "reindex", "iterrows")
+
+
+@dataclass
+class RequestProfile:
+    """Explicit timings collected while an admin profile request runs."""
+    service_seconds: float = 0.0
+    sql_seconds: float = 0.0
+    export_stream_seconds: float = 0.0
+    queries: List[Dict[str, Any]] = field(default_factory=list)
+
+    def record_query(self, sql: str, elapsed: float, rows: Optional[int]) -> None:
+        self.sql_seconds += elapsed
+        fingerprint, _ = fingerprint_sql(sql)
+        self.queries.append({
+            "fingerprint": fingerprint,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "rows": rows,
+        })
+
+
+def _classify(frame) -> str:
+    """
+    Buckets one event-loop stack sample. The innermost frame tells us whether
+    the loop is idle (waiting on a worker thread, e.g. SQL in read_df); the
+    outermost pandas/JSON frame tells us which shaping step we are in.
+    """
+    if frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py"):
+        return "idle"
+    label = None
+    f = frame
+    while f is not None:
+        filename = f.f_code.co_filename
+        name = f.f_code.co_name
+        if f"{os.sep}pandas{os.sep}" in filename:
+            label = f"pandas.{name}" if name in PANDAS_OPS else (label or "pandas.other")
+        elif filename.endswith(os.path.join("fastapi", "encoders.py")) or filename.endswith(
+            os.path.join("json", "encoder.py")
+        ) or (name == "render" and filename.endswith(os.path.join("starlette", "responses.py"))):
+            label = "json_encoding"
+        f = f.f_back
+    return label or "python"
+
+
+def _hotspot(frame) -> Optional[str]:
+    f = frame
+    while f is not None:
+        filename = f.f_code.co_filename
+        if filename.startswith(APP_ROOT) and not filename.startswith(_CORE_DIR):
+            rel = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+            return f"{rel}:{f.f_lineno} {f.f_code.co_name}"
+        f = f.f_back
+    return None
+
+
+class StackSampler:
+    """
+    Samples the event-loop thread's stack from a background thread. The loop
+    is shared with every other request, so a sample only counts towards this
+    request when the loop is running `task`; time spent running other tasks
+    is booked as "other_requests".
+    """
+
+    def __init__(self, thread_id: int, interval: float, loop=None, task=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.loop = loop
+        self.task = task
+        self.seconds: Counter = Counter()
+        self.hotspots: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            elapsed, last = now - last, now
+            self.samples += 1
+            label = _classify(frame)
+            if label != "idle" and self.task is not None:
+                running = asyncio.current_task(self.loop)
+                if running is not None and running is not self.task:
+                    self.seconds["other_requests"] += elapsed
+                    del frame
+                    continue
+            self.seconds[label] += elapsed
+            spot = _hotspot(frame)
+            if spot:
+                self.hotspots[spot] += elapsed
+            del frame
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _is_admin(scope, query: Dict[str, List[str]]) -> bool:
+    token = None
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            auth = value.decode("latin-1")
+            if auth.lower().startswith("bearer "):
+                token = auth.split(" ", 1)[1].strip()
+            break
+    if not token and query.get("auth_token"):
+        token = query["auth_token"][0].strip()
+    payload = verify_token(token) if token else None
+    return bool(payload) and payload.get("role") == "admin"
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+class ProfilingMiddleware:
+    """
+    Admin-only '?_profile=1' on any /api route: the endpoint runs as usual,
+    its response is drained and replaced with a JSON breakdown of where the
+    time went, sent with the endpoint's own status code (500, plus "error",
+    when it raised). '_profile_save=1' also writes the profile under
+    PROFILE_DIR.
+    Non-admin callers get the normal response; the parameter is ignored.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope.get("path", "").startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        ctx = get_request_context()
+        if query.get("_profile", ["0"])[0] != "1" or ctx is None or not _is_admin(scope, query):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        ctx.profile = profile
+        status_code = 500
+        body_bytes = 0
+
+        async def capture(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+
+        sampler = StackSampler(
+            threading.get_ident(), settings.profile_sample_interval_ms / 1000,
+            loop=asyncio.get_running_loop(), task=asyncio.current_task(),
+        )
+        error = None
+        started = time.perf_counter()
+        with sampler:
+            try:
+                await self.app(scope, receive, capture)
+            except Exception as e:
+                # the profile still goes out, with the status the caller would have had
+                logger.exception("Profiled request %s failed: %s", scope.get("path"), e)
+                status_code, error = 500, f"{type(e).__name__}: {e}"
+        wall = time.perf_counter() - started
+        ctx.profile = None
+
+        pandas_seconds = {
+            op: _ms(sampler.seconds.get(f"pandas.{op}", 0.0)) for op in PANDAS_OPS + ("other",)
+        }
+        json_seconds = sampler.seconds.get("json_encoding", 0.0)
+        other_seconds = sampler.seconds.get("other_requests", 0.0)
+        service_python = (
+            profile.service_seconds
+            - profile.sql_seconds
+            - sum(v for k, v in sampler.seconds.items() if k.startswith("pandas."))
+        )
+        result = {
+            "request_id": ctx.request_id,
+            "path": scope.get("path"),
+            "service_method": ctx.service_method,
+            "status": status_code,
+            "error": error,
+            "response_bytes": body_bytes,
+            "wall_ms": _ms(wall),
+            "breakdown_ms": {
+                "sql_wait": _ms(profile.sql_seconds),
+                "pandas": pandas_seconds,
+                "service_python_other": _ms(max(service_python, 0.0)),
+                "json_encoding": _ms(json_seconds),
+                "export_stream": _ms(profile.export_stream_seconds),
+                # loop time taken by other requests while this one ran
+                "other_requests": _ms(other_seconds),
+                "middleware_and_framework": _ms(max(
+                    wall - profile.service_seconds - json_seconds - profile.export_stream_seconds - other_seconds,
+                    0.0,
+                )),
+            },
+            "queries": profile.queries,
+            "samples": sampler.samples,
+            "sample_interval_ms": settings.profile_sample_interval_ms,
+            "hotspots": [
+                {"frame": frame, "ms": _ms(seconds)}
+                for frame, seconds in sampler.hotspots.most_common(20)
+            ],
+        }
+        if query.get("_profile_save", ["0"])[0] == "1":
+            result["saved_to"] = self._save(result)
+
+        payload = json.dumps(result, default=str).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    @staticmethod
+    def _save(result: Dict[str, Any]) -> Optional[str]:
+        try:
+            os.makedirs(settings.profile_dir, exist_ok=True)
+            stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+            path = os.path.join(settings.profile_dir, f"{stamp}_{result['request_id']}.json")
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(result, fh, indent=2, default=str)
+            return path
+        except OSError as e:
+            logger.warning("Failed to save request profile: %s", e)
+            return None
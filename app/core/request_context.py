@@ -0,0 +1,45 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from app.core.profiling import RequestProfile
+
+
+@dataclass
+class RequestContext:
+    """Per-request labels shared between middleware, services and read_df.
+
+    The object is mutable on purpose: contextvars set inside the endpoint
+    task do not flow back to the middleware, but attribute updates on the
+    shared object do.
+    """
+    # route template ('/api/v1/quote/quote_data'), set once the request is
+    # routed; raw paths would give metrics one label per path parameter value
+    endpoint: str = "unmatched"
+    path: Optional[str] = None
+    service_method: str = "unknown"
+    request_id: Optional[str] = None
+    user_sub: Optional[str] = None
+    # only set for admin '?_profile=1' requests
+    profile: Optional["RequestProfile"] = None
+    # set by ReadRoutingEngine: 'replica' or 'primary', and the last lag sample
+    read_source: Optional[str] = None
+    replica_lag_seconds: Optional[float] = None
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar(
+    "request_context", default=None
+)
+
+
+def get_request_context() -> Optional[RequestContext]:
+    return _request_context.get()
+
+
+def set_request_context(ctx: Optional[RequestContext]):
+    return _request_context.set(ctx)
+
+
+def reset_request_context(token) -> None:
+    _request_context.reset(token)
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from app.core.config import settings
+from app.core.token_cache import token_cache
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -21,7 +22,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def verify_token(token: str):
+def _decode_token(token: str):
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
@@ -29,3 +30,17 @@ def verify_token(token: str):
         return payload
     except JWTError:
         return None
+
+
+def verify_token(token: str):
+    # repeat checks of a token that verified are served from the cache until its exp
+    return token_cache.verify(token, _decode_token)
+
+
+def revoke_token(token: str) -> None:
+    """Refuses `token` on this worker until it expires."""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return
+    token_cache.revoke(token, float(exp) if isinstance(exp, (int, float)) else None)
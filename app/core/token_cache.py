@@ -0,0 +1,101 @@
+"""
+Verified-token cache for verify_token.
+
+A dashboard load authenticates every tile with the same bearer token, and
+each check was a full JWT decode and HMAC verify. Payloads that verified are
+kept in a bounded LRU keyed by the token's SHA-256 digest (the token itself
+is not stored) until the token's own `exp`, so a repeat check is a dict
+lookup. Tokens without an `exp` are not cached.
+
+`revoke(token)` drops the entry and refuses the token until it expires, even
+though its signature is still valid. Revocation is per process: every worker
+that must refuse the token has to be told.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import observe_token_cache, set_token_cache_size
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def _expiry(payload: Dict[str, Any]) -> Optional[float]:
+    exp = payload.get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class TokenCache:
+    def __init__(self):
+        # digest -> (payload, exp as a Unix timestamp)
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # digest -> exp of a revoked token
+        self._revoked: Dict[bytes, float] = {}
+        self._lock = threading.Lock()
+
+    def verify(self, token: str, decode: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Payload of `token`, from the cache or `decode` (None when invalid or revoked)."""
+        key = _digest(token)
+        now = time.time()
+        with self._lock:
+            revoked_until = self._revoked.get(key)
+            if revoked_until is not None:
+                if revoked_until > now:
+                    observe_token_cache("revoked")
+                    return None
+                del self._revoked[key]
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    observe_token_cache("hit")
+                    # a copy: callers may add to the payload they are handed
+                    return dict(payload)
+                del self._entries[key]
+                observe_token_cache("expired")
+
+        payload = decode(token)
+        if payload is None:
+            observe_token_cache("invalid")
+            return None
+        observe_token_cache("miss")
+        expires_at = _expiry(payload)
+        if expires_at is not None and expires_at > now:
+            with self._lock:
+                if key not in self._revoked:
+                    self._entries[key] = (dict(payload), expires_at)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > settings.auth_token_cache_max_entries:
+                        self._entries.popitem(last=False)
+                set_token_cache_size(len(self._entries))
+        return payload
+
+    def revoke(self, token: str, expires_at: Optional[float] = None) -> None:
+        """Refuses `token` from now until it expires (`expires_at`, else its cached exp)."""
+        key = _digest(token)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if expires_at is None:
+                # an uncached token is refused for the longest lifetime a token is issued with
+                expires_at = entry[1] if entry else time.time() + settings.access_token_expire_minutes * 60
+            now = time.time()
+            # expired revocations are dropped here, so the denylist stays as small as the live tokens
+            for stale in [k for k, until in self._revoked.items() if until <= now]:
+                del self._revoked[stale]
+            self._revoked[key] = expires_at
+            set_token_cache_size(len(self._entries))
+
+    def clear(self) -> None:
+        """Forgets every cached payload (e.g. after rotating secret_key); revocations stay."""
+        with self._lock:
+            self._entries.clear()
+            set_token_cache_size(0)
+
+
+token_cache = TokenCache()
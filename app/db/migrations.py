@@ -0,0 +1,274 @@
+"""
+Versioned schema migrations for the MIS reporting tables.
+
+    python -m app.db.migrations                    # applied version and pending migrations
+    python -m app.db.migrations --apply            # apply the pending ones to MIS
+    python -m app.db.migrations --apply --standin bench_data/mis_standin.db
+
+or set MIS_MIGRATE_ON_STARTUP=true to apply them when a worker starts.
+Migrations tied to a setting (MIS_COLUMNSTORE) are skipped, and stay
+pending, until it is turned on.
+
+Every report reads Quote/Sales/FreePolicySales by a CreatedDate range (CRM by
+QuoteCreatedDate) and pages in `CreatedDate DESC, QuoteNumber` order. The
+country, brand and pet-type filters go through UPPER()/LOWER(), which no
+index can seek on, so the indexes lead on the date and carry those columns
+as INCLUDE columns: a report seeks the date range and filters, counts and
+groups without touching the table, and only the rows of the requested page
+are looked up.
+
+With MIS_COLUMNSTORE, Quote and Sales (only ever bulk-loaded by date window,
+scanned and aggregated) become clustered columnstore, built in CreatedDate
+order so a date range skips whole rowgroups, and aggregates run in batch
+mode. The nonclustered paging index from migration 1 stays as the rowstore
+access path for pages. Not applied to the SQLite stand-in.
+
+The applied version is recorded in dbo.SchemaMigration. Each migration runs
+in its own transaction under an application lock, so workers starting
+together apply it once. A migration whose tables do not exist yet (a fresh
+MIS before the first ETL load) stays pending and is retried on the next run.
+"""
+import argparse
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "SchemaMigration"
+_LOCK = "app.db.migrations"
+
+NONCLUSTERED = "NONCLUSTERED"
+# keys: the rowstore order the columnstore is built in (rowgroup elimination)
+CLUSTERED_COLUMNSTORE = "CLUSTERED COLUMNSTORE"
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    table: str
+    name: str
+    # "Column" or "Column DESC"
+    keys: Tuple[str, ...]
+    include: Tuple[str, ...] = ()
+    kind: str = NONCLUSTERED
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    indexes: Tuple[IndexSpec, ...]
+    # Settings flag that opts in to this migration
+    setting: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.setting is None or bool(getattr(settings, self.setting))
+
+    @property
+    def tables(self) -> List[str]:
+        return sorted({index.table for index in self.indexes})
+
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(1, "covering report indexes", (
+        IndexSpec(
+            "Quote", "IX_Quote_CreatedDate_QuoteNumber", ("CreatedDate DESC", "QuoteNumber"),
+            ("CountryCode", "Brand", "PetType", "QuoteReceivedMethod", "PolicyNumber"),
+        ),
+        IndexSpec(
+            "Sales", "IX_Sales_CreatedDate_QuoteNumber", ("CreatedDate DESC", "QuoteNumber"),
+            ("CountryCode", "Brand", "PetType", "SaleMethod", "PolicyNumber"),
+        ),
+        IndexSpec(
+            "FreePolicySales", "IX_FreePolicySales_CreatedDate_QuoteNumber", ("CreatedDate DESC", "QuoteNumber"),
+            ("CountryCode", "Brand", "PetType", "SaleMethod", "PolicyStatusName", "PolicyNumber"),
+        ),
+        IndexSpec(
+            "CRM", "IX_CRM_QuoteCreatedDate_PolicyNumber", ("QuoteCreatedDate DESC", "PolicyNumber"),
+            ("CountryCode", "Brand", "PetType"),
+        ),
+    )),
+    Migration(2, "clustered columnstore Quote and Sales", (
+        IndexSpec("Quote", "CCI_Quote", ("CreatedDate",), kind=CLUSTERED_COLUMNSTORE),
+        IndexSpec("Sales", "CCI_Sales", ("CreatedDate",), kind=CLUSTERED_COLUMNSTORE),
+    ), setting="mis_columnstore"),
+)
+
+
+def _engine() -> Engine:
+    from app.db import sqlserver  # engines are created on import
+
+    return sqlserver.get_mis_db_engine()
+
+
+def _is_mssql(conn) -> bool:
+    return conn.dialect.name == "mssql"
+
+
+def _create_index_sql(index: IndexSpec, mssql: bool) -> Optional[str]:
+    if index.kind == CLUSTERED_COLUMNSTORE:
+        if not mssql:
+            return None
+        # a heap has no order: cluster it on the keys first, then convert that
+        # index in place (MAXDOP 1 keeps the rowgroups in key order)
+        return f"""
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('dbo.{index.table}') AND type = 5)
+        BEGIN
+            IF EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('dbo.{index.table}') AND type = 1)
+                THROW 50000, 'dbo.{index.table} already has a clustered index; drop it before the columnstore migration', 1;
+            CREATE CLUSTERED INDEX {index.name} ON dbo.{index.table} ({', '.join(index.keys)});
+            CREATE CLUSTERED COLUMNSTORE INDEX {index.name} ON dbo.{index.table}
+            WITH (DROP_EXISTING = ON, MAXDOP = 1);
+        END
+        """
+    if mssql:
+        include = f" INCLUDE ({', '.join(index.include)})" if index.include else ""
+        return f"""
+        IF NOT EXISTS (
+            SELECT 1 FROM sys.indexes
+            WHERE name = '{index.name}' AND object_id = OBJECT_ID('dbo.{index.table}')
+        )
+        BEGIN
+            CREATE NONCLUSTERED INDEX {index.name}
+            ON dbo.{index.table} ({', '.join(index.keys)}){include};
+        END
+        """
+    # the SQLite stand-in has no INCLUDE: trailing key columns cover the same reads
+    return f'CREATE INDEX IF NOT EXISTS "{index.name}" ON "{index.table}" ({", ".join(index.keys + index.include)})'
+
+
+def _ensure_table(conn) -> None:
+    if _is_mssql(conn):
+        conn.execute(text(f"""
+        IF OBJECT_ID('dbo.{TABLE}', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.{TABLE} (
+                Version INT NOT NULL PRIMARY KEY,
+                Name NVARCHAR(200) NOT NULL,
+                AppliedAt DATETIME NOT NULL,
+                DurationMs INT NOT NULL
+            );
+        END
+        """))
+    else:
+        conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS "{TABLE}" (
+            Version INTEGER NOT NULL PRIMARY KEY,
+            Name TEXT NOT NULL,
+            AppliedAt TEXT NOT NULL,
+            DurationMs INTEGER NOT NULL
+        )
+        """))
+
+
+def _applied(conn) -> List[int]:
+    return [row[0] for row in conn.execute(text(f"SELECT Version FROM {TABLE} ORDER BY Version"))]
+
+
+def _missing_tables(conn, tables: Sequence[str]) -> List[str]:
+    if _is_mssql(conn):
+        exists = "SELECT OBJECT_ID('dbo.' + :name, 'U')"
+    else:
+        exists = "SELECT name FROM sqlite_master WHERE type = 'table' AND name = :name"
+    return [t for t in tables if conn.execute(text(exists), {"name": t}).scalar() is None]
+
+
+def is_columnstore(conn, table_name: str) -> bool:
+    """True when `table_name` is stored as a clustered columnstore."""
+    if not _is_mssql(conn):
+        return False
+    return conn.execute(text(
+        "SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('dbo.' + :name) AND type = 5"
+    ), {"name": table_name}).scalar() is not None
+
+
+def status(engine: Optional[Engine] = None) -> dict:
+    """Applied version, the versions still pending, and the opted-out ones."""
+    with (engine or _engine()).begin() as conn:
+        _ensure_table(conn)
+        applied = _applied(conn)
+    return {
+        "version": max(applied, default=0),
+        "applied": applied,
+        "pending": [m.version for m in MIGRATIONS if m.version not in applied and m.enabled],
+        "disabled": [m.version for m in MIGRATIONS if m.version not in applied and not m.enabled],
+    }
+
+
+def migrate(engine: Optional[Engine] = None, target: Optional[int] = None) -> List[int]:
+    """Applies the pending migrations up to `target` (all by default); returns their versions."""
+    engine = engine or _engine()
+    done = []
+    for migration in MIGRATIONS:
+        if target is not None and migration.version > target:
+            break
+        if not migration.enabled:
+            continue
+        with engine.begin() as conn:
+            mssql = _is_mssql(conn)
+            if mssql:
+                # held until commit: a second worker waits here, then sees the version applied
+                conn.execute(text(
+                    "EXEC sp_getapplock @Resource = :resource, @LockMode = 'Exclusive', "
+                    "@LockOwner = 'Transaction', @LockTimeout = -1"
+                ), {"resource": _LOCK})
+            _ensure_table(conn)
+            if migration.version in _applied(conn):
+                continue
+            missing = _missing_tables(conn, migration.tables)
+            if missing:
+                logger.warning(
+                    "Migration %d (%s) left pending: %s not created yet",
+                    migration.version, migration.name, ", ".join(missing),
+                )
+                break
+            started = time.perf_counter()
+            for index in migration.indexes:
+                sql = _create_index_sql(index, mssql)
+                if sql is None:
+                    logger.info("Migration %d: %s on %s skipped on %s", migration.version,
+                        index.name, index.table, conn.dialect.name)
+                    continue
+                logger.info("Migration %d: creating %s on %s", migration.version, index.name, index.table)
+                conn.execute(text(sql))
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            conn.execute(text(f"""
+                INSERT INTO {TABLE} (Version, Name, AppliedAt, DurationMs)
+                VALUES (:version, :name, CURRENT_TIMESTAMP, :duration_ms)
+            """), {"version": migration.version, "name": migration.name, "duration_ms": duration_ms})
+            logger.info("Applied migration %d (%s) in %d ms", migration.version, migration.name, duration_ms)
+            done.append(migration.version)
+    return done
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Schema migrations for the MIS reporting tables.")
+    parser.add_argument("--apply", action="store_true", help="apply the pending migrations")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--standin", help="run against this SQLite stand-in instead of MIS")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    engine = None
+    if args.standin:
+        from app.db.standin import create_standin_engine
+
+        engine = create_standin_engine(args.standin)
+    if args.apply:
+        migrate(engine, args.target)
+    state = status(engine)
+    print(f"Schema version {state['version']}; pending: {state['pending'] or 'none'}"
+          + (f"; disabled by settings: {state['disabled']}" if state["disabled"] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
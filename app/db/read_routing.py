@@ -0,0 +1,176 @@
+"""
+Read/write separation for the MIS database.
+
+ETL loads (delete + bulk insert) run against the primary and hold long
+transactions on the report tables. When MIS_READ_DB_HOST (a separate host)
+or MIS_READ_APPLICATION_INTENT (AG listener routing to a readable
+secondary) is configured, the report services and CSV exports read through
+a ReadRoutingEngine instead:
+
+- reads go to the read-only engine while it is healthy;
+- a connection failure trips it for mis_read_retry_seconds, and the read is
+  retried on the primary;
+- replica lag is sampled every mis_read_lag_check_seconds; above
+  mis_read_max_lag_seconds reads go to the primary until it catches up.
+
+Which side served a request (and the last lag sample) is echoed to the
+caller in X-Read-Source / X-Replica-Lag-Seconds and reported in full by
+GET /api/v1/admin/read_replica.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from app.core.config import settings
+from app.core.request_context import get_request_context
+
+logger = logging.getLogger(__name__)
+
+# secondary_lag_seconds needs SQL Server 2016+ and VIEW SERVER STATE; NULL on
+# hosts that are not an AG secondary (log shipping, restored copies)
+_LAG_SQL = """
+    SELECT MAX(secondary_lag_seconds) AS lag_seconds
+    FROM sys.dm_hadr_database_replica_states
+    WHERE is_local = 1 AND database_id = DB_ID()
+"""
+
+
+def _is_connection_error(e: Exception) -> bool:
+    if isinstance(e, (OperationalError, InterfaceError)):
+        return True
+    return isinstance(e, DBAPIError) and bool(e.connection_invalidated)
+
+
+class ReadRoutingEngine:
+    """
+    Stands in for the MIS engine on the read path. read_df routes it to
+    `read_sql`; generate_csv_stream only needs `connect()`.
+    """
+
+    def __init__(self, read_engine, primary_engine):
+        self.read_engine = read_engine
+        self.primary_engine = primary_engine
+        self.url = read_engine.url
+        self._lock = threading.Lock()
+        self._tripped_until = 0.0
+        self._last_error: Optional[str] = None
+        self._fallbacks = 0
+        self._lag_seconds: Optional[float] = None
+        self._lag_checked_at = 0.0
+        self._lag_lock = threading.Lock()
+
+    # -------- health --------
+    def _trip(self, e: Exception) -> None:
+        with self._lock:
+            self._tripped_until = time.monotonic() + settings.mis_read_retry_seconds
+            self._last_error = str(e).splitlines()[0][:300] if str(e) else type(e).__name__
+            self._fallbacks += 1
+        logger.warning(
+            "MIS read replica unavailable, using primary for %ss: %s",
+            settings.mis_read_retry_seconds, self._last_error,
+        )
+
+    def _check_lag(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._lag_checked_at < settings.mis_read_lag_check_seconds:
+            return
+        # one sampler at a time; everyone else uses the previous sample
+        if not self._lag_lock.acquire(blocking=force):
+            return
+        # sampled into a local: readers keep the previous sample until this one is in
+        lag = None
+        try:
+            try:
+                conn = self.read_engine.connect()
+            except Exception as e:
+                self._trip(e)
+                return
+            try:
+                value = conn.execute(text(_LAG_SQL)).scalar()
+                lag = float(value) if value is not None else None
+            except Exception as e:
+                # usually a missing VIEW SERVER STATE grant: lag unknown, not unhealthy
+                logger.debug("Replica lag check failed: %s", e)
+            finally:
+                conn.close()
+        finally:
+            self._lag_seconds = lag
+            self._lag_checked_at = time.monotonic()
+            self._lag_lock.release()
+
+    def _replica_usable(self) -> bool:
+        if time.monotonic() < self._tripped_until:
+            return False
+        self._check_lag()
+        if time.monotonic() < self._tripped_until:
+            return False
+        return self._lag_seconds is None or self._lag_seconds <= settings.mis_read_max_lag_seconds
+
+    def pick(self):
+        """The engine the next read should use."""
+        return self.read_engine if self._replica_usable() else self.primary_engine
+
+    def _served_by(self, engine) -> None:
+        ctx = get_request_context()
+        if ctx is not None:
+            ctx.read_source = "replica" if engine is self.read_engine else "primary"
+            ctx.replica_lag_seconds = self._lag_seconds
+
+    # -------- read paths --------
+    def read_sql(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        engine = self.pick()
+        if engine is self.read_engine:
+            try:
+                df = pd.read_sql_query(sql=sql, con=engine, params=tuple(params))
+                self._served_by(engine)
+                return df
+            except Exception as e:
+                if not _is_connection_error(e):
+                    raise
+                self._trip(e)
+                engine = self.primary_engine
+        df = pd.read_sql_query(sql=sql, con=engine, params=tuple(params))
+        self._served_by(engine)
+        return df
+
+    def connect(self):
+        engine = self.pick()
+        if engine is self.read_engine:
+            try:
+                conn = engine.connect()
+                self._served_by(engine)
+                return conn
+            except Exception as e:
+                if not _is_connection_error(e):
+                    raise
+                self._trip(e)
+                engine = self.primary_engine
+        conn = engine.connect()
+        self._served_by(engine)
+        return conn
+
+    def status(self, refresh: bool = False) -> Dict[str, Any]:
+        if refresh and time.monotonic() >= self._tripped_until:
+            self._check_lag(force=True)
+        remaining = max(0.0, self._tripped_until - time.monotonic())
+        checked_ago = time.monotonic() - self._lag_checked_at if self._lag_checked_at else None
+        return {
+            "configured": True,
+            "host": self.read_engine.url.host,
+            "serving": "replica" if self._replica_usable() else "primary",
+            "lag_seconds": self._lag_seconds,
+            "lag_checked_at": (
+                datetime.fromtimestamp(time.time() - checked_ago, timezone.utc).isoformat()
+                if checked_ago is not None else None
+            ),
+            "max_lag_seconds": settings.mis_read_max_lag_seconds,
+            "tripped_for_seconds": round(remaining, 1),
+            "last_error": self._last_error,
+            "fallbacks": self._fallbacks,
+        }
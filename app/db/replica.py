@@ -0,0 +1,597 @@
+"""
+Columnar analytics replica for the dashboard summaries.
+
+ETL.load mirrors each loaded window into Parquet, partitioned by month and
+CountryCode:
+
+    {replica_dir}/Quote/month=2025-01/v-3f2a9c1d04e7/CountryCode=UK/part-0.parquet
+    {replica_dir}/Quote/_manifest.json
+
+Each month is written as a new version directory; the table's manifest
+names the live version of every month and the date ranges that have been
+mirrored, and is switched with one os.replace.
+
+Summary endpoints then run their (unchanged) T-SQL against an in-process
+DuckDB over those files instead of the MIS SQL Server. Hive partitions let
+DuckDB skip whole countries, and the files are sorted by the date column so
+row-group min/max stats prune the date range; only the referenced columns
+are read.
+
+REPORT_BACKEND=replica switches the summary endpoints over. A query whose
+date parameters reach outside the mirrored ranges of a table it reads is
+sent to the MIS engine, as is one that fails on DuckDB (translation gap).
+Windows loaded before mirroring was turned on are copied over with
+
+    python -m app.db.replica                                  # mirrored ranges per table
+    python -m app.db.replica --backfill Quote Sales --start 2024-01-01
+    python -m app.db.replica --backfill Quote --start 2024-01-01 --standin bench_data/mis_standin.db
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import anyio
+import pandas as pd
+from pandas.api.types import is_datetime64_dtype
+
+from app.core.config import settings
+from app.utils.sql_rewrite import rewrite_select_aliases
+
+logger = logging.getLogger(__name__)
+
+# table -> the column ETL.load deletes/reloads by
+REPLICA_TABLES: Dict[str, str] = {
+    "Quote": "CreatedDate",
+    "Sales": "CreatedDate",
+    "FreePolicySales": "CreatedDate",
+    "CRM": "QuoteCreatedDate",
+}
+PARTITION_COLUMN = "CountryCode"
+
+MANIFEST = "_manifest.json"
+# a writer that died holding a table lock frees it after this long
+_LOCK_STALE_SECONDS = 600
+
+_REWRITES = [
+    (re.compile(r"\bWITH\s*\(\s*NOLOCK\s*\)", re.I), ""),
+    # OFFSET ? ROWS FETCH NEXT ? ROWS ONLY -> OFFSET ? LIMIT ? (same param order)
+    (
+        re.compile(
+            r"\bOFFSET\s+(\?|\d+)\s+ROWS?\s+FETCH\s+(?:NEXT|FIRST)\s+(\?|\d+)\s+ROWS?\s+ONLY",
+            re.I,
+        ),
+        r"OFFSET \1 LIMIT \2",
+    ),
+    (re.compile(r"\[(\w+)\]"), r'"\1"'),
+    # BIT is a bitstring in DuckDB
+    (re.compile(r"\bAS\s+BIT\b", re.I), "AS BOOLEAN"),
+]
+
+_MACROS = [
+    "CREATE OR REPLACE MACRO EOMONTH(d) AS last_day(CAST(d AS DATE))",
+    "CREATE OR REPLACE MACRO DATEFROMPARTS(y, m, d) AS make_date(CAST(y AS BIGINT), CAST(m AS BIGINT), CAST(d AS BIGINT))",
+    "CREATE OR REPLACE MACRO GETDATE() AS current_localtimestamp()",
+    "CREATE OR REPLACE MACRO GETUTCDATE() AS CAST(now() AT TIME ZONE 'UTC' AS TIMESTAMP)",
+    "CREATE OR REPLACE MACRO LEN(s) AS length(rtrim(CAST(s AS VARCHAR)))",
+]
+
+
+@lru_cache(maxsize=512)
+def translate_for_duckdb(sql: str) -> str:
+    """Rewrites the T-SQL constructs used by the summary services into DuckDB syntax."""
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    if "=" in sql:
+        sql = rewrite_select_aliases(sql)
+    return sql
+
+
+def _table_dir(root: str, table_name: str) -> str:
+    return os.path.join(root, table_name)
+
+
+def _read_manifest(table_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(table_dir, MANIFEST)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {"months": {}, "mirrored": []}
+
+
+def _write_manifest(table_dir: str, manifest: Dict[str, Any]) -> None:
+    tmp = os.path.join(table_dir, f".manifest-{uuid.uuid4().hex}")
+    with open(tmp, "w") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, os.path.join(table_dir, MANIFEST))
+
+
+def _merge_ranges(ranges: List[List[str]], start: date, end: date) -> List[List[str]]:
+    """`ranges` plus [start, end], overlapping or adjacent ranges joined."""
+    spans = sorted([(date.fromisoformat(a), date.fromisoformat(b)) for a, b in ranges] + [(start, end)])
+    merged: List[List[date]] = []
+    for a, b in spans:
+        if merged and a <= merged[-1][1] + timedelta(days=1):
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return [[a.isoformat(), b.isoformat()] for a, b in merged]
+
+
+def _cut_ranges(ranges: List[List[str]], start: date, end: date) -> List[List[str]]:
+    """`ranges` without the days of [start, end]."""
+    kept = []
+    for a, b in ranges:
+        a, b = date.fromisoformat(a), date.fromisoformat(b)
+        if a < start:
+            kept.append([a, min(b, start - timedelta(days=1))])
+        if b > end:
+            kept.append([max(a, end + timedelta(days=1)), b])
+    return [[a.isoformat(), b.isoformat()] for a, b in kept]
+
+
+def _covers(ranges: List[List[str]], lo: date, hi: date) -> bool:
+    if lo > hi:
+        return True
+    return any(date.fromisoformat(a) <= lo and hi <= date.fromisoformat(b) for a, b in ranges)
+
+
+def mirrored_ranges(table_name: str, root: Optional[str] = None) -> List[Tuple[date, date]]:
+    """The [start, end] date ranges of `table_name` the replica holds."""
+    manifest = _read_manifest(_table_dir(root or settings.replica_dir, table_name))
+    return [(date.fromisoformat(a), date.fromisoformat(b)) for a, b in manifest["mirrored"]]
+
+
+@contextmanager
+def _table_lock(table_dir: str):
+    """
+    Serialises writers of one table across processes (loads of different
+    windows may run side by side). Yields the lock file; a long writer
+    touches it so it is not taken for stale.
+    """
+    os.makedirs(table_dir, exist_ok=True)
+    path = os.path.join(table_dir, ".lock")
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > _LOCK_STALE_SECONDS:
+                    logger.warning("Replica: breaking stale lock %s", path)
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.1)
+    try:
+        os.write(fd, f"{os.getpid()}\n".encode())
+        os.close(fd)
+        yield path
+    finally:
+        os.remove(path)
+
+
+def _month_starts(start: date, end: date):
+    current = start.replace(day=1)
+    while current <= end:
+        yield current
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+
+
+class ReplicaWriter:
+    @staticmethod
+    def write_window(
+        data: pd.DataFrame,
+        table_name: str,
+        start_date: str,
+        end_date: str,
+        root: Optional[str] = None,
+    ) -> int:
+        """
+        Replaces the [start_date, end_date] window of `table_name` in the
+        replica with `data`, mirroring DBOperationsServices.delete_and_upload_data.
+        Each affected month is written to a new version directory, then the
+        table's manifest is switched to the new versions and the window is
+        recorded as mirrored in one os.replace: readers see either the old or
+        the new window, never a partial one.
+        Returns the number of rows written.
+        """
+        date_col = REPLICA_TABLES[table_name]
+        new = data.copy()
+        new[date_col] = pd.to_datetime(new[date_col], errors="coerce")
+        new = new[new[date_col].notna()]
+        new_month = new[date_col].dt.to_period("M")
+        return ReplicaWriter._write_months(
+            table_name, start_date, end_date,
+            lambda month: new[new_month == pd.Period(month, "M")],
+            root,
+        )
+
+    @staticmethod
+    def _write_months(table_name: str, start_date: str, end_date: str, new_rows, root: Optional[str]) -> int:
+        """Rebuilds each month of the window from the kept rows plus new_rows(month)."""
+        root = root or settings.replica_dir
+        date_col = REPLICA_TABLES[table_name]
+        table_dir = _table_dir(root, table_name)
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+
+        written = 0
+        with _table_lock(table_dir) as lock_path:
+            manifest = _read_manifest(table_dir)
+            months = dict(manifest["months"])
+            replaced = {}
+            for month in _month_starts(start.date(), end.date()):
+                month_key = f"{month:%Y-%m}"
+                month_dir = os.path.join(table_dir, f"month={month_key}")
+                frames = []
+                current = months.get(month_key)
+                if current:
+                    replaced[month_key] = current
+                    kept = pd.read_parquet(os.path.join(month_dir, current))
+                    kept[PARTITION_COLUMN] = kept[PARTITION_COLUMN].astype(str)
+                    day = kept[date_col].dt.normalize()
+                    frames.append(kept[(day < start) | (day > end)])
+                frames.append(new_rows(month))
+                frames = [f for f in frames if not f.empty]
+                if not frames:
+                    # the window held every row of the month and the load brought none
+                    months.pop(month_key, None)
+                    continue
+                month_df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+                months[month_key] = ReplicaWriter._write_version(month_dir, ReplicaWriter._normalise(month_df, date_col))
+                written += len(month_df)
+                os.utime(lock_path)
+
+            _write_manifest(table_dir, {
+                "months": months,
+                "mirrored": _merge_ranges(manifest["mirrored"], start.date(), end.date()),
+            })
+            # a reader that picked up the previous manifest may still be scanning
+            # the versions just replaced; only the ones before those go
+            for month in _month_starts(start.date(), end.date()):
+                month_key = f"{month:%Y-%m}"
+                month_dir = os.path.join(table_dir, f"month={month_key}")
+                if os.path.isdir(month_dir):
+                    ReplicaWriter._prune(month_dir, {replaced.get(month_key), months.get(month_key)})
+
+        logger.info("Replica %s: wrote %d rows for %s to %s", table_name, written, start_date, end_date)
+        return written
+
+    @staticmethod
+    def invalidate(table_name: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+        root: Optional[str] = None) -> None:
+        """
+        Stops the replica answering for [start_date, end_date] of `table_name`
+        (every date when they are None): the window leaves the mirrored ranges,
+        so reads reaching it go to MIS until it is written or backfilled again.
+        """
+        table_dir = _table_dir(root or settings.replica_dir, table_name)
+        if not os.path.exists(os.path.join(table_dir, MANIFEST)):
+            return
+        with _table_lock(table_dir):
+            manifest = _read_manifest(table_dir)
+            if start_date is None:
+                manifest = {"months": {}, "mirrored": []}
+            else:
+                manifest["mirrored"] = _cut_ranges(
+                    manifest["mirrored"], date.fromisoformat(start_date[:10]), date.fromisoformat(end_date[:10])
+                )
+            _write_manifest(table_dir, manifest)
+        logger.warning("Replica %s: %s no longer mirrored", table_name,
+                       f"{start_date} to {end_date}" if start_date else "all dates")
+
+    @staticmethod
+    def _normalise(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+        df = df.sort_values(date_col, kind="stable").reset_index(drop=True)
+        for col in df.columns:
+            # object columns from pyodbc mix str/None (and occasionally numbers),
+            # ETL frames carry categoricals; give Parquet one physical type per column
+            if (df[col].dtype == object or isinstance(df[col].dtype, pd.CategoricalDtype)) and col != PARTITION_COLUMN:
+                df[col] = df[col].astype("string")
+            elif is_datetime64_dtype(df[col].dtype):
+                # ETL date columns are datetime64[ms], re-read files come back in
+                # other units; one unit keeps union_by_name scans on one type
+                df[col] = df[col].astype("datetime64[us]")
+        df[PARTITION_COLUMN] = df[PARTITION_COLUMN].fillna("unknown").astype(str)
+        return df
+
+    @staticmethod
+    def _write_version(month_dir: str, df: pd.DataFrame) -> str:
+        version = f"v-{uuid.uuid4().hex[:12]}"
+        df.to_parquet(
+            os.path.join(month_dir, version),
+            engine="pyarrow",
+            partition_cols=[PARTITION_COLUMN],
+            compression="zstd",
+            index=False,
+            basename_template="part-{i}.parquet",
+            row_group_size=122_880,
+        )
+        return version
+
+    @staticmethod
+    def _prune(month_dir: str, keep: set) -> None:
+        """Drops the versions of a month not in `keep` (older ones, or left by a failed write)."""
+        for name in os.listdir(month_dir):
+            if name not in keep:
+                shutil.rmtree(os.path.join(month_dir, name), ignore_errors=True)
+
+
+class ReplicaStage:
+    """
+    write_window for a load that arrives in chunks (streaming ETL): chunks are
+    spooled to Parquet by month under the replica root, and commit() rebuilds
+    one month at a time, so memory stays at one month rather than the window.
+    """
+
+    def __init__(self, table_name: str, start_date: str, end_date: str, root: Optional[str] = None):
+        self.table_name = table_name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.root = root or settings.replica_dir
+        self.path = os.path.join(self.root, f".stage-{table_name}-{uuid.uuid4().hex}")
+        self._parts = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        date_col = REPLICA_TABLES[self.table_name]
+        chunk = chunk.copy()
+        chunk[date_col] = pd.to_datetime(chunk[date_col], errors="coerce")
+        chunk = chunk[chunk[date_col].notna()]
+        for period, rows in chunk.groupby(chunk[date_col].dt.to_period("M"), sort=False):
+            month_dir = os.path.join(self.path, f"month={period}")
+            os.makedirs(month_dir, exist_ok=True)
+            ReplicaWriter._normalise(rows, date_col).to_parquet(
+                os.path.join(month_dir, f"part-{self._parts}.parquet"), engine="pyarrow", index=False,
+            )
+            self._parts += 1
+
+    def _month_rows(self, month: date) -> pd.DataFrame:
+        month_dir = os.path.join(self.path, f"month={month:%Y-%m}")
+        if not os.path.isdir(month_dir):
+            return pd.DataFrame()
+        # part by part: a column that was all-NULL in one chunk has no string type there
+        parts = [pd.read_parquet(os.path.join(month_dir, f)) for f in sorted(os.listdir(month_dir))]
+        df = pd.concat(parts, ignore_index=True)
+        df[PARTITION_COLUMN] = df[PARTITION_COLUMN].astype(str)
+        return df
+
+    def commit(self) -> int:
+        try:
+            return ReplicaWriter._write_months(
+                self.table_name, self.start_date, self.end_date, self._month_rows, self.root
+            )
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+(?:\[?dbo\]?\.)?\[?(" + "|".join(REPLICA_TABLES) + r")\]?(?!\w)", re.I
+)
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_TABLE_NAMES = {name.lower(): name for name in REPLICA_TABLES}
+
+
+def _date_span(params: Sequence[Any]) -> Optional[Tuple[date, date]]:
+    """
+    The days a query's date parameters reach. A single date is an open-ended
+    `>= ?` and runs to today; the upper bound stops at today either way
+    (exclusive `< end + 1` bounds). None when there is no date parameter.
+    """
+    days = []
+    for value in params:
+        if isinstance(value, datetime):
+            days.append(value.date())
+        elif isinstance(value, date):
+            days.append(value)
+        elif isinstance(value, str) and _ISO_DATE.match(value):
+            try:
+                days.append(date.fromisoformat(value[:10]))
+            except ValueError:
+                pass
+    if not days:
+        return None
+    today = date.today()
+    return min(days), (min(max(days), today) if len(days) > 1 else today)
+
+
+class ReplicaEngine:
+    """
+    Read-only DuckDB over the Parquet replica. Passed to the services in place
+    of a SQLAlchemy engine; read_df routes it to `read_sql`.
+    """
+
+    def __init__(self, root: str, fallback_engine=None):
+        self.root = root
+        self.fallback_engine = fallback_engine
+        self.url = SimpleNamespace(host="duckdb", database=os.path.abspath(root))
+        self._con = None
+        # table -> (manifest file identity, manifest) the view was built from
+        self._manifests: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        with self._lock:
+            if self._con is None:
+                import duckdb
+
+                con = duckdb.connect(database=":memory:")
+                for macro in _MACROS:
+                    con.execute(macro)
+                self._con = con
+            for table_name in REPLICA_TABLES:
+                self._refresh_view(table_name)
+            return self._con
+
+    def _refresh_view(self, table_name: str) -> None:
+        """Re-points the table's view at the live versions when its manifest was switched."""
+        table_dir = _table_dir(self.root, table_name)
+        try:
+            st = os.stat(os.path.join(table_dir, MANIFEST))
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if table_name in self._manifests and self._manifests[table_name][0] == stamp:
+            return
+        manifest = _read_manifest(table_dir)
+        if manifest["months"]:
+            patterns = ", ".join(
+                "'" + os.path.join(os.path.abspath(table_dir), f"month={month}", version, "**", "*.parquet").replace("'", "''") + "'"
+                for month, version in sorted(manifest["months"].items())
+            )
+            self._con.execute(
+                f'CREATE OR REPLACE VIEW "{table_name}" AS '
+                f"SELECT * FROM read_parquet([{patterns}], hive_partitioning = true, union_by_name = true)"
+            )
+        else:
+            self._con.execute(f'DROP VIEW IF EXISTS "{table_name}"')
+        self._manifests[table_name] = (stamp, manifest)
+
+    def _unmirrored(self, sql: str, params: Sequence[Any]) -> Optional[str]:
+        """What the replica lacks to answer the query, or None if it holds it all."""
+        tables = {_TABLE_NAMES[m.group(1).lower()] for m in _TABLE_REF.finditer(sql)}
+        if not tables:
+            return None
+        span = _date_span(params)
+        for table_name in sorted(tables):
+            if span is None:
+                return f"{table_name} without a date range"
+            if not _covers(self._manifests[table_name][1]["mirrored"], *span):
+                return f"{table_name} {span[0]} to {span[1]}"
+        return None
+
+    def read_sql(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        try:
+            con = self._connection()
+            gap = self._unmirrored(sql, params) if self.fallback_engine is not None else None
+            if gap is None:
+                return self._query(con, sql, params)
+            logger.debug("Replica has not mirrored %s, reading from MIS", gap)
+        except Exception as e:
+            if self.fallback_engine is None:
+                raise
+            logger.warning("Replica query failed, falling back to MIS: %s", e)
+        if hasattr(self.fallback_engine, "read_sql"):
+            return self.fallback_engine.read_sql(sql, params)
+        return pd.read_sql_query(sql=sql, con=self.fallback_engine, params=tuple(params))
+
+    @staticmethod
+    def _query(con, sql: str, params: Sequence[Any]) -> pd.DataFrame:
+        # one cursor per call: DuckDB connections are not shared across threads
+        cursor = con.cursor()
+        try:
+            result = cursor.execute(translate_for_duckdb(sql), list(params))
+            df = result.df()
+            # SUM over integers is HUGEINT in DuckDB and arrives as float64;
+            # SQL Server returns int, which the response models expect
+            for name, type_code, *_ in result.description:
+                if str(type_code) == "HUGEINT" and not df[name].isna().any():
+                    df[name] = df[name].astype("int64")
+            return df
+        finally:
+            cursor.close()
+
+
+_replica: Optional[ReplicaEngine] = None
+
+
+def get_report_engine():
+    """Engine for dashboard summaries, per settings.report_backend."""
+    from app.db.sqlserver import get_mis_read_engine
+
+    if settings.report_backend != "replica":
+        return get_mis_read_engine()
+    global _replica
+    if _replica is None:
+        _replica = ReplicaEngine(settings.replica_dir, fallback_engine=get_mis_read_engine())
+    return _replica
+
+
+def backfill(table_name: str, start_date: date, end_date: date, engine, root: Optional[str] = None,
+    chunk_rows: int = 250_000) -> int:
+    """
+    Copies [start_date, end_date] of `table_name` from MIS into the replica,
+    a month per write, so the mirrored range grows as it goes and an
+    interrupted backfill keeps the months it finished.
+    """
+    date_col = REPLICA_TABLES[table_name]
+    sql = f"SELECT * FROM {table_name} WHERE {date_col} >= ? AND {date_col} < ?"
+    written = 0
+    for month in _month_starts(start_date, end_date):
+        first = max(month, start_date)
+        last = min(date(month.year + month.month // 12, month.month % 12 + 1, 1) - timedelta(days=1), end_date)
+        stage = ReplicaStage(table_name, first.isoformat(), last.isoformat(), root)
+        try:
+            params = (first.isoformat(), (last + timedelta(days=1)).isoformat())
+            for chunk in pd.read_sql_query(sql, engine, params=params, chunksize=chunk_rows):
+                stage.add(chunk)
+        except Exception:
+            stage.discard()
+            raise
+        written += stage.commit()
+    return written
+
+
+async def _backfill_leased(table_name: str, start_date: date, end_date: date, engine, root: str) -> int:
+    # under the ETL lease, so no load of the same dates lands mid-copy
+    from app.services.etl_lease import etl_lease
+
+    async with etl_lease(table_name, start_date.isoformat(), end_date.isoformat(), "replica-backfill",
+            wait_seconds=settings.etl_lease_ttl_seconds):
+        return await anyio.to_thread.run_sync(lambda: backfill(table_name, start_date, end_date, engine, root))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mirrored ranges of the Parquet replica; backfill from MIS.")
+    parser.add_argument("--backfill", nargs="+", choices=list(REPLICA_TABLES), metavar="TABLE",
+        help="copy these tables from MIS for --start..--end")
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--standin", help="copy from this SQLite stand-in instead of MIS")
+    parser.add_argument("--root", default=settings.replica_dir)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.backfill:
+        if args.start is None:
+            parser.error("--backfill needs --start")
+        if args.standin:
+            from app.db.standin import create_standin_engine
+
+            engine = create_standin_engine(args.standin)
+        else:
+            from app.db.sqlserver import get_mis_read_engine
+
+            engine = get_mis_read_engine()
+        for table_name in args.backfill:
+            if args.standin:
+                written = backfill(table_name, args.start, args.end, engine, args.root)
+            else:
+                written = asyncio.run(_backfill_leased(table_name, args.start, args.end, engine, args.root))
+            logger.info("Backfilled %s: %d rows for %s to %s", table_name, written, args.start, args.end)
+    for table_name in REPLICA_TABLES:
+        ranges = mirrored_ranges(table_name, args.root)
+        print(f"{table_name}: " + (", ".join(f"{a} to {b}" for a, b in ranges) or "not mirrored"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
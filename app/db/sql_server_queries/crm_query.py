@@ -198,4 +198,143 @@ SELECT
 FROM Deduped
 WHERE final_rn = 1
 ORDER BY QuoteCreatedDate DESC, QuoteNumber;
-""")  # noqa
\ No newline at end of file
+""")  # noqa
+
+# Candidate rows for the CRM ETL (/etl_mis/etl_crm): one row per quote whose
+# QuoteDate falls in [start, end + 1 day), with every column CRM_Mkt_Query
+# derives per quote plus the inputs of its two ROW_NUMBER rankings
+# (QuoteId, Converted; breed = PetBreedId IS NOT NULL). The rankings run in
+# pandas (app.services.crm_dedup) once a region's QuoteDate shards are merged:
+# a pet's quotes can fall in different shards, and "converted first" is a
+# semi-join here instead of a correlated EXISTS evaluated inside the sort.
+CRM_Mkt_Candidates_Query = text("""
+WITH QuoteData AS (
+  SELECT
+    q.Id AS QuoteId,
+    q.QuoteNumber,
+    q.CreatedDate AS QuoteCreatedDate,
+    q.QuoteDate AS QuoteStartDate,
+    q.ExpireDate AS QuoteEndDate,
+    q.FirstName,
+    q.LastName,
+    q.Email,
+    COALESCE(q.Mobile, q.PrimaryContactNumber, c.PrimaryContactNumber, c.AlternativeContactNumber) AS ContactNo,
+    CASE
+      WHEN c.SendDocumentOnEmail = 1 THEN 'Yes'
+      ELSE 'No'
+    END AS EmailConcent,
+    q.PetBirthDate,
+    q.PetName,
+    CASE
+      WHEN pd.ProductCode LIKE '%dog%'    THEN 'Dog'
+      WHEN pd.ProductCode LIKE '%cat%'    THEN 'Cat'
+      WHEN pd.ProductCode LIKE '%exotic%' THEN 'Exotic'
+      WHEN pd.ProductCode LIKE '%horse%'  THEN 'Horse'
+      ELSE pd.ProductCode
+    END AS PetType,
+    pd.IsFreeProduct,
+    CASE
+      WHEN q.QuoteSaveFrom = 2 THEN 'Web'
+      ELSE 'Phone'
+    END AS QuoteReceivedMethod,
+    CASE
+      WHEN COALESCE(q.ExpireDate, q.QuoteDate) IS NULL THEN NULL
+      WHEN CAST(GETDATE() AS DATE) > q.ExpireDate THEN 'Lapsed'
+      ELSE 'Live'
+    END AS QuoteStatus,
+    COALESCE(NULLIF(q.PetBreedId, 0), NULLIF(q.PetSeconderyBreedId, 0), NULLIF(q.PetBreedId3, 0)) AS PetBreedId
+  FROM Quote q
+  LEFT JOIN Product pd ON pd.Id = q.ProductId
+  LEFT JOIN Client c ON c.Id = q.ClientId
+  WHERE
+    q.QuoteDate >= ?
+    AND q.QuoteDate < DATEADD(DAY, 1, ?)
+    AND q.FirstName NOT LIKE '%Test%'
+    AND q.LastName  NOT LIKE '%Test%'
+    AND q.Email     NOT LIKE '%Test%'
+    AND q.PetName   NOT LIKE '%Test%'
+    AND q.Email     NOT LIKE '%prowerse%'
+),
+
+Activity AS (
+  SELECT pa.Id, pa.QuoteId, pa.PolicyNumber, pa.CreatedDate
+  FROM PolicyActivity pa
+  JOIN QuoteData qd ON qd.QuoteId = pa.QuoteId
+),
+
+-- latest policy per quote (CRM_Mkt_Query does this for the picked quotes only)
+LatestPolicy AS (
+  SELECT
+    a.QuoteId,
+    a.PolicyNumber,
+    p.ActualStartDate AS OriginalPolicyStartDate,
+    p.ActualEndDate   AS PolicyEndDate,
+    p.PolicyStatusId,
+    ROW_NUMBER() OVER (
+      PARTITION BY a.QuoteId
+      ORDER BY a.CreatedDate DESC, a.Id DESC
+    ) AS rn
+  FROM Activity a
+  JOIN Policy p ON p.PolicyNumber = a.PolicyNumber
+),
+
+PolicyInfo AS (
+  SELECT
+    lp.QuoteId,
+    lp.PolicyNumber,
+    lp.OriginalPolicyStartDate,
+    lp.PolicyEndDate,
+    mps.PolicyStatusName
+  FROM LatestPolicy lp
+  LEFT JOIN [Master].[PolicyStatus] mps ON mps.Id = lp.PolicyStatusId
+  WHERE lp.rn = 1
+),
+
+Converted AS (
+  SELECT DISTINCT QuoteId FROM Activity
+)
+
+SELECT
+  'Petcover' AS Brand,
+  '' AS Country,
+  '' AS BusinessName,
+  '' AS BusinessType,
+  CASE
+    WHEN pi.PolicyNumber IS NOT NULL THEN
+      CASE
+        WHEN GETDATE() < pi.PolicyEndDate THEN
+          CASE
+            WHEN pi.PolicyStatusName IN ('Active', 'Converted') THEN 'Active'
+            ELSE pi.PolicyStatusName
+          END
+        ELSE 'Expired'
+      END
+    ELSE 'Quote'
+  END AS CustomerStatus,
+  CASE WHEN qd.IsFreeProduct = 1 THEN 'Yes' ELSE 'No' END AS FreePolicy,
+  qd.QuoteStatus,
+  qd.QuoteNumber,
+  pi.PolicyNumber,
+  qd.QuoteReceivedMethod,
+  qd.QuoteCreatedDate,
+  qd.QuoteStartDate,
+  qd.QuoteEndDate,
+  pi.OriginalPolicyStartDate,
+  pi.PolicyEndDate,
+  qd.FirstName,
+  qd.LastName,
+  qd.Email,
+  qd.ContactNo,
+  qd.EmailConcent,
+  qd.PetName,
+  qd.PetType,
+  qd.PetBirthDate,
+  qd.PetBreedId,
+  mb.BreedName,
+  qd.QuoteId,
+  CASE WHEN cv.QuoteId IS NOT NULL THEN 1 ELSE 0 END AS Converted
+FROM QuoteData qd
+LEFT JOIN PolicyInfo pi ON pi.QuoteId = qd.QuoteId
+LEFT JOIN Converted cv ON cv.QuoteId = qd.QuoteId
+LEFT JOIN [Master].[Breed] mb ON mb.Id = qd.PetBreedId
+""")  # noqa
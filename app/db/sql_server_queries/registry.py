@@ -0,0 +1,109 @@
+"""
+Versioned UTS source queries, by entity (ETL pipeline name) and region group.
+
+Every version of a query stays registered, so a rewrite can be promoted
+here and rolled back from the environment without a deploy:
+
+    ETL_SOURCE_QUERY_VERSIONS='{"quote.uk_de_at": "v1"}'
+
+benchmarks/bench_source_queries.py runs all versions side by side on the
+local stand-in and fails unless they return the same rows.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from sqlalchemy import TextClause
+
+from app.core.config import settings
+from app.db.sql_server_queries.au_nz_free_policy_query import AU_NZ_FREE_POLICY_Query
+from app.db.sql_server_queries.au_nz_quote_query import AU_NZ_QUOTE_Query
+from app.db.sql_server_queries.au_nz_sales_query import AU_NZ_SALES_Query
+from app.db.sql_server_queries.crm_query import CRM_Mkt_Candidates_Query
+from app.db.sql_server_queries.uk_de_at_free_policy_query import (
+    UK_DE_AT_FREE_POLICY_Query,
+    UK_DE_AT_FREE_POLICY_Query_V2,
+)
+from app.db.sql_server_queries.uk_de_at_quote_query import UK_DE_AT_QUOTE_Query, UK_DE_AT_QUOTE_Query_V2
+from app.db.sql_server_queries.uk_de_at_sales_query import UK_DE_AT_SALES_Query, UK_DE_AT_SALES_Query_V2
+
+logger = logging.getLogger(__name__)
+
+AU_NZ = "au_nz"
+UK_DE_AT = "uk_de_at"
+
+
+@dataclass(frozen=True)
+class SourceQuery:
+    entity: str
+    region_group: str
+    version: str
+    sql: TextClause
+    # how many times the query binds (start_date, end_date), in order
+    date_ranges: int = 1
+
+    @property
+    def name(self) -> str:
+        return f"{self.entity}.{self.region_group}.{self.version}"
+
+    @property
+    def text(self) -> str:
+        return self.sql.text
+
+    def parameters(self, start_date: str, end_date: str) -> tuple:
+        return (start_date, end_date) * self.date_ranges
+
+
+_QUERIES: Tuple[SourceQuery, ...] = (
+    SourceQuery("quote", AU_NZ, "v1", AU_NZ_QUOTE_Query),
+    SourceQuery("quote", UK_DE_AT, "v1", UK_DE_AT_QUOTE_Query, date_ranges=2),
+    SourceQuery("quote", UK_DE_AT, "v2", UK_DE_AT_QUOTE_Query_V2, date_ranges=3),
+    SourceQuery("sales", AU_NZ, "v1", AU_NZ_SALES_Query),
+    SourceQuery("sales", UK_DE_AT, "v1", UK_DE_AT_SALES_Query),
+    SourceQuery("sales", UK_DE_AT, "v2", UK_DE_AT_SALES_Query_V2),
+    SourceQuery("free_policies", AU_NZ, "v1", AU_NZ_FREE_POLICY_Query),
+    SourceQuery("free_policies", UK_DE_AT, "v1", UK_DE_AT_FREE_POLICY_Query),
+    SourceQuery("free_policies", UK_DE_AT, "v2", UK_DE_AT_FREE_POLICY_Query_V2),
+    # one query for every region; candidate rows, deduplicated by app.services.crm_dedup
+    SourceQuery("crm", AU_NZ, "v1", CRM_Mkt_Candidates_Query),
+    SourceQuery("crm", UK_DE_AT, "v1", CRM_Mkt_Candidates_Query),
+)
+
+REGISTRY: Dict[Tuple[str, str], Dict[str, SourceQuery]] = {}
+for _query in _QUERIES:
+    REGISTRY.setdefault((_query.entity, _query.region_group), {})[_query.version] = _query
+
+# The version used unless settings.etl_source_query_versions says otherwise
+PROMOTED: Dict[Tuple[str, str], str] = {
+    ("quote", AU_NZ): "v1",
+    ("quote", UK_DE_AT): "v2",
+    ("sales", AU_NZ): "v1",
+    ("sales", UK_DE_AT): "v2",
+    ("free_policies", AU_NZ): "v1",
+    ("free_policies", UK_DE_AT): "v2",
+    ("crm", AU_NZ): "v1",
+    ("crm", UK_DE_AT): "v1",
+}
+
+
+def region_group(country_code: str) -> str:
+    return AU_NZ if country_code.upper() in ("NZ", "AU") else UK_DE_AT
+
+
+def versions(entity: str, group: str) -> List[SourceQuery]:
+    return sorted(REGISTRY[(entity, group)].values(), key=lambda q: q.version)
+
+
+def get(entity: str, group: str, version: str) -> SourceQuery:
+    try:
+        return REGISTRY[(entity, group)][version]
+    except KeyError:
+        known = ", ".join(q.version for q in versions(entity, group)) if (entity, group) in REGISTRY else "none"
+        raise ValueError(f"No source query {entity}.{group}.{version} (registered: {known})") from None
+
+
+def resolve(entity: str, country_code: str) -> SourceQuery:
+    """The source query a load of `entity` runs against `country_code`."""
+    group = region_group(country_code)
+    version = settings.etl_source_query_versions.get(f"{entity}.{group}", PROMOTED[(entity, group)])
+    return get(entity, group, version)
@@ -2,6 +2,7 @@
 from sqlalchemy import create_engine
 # from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import Settings
+from app.db.read_routing import ReadRoutingEngine
 
 settings = Settings()
 
@@ -28,6 +29,12 @@ uk_uts = SQLServerConnection(settings.sql_server_uts_url_uk)
 
 mis_db = SQLServerConnection(settings.sql_server_mis_url)
 
+# Reports and exports read through the read-only MIS when one is configured
+mis_read = (
+    ReadRoutingEngine(SQLServerConnection(settings.sql_server_mis_read_url).engine, mis_db.engine)
+    if settings.sql_server_mis_read_url else None
+)
+
 print("Connections created")
 
 
@@ -53,3 +60,8 @@ def get_uk_uts_engine():
 
 def get_mis_db_engine():
     return mis_db.engine
+
+
+def get_mis_read_engine():
+    """Engine for report reads; the primary when no read replica is configured."""
+    return mis_read if mis_read is not None else mis_db.engine
@@ -0,0 +1,17 @@
+"""
+Local SQLite stand-in for the MIS reporting database.
+
+    python -m app.db.standin --path bench_data/mis_standin.db --quotes 10000000
+
+then pass ``create_standin_engine(path)`` wherever the services expect the
+MIS engine. ``python -m app.db.standin.uts`` builds the UTS source tables the
+UK/DE/AT extraction queries read.
+"""
+from app.db.standin.dialect import create_standin_engine, translate_tsql
+from app.db.standin.generator import GeneratorConfig, build_database
+from app.db.standin.uts import UTSConfig, build_uts_database
+
+__all__ = [
+    "create_standin_engine", "translate_tsql", "GeneratorConfig", "build_database",
+    "UTSConfig", "build_uts_database",
+]
@@ -0,0 +1,34 @@
+import argparse
+import logging
+import os
+from datetime import date
+
+from app.db.standin.generator import GeneratorConfig, build_database
+from app.db.standin.schema import TABLES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the synthetic MIS stand-in database.")
+    parser.add_argument("--path", default="bench_data/mis_standin.db")
+    parser.add_argument("--quotes", type=int, default=1_000_000)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2023, 1, 1))
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--tables", nargs="*", choices=list(TABLES), default=None)
+    parser.add_argument("--no-indexes", action="store_true", help="leave the tables unindexed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    os.makedirs(os.path.dirname(args.path) or ".", exist_ok=True)
+    cfg = GeneratorConfig(
+        quotes=args.quotes, start=args.start, end=args.end,
+        seed=args.seed, chunk_size=args.chunk_size,
+    )
+    counts = build_database(args.path, cfg, args.tables, indexes=not args.no_indexes)
+    for table, count in counts.items():
+        print(f"{table}: {count:,} rows")
+
+
+if __name__ == "__main__":
+    main()
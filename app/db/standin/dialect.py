@@ -0,0 +1,274 @@
+"""
+T-SQL compatibility shim for the SQLite stand-in.
+
+The report services emit SQL Server syntax. Rather than fork every query,
+statements are rewritten just before they reach the cursor and the handful
+of T-SQL date/string functions the services rely on are registered as
+Python UDFs on each connection.
+"""
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from app.utils.sql_rewrite import rewrite_select_aliases
+
+_REWRITES = [
+    (re.compile(r"\bWITH\s*\(\s*NOLOCK\s*\)", re.I), ""),
+    # OFFSET ? ROWS FETCH NEXT ? ROWS ONLY -> LIMIT offset, count (same param order)
+    (
+        re.compile(
+            r"\bOFFSET\s+(\?|\d+)\s+ROWS?\s+FETCH\s+(?:NEXT|FIRST)\s+(\?|\d+)\s+ROWS?\s+ONLY",
+            re.I,
+        ),
+        r"LIMIT \1, \2",
+    ),
+    # schema-qualified UTS names: [Master].[Breed] -> "Master_Breed", [dbo].[User] -> "User"
+    (re.compile(r"\[Master\]\.\[(\w+)\]", re.I), r'"Master_\1"'),
+    (re.compile(r"\[dbo\]\.\[(\w+)\]", re.I), r'"\1"'),
+    (re.compile(r"\bMaster\.(\w+)"), r'"Master_\1"'),
+    (re.compile(r"\[(\w+)\]"), r'"\1"'),
+    # CAST(x AS DATE) / CAST(x AS DATETIME) -> DATE(x) / DATETIME(x); one level of nesting
+    (
+        re.compile(r"\bCAST\(((?:[^()]|\([^()]*\))+?)\s+AS\s+DATE\s*\)", re.I),
+        r"DATE(\1)",
+    ),
+    (
+        re.compile(r"\bCAST\(((?:[^()]|\([^()]*\))+?)\s+AS\s+DATETIME2?\s*\)", re.I),
+        r"DATETIME(\1)",
+    ),
+    (re.compile(r"\bAS\s+N?VARCHAR\s*\(\s*(?:\d+|MAX)\s*\)", re.I), "AS TEXT"),
+    (re.compile(r"\bAS\s+BIT\b", re.I), "AS INTEGER"),
+    # the UTS source queries: STRING_AGG (ordering dropped; SQLite aggregates in
+    # scan order), OPTION hints, and + between string literals
+    (re.compile(r"\bSTRING_AGG\(", re.I), "group_concat("),
+    (re.compile(r"\)\s*WITHIN\s+GROUP\s*\(\s*ORDER\s+BY\s[^()]*\)", re.I), ")"),
+    (re.compile(r"\bOPTION\s*\(\s*RECOMPILE\s*\)", re.I), ""),
+    # ISNULL(a, b) -> IFNULL: after AND/OR SQLite parses ISNULL as the postfix operator
+    (re.compile(r"\bISNULL\s*\(", re.I), "IFNULL("),
+    (re.compile(r"\+\s*('(?:[^']|'')*')\s*\+"), r"|| \1 ||"),
+    (re.compile(r"\bAS\s+DECIMAL\s*\(\s*\d+\s*,\s*\d+\s*\)", re.I), "AS REAL"),
+    # DATEADD(DAY, ...) - the datepart is a bare keyword in T-SQL
+    (
+        re.compile(r"\b(DATEADD|DATEDIFF|DATEPART)\(\s*(YEAR|MONTH|WEEK|DAY|HOUR|MINUTE|SECOND)\s*,", re.I),
+        r"\1('\2',",
+    ),
+]
+
+
+_STRING_SPLIT = re.compile(r"\bSELECT\s+\*\s+FROM\s+StringSplit\(", re.I)
+
+
+def _call_args(sql: str, start: int):
+    """Top-level argument spans of the call opened just before `start`, and where it ends."""
+    spans, depth, arg_start, i = [], 0, start, start
+    while True:
+        ch = sql[i]
+        if ch == "'":
+            i = sql.index("'", i + 1) + 1
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            if depth == 0:
+                spans.append((arg_start, i))
+                return spans, i + 1
+            depth -= 1
+        elif depth == 0 and ch == ",":
+            spans.append((arg_start, i))
+            arg_start = i + 1
+        i += 1
+
+
+def rewrite_string_split(sql: str) -> str:
+    """UTS 'SELECT * FROM StringSplit(expr, ',')' -> the integer ids via json_each."""
+    while True:
+        match = _STRING_SPLIT.search(sql)
+        if match is None:
+            return sql
+        ((value_start, value_end), (sep_start, sep_end)), end = _call_args(sql, match.end())
+        value = sql[value_start:value_end].strip()
+        sep = sql[sep_start:sep_end].strip()
+        sql = (
+            f"{sql[:match.start()]}SELECT CAST(value AS INTEGER) FROM "
+            f"json_each('[\"' || replace({value}, {sep}, '\",\"') || '\"]'){sql[end:]}"
+        )
+
+
+@lru_cache(maxsize=512)
+def translate_tsql(sql: str) -> str:
+    """Rewrites the T-SQL constructs used by the services into SQLite syntax."""
+    if "StringSplit" in sql:
+        sql = rewrite_string_split(sql)
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    if "=" in sql:
+        sql = rewrite_select_aliases(sql)
+    return sql
+
+
+# -------- UDFs --------
+# Dates are stored as ISO text ('YYYY-MM-DD HH:MM:SS'), so the common
+# YEAR/MONTH/DAY calls are plain slices.
+def _to_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    s = str(value)
+    return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.fromisoformat(str(value).replace("T", " "))
+
+
+def _year(value):
+    return None if value is None else int(str(value)[0:4])
+
+
+def _month(value):
+    return None if value is None else int(str(value)[5:7])
+
+
+def _day(value):
+    return None if value is None else int(str(value)[8:10])
+
+
+@lru_cache(maxsize=4096)
+def _eomonth_cached(year: int, month: int, offset: int) -> str:
+    total = year * 12 + (month - 1) + offset
+    y, m = divmod(total, 12)
+    m += 1
+    return date(y, m, calendar.monthrange(y, m)[1]).isoformat()
+
+
+def _eomonth(value, offset=0):
+    if value is None:
+        return None
+    s = str(value)
+    return _eomonth_cached(int(s[0:4]), int(s[5:7]), int(offset or 0))
+
+
+def _datefromparts(y, m, d):
+    if y is None or m is None or d is None:
+        return None
+    return f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
+
+
+def _format_like(original, result: datetime) -> str:
+    # keep date-only values date-only, as SQL Server's DATE type would
+    return result.date().isoformat() if len(str(original)) <= 10 else result.isoformat(sep=" ")
+
+
+def _dateadd(part, number, value):
+    if value is None or number is None:
+        return None
+    dt = _to_datetime(value)
+    part = part.upper()
+    number = int(number)
+    if part in ("YEAR", "MONTH"):
+        months = number * (12 if part == "YEAR" else 1)
+        total = dt.year * 12 + (dt.month - 1) + months
+        y, m = divmod(total, 12)
+        m += 1
+        dt = dt.replace(year=y, month=m, day=min(dt.day, calendar.monthrange(y, m)[1]))
+    else:
+        unit = {"WEEK": "weeks", "DAY": "days", "HOUR": "hours", "MINUTE": "minutes", "SECOND": "seconds"}[part]
+        dt = dt + timedelta(**{unit: number})
+    return _format_like(value, dt)
+
+
+def _datediff(part, start, end):
+    if start is None or end is None:
+        return None
+    part = part.upper()
+    a, b = _to_datetime(start), _to_datetime(end)
+    if part == "YEAR":
+        return b.year - a.year
+    if part == "MONTH":
+        return (b.year - a.year) * 12 + (b.month - a.month)
+    if part in ("DAY", "WEEK"):
+        days = (b.date() - a.date()).days
+        return days if part == "DAY" else days // 7
+    seconds = int((b - a).total_seconds())
+    return {"HOUR": seconds // 3600, "MINUTE": seconds // 60}.get(part, seconds)
+
+
+def _datepart(part, value):
+    dt = _to_datetime(value)
+    if dt is None:
+        return None
+    return getattr(dt, part.lower())
+
+
+def _getdate():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _getutcdate():
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _isnull(value, fallback):
+    return fallback if value is None else value
+
+
+def _concat(*values):
+    # T-SQL CONCAT treats NULL as ''
+    return "".join("" if v is None else str(v) for v in values)
+
+
+def _len(value):
+    # SQL Server LEN ignores trailing spaces
+    return None if value is None else len(str(value).rstrip(" "))
+
+
+_FUNCTIONS = [
+    ("YEAR", 1, _year, True),
+    ("MONTH", 1, _month, True),
+    ("DAY", 1, _day, True),
+    ("EOMONTH", 1, _eomonth, True),
+    ("EOMONTH", 2, _eomonth, True),
+    ("DATEFROMPARTS", 3, _datefromparts, True),
+    ("DATEADD", 3, _dateadd, True),
+    ("DATEDIFF", 3, _datediff, True),
+    ("DATEPART", 2, _datepart, True),
+    ("GETDATE", 0, _getdate, False),
+    ("GETUTCDATE", 0, _getutcdate, False),
+    ("ISNULL", 2, _isnull, True),
+    ("LEN", 1, _len, True),
+    ("CONCAT", -1, _concat, True),
+]
+
+
+def register_functions(dbapi_connection) -> None:
+    for name, nargs, func, deterministic in _FUNCTIONS:
+        dbapi_connection.create_function(name, nargs, func, deterministic=deterministic)
+
+
+def create_standin_engine(path: str) -> Engine:
+    """
+    SQLAlchemy engine over a SQLite file that accepts the services' T-SQL.
+    Pass it anywhere the MIS engine is expected (services, read_df, exports).
+    """
+    engine = create_engine(f"sqlite:///{path}", future=True)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, _record):
+        register_functions(dbapi_connection)
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA cache_size=-262144")  # 256 MB page cache
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _translate(conn, cursor, statement, parameters, context, executemany):
+        return translate_tsql(statement), parameters
+
+    return engine
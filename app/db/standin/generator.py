@@ -0,0 +1,365 @@
+"""
+Synthetic MIS data for local benchmarking.
+
+Rows are generated in NumPy chunks so 10M+ quotes fit in bounded memory.
+Distributions are skewed the way production is: UK-heavy, dogs over cats,
+weekday/seasonal peaks with year-on-year growth, and NULL/blank rates on
+the quote-completeness columns high enough to exercise those code paths.
+Sales rows are derived from the converted quotes of the same chunk, so
+QuoteNumber/PolicyNumber joins line up across tables.
+"""
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.db.standin.schema import TABLES, create_indexes, create_tables
+
+logger = logging.getLogger(__name__)
+
+COUNTRIES = np.array(["UK", "AU", "NZ", "DE", "AT"])
+COUNTRY_NAMES = {
+    "UK": "United Kingdom", "AU": "Australia", "NZ": "New Zealand",
+    "DE": "Germany", "AT": "Austria",
+}
+COUNTRY_WEIGHTS = np.array([0.42, 0.26, 0.10, 0.13, 0.09])
+
+UK_BRANDS = np.array(["BPIS", "PetId", "BB"])
+UK_BRAND_WEIGHTS = np.array([0.62, 0.33, 0.05])
+
+PET_TYPES = np.array(["Dog", "Cat", "Horse", "Exotic"])
+PET_TYPE_WEIGHTS = np.array([0.60, 0.32, 0.03, 0.05])
+
+# share of rows with NULL / blank values on the completeness columns
+QUOTE_NULL_RATES = {
+    "FullName": 0.01, "Email": 0.04, "Address": 0.08, "PostCode": 0.06,
+    "ContactNo": 0.10, "PetName": 0.02, "BreedName": 0.15, "PetBirthDate": 0.05,
+}
+BLANK_RATE = 0.01
+
+FIRST_NAMES = np.array([
+    "James", "Olivia", "Jack", "Emily", "Thomas", "Sophie", "Liam", "Chloe", "Noah", "Grace",
+    "Lukas", "Anna", "Felix", "Lena", "Oliver", "Mia", "William", "Ella", "Henry", "Ava",
+    "Lucas", "Isla", "Charlie", "Ruby", "George", "Zoe", "Max", "Hannah", "Leon", "Lily",
+])
+LAST_NAMES = np.array([
+    "Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Müller",
+    "Schmidt", "Schneider", "Fischer", "Weber", "Walker", "White", "Martin", "Thompson",
+    "Evans", "Roberts", "Wright", "Green", "Hall", "Wood", "Clarke", "Hughes", "King",
+])
+PET_NAMES = np.array([
+    "Bella", "Max", "Luna", "Charlie", "Daisy", "Milo", "Coco", "Buddy", "Molly", "Rocky",
+    "Lola", "Teddy", "Bailey", "Ruby", "Oscar", "Nala", "Simba", "Toby", "Rosie", "Archie",
+])
+BREEDS = np.array([
+    "Labrador Retriever", "French Bulldog", "Cocker Spaniel", "Border Collie", "Dachshund",
+    "Cavapoo", "Golden Retriever", "Staffordshire Bull Terrier", "Domestic Shorthair",
+    "Maine Coon", "British Shorthair", "Ragdoll", "Thoroughbred", "Welsh Pony", "Rabbit",
+])
+STREETS = np.array(["High", "Station", "Church", "Park", "Victoria", "Main", "Mill", "Bahnhof"])
+SUBURBS = np.array([
+    "Richmond", "Camden", "Fitzroy", "Ponsonby", "Mitte", "Leopoldstadt", "Clifton",
+    "Headingley", "Glebe", "Newtown", "Kew", "Parnell", "Schwabing", "Favoriten",
+])
+STATES = {
+    "UK": np.array(["England", "Scotland", "Wales", "Northern Ireland"]),
+    "AU": np.array(["NSW", "VIC", "QLD", "WA", "SA"]),
+    "NZ": np.array(["Auckland", "Wellington", "Canterbury"]),
+    "DE": np.array(["Bayern", "Berlin", "Hessen", "NRW"]),
+    "AT": np.array(["Wien", "Tirol", "Steiermark"]),
+}
+POLICY_STATUSES = np.array(["Active", "Cancel", "Expired", "Pending", "Refer", "Renewal Policy", "Suspended"])
+POLICY_STATUS_WEIGHTS = np.array([0.55, 0.15, 0.15, 0.05, 0.02, 0.06, 0.02])
+AGENT_CATEGORIES = np.array([5, 6, 7, 8])
+AGENT_CATEGORY_WEIGHTS = np.array([0.45, 0.10, 0.15, 0.30])
+BUSINESS_TYPES = np.array(["Vet", "Charities", "Pet Business", "Breeder"])
+PRODUCT_TIERS = np.array(["Basic", "Classic", "Premier", "Lifetime"])
+AGENTS = np.array([f"Agent {i:04d}" for i in range(800)])
+
+CONVERSION_RATE = 0.20
+FREE_POLICY_RATE = 0.06
+CRM_RATE = 0.50
+
+
+@dataclass
+class GeneratorConfig:
+    quotes: int = 1_000_000
+    start: date = date(2023, 1, 1)
+    end: date = date(2025, 12, 31)
+    seed: int = 42
+    chunk_size: int = 250_000
+    growth: float = 0.35  # relative volume increase from start to end
+
+
+# -------- vectorised helpers --------
+def _day_weights(cfg: GeneratorConfig) -> np.ndarray:
+    days = pd.date_range(cfg.start, cfg.end, freq="D")
+    t = np.linspace(0.0, 1.0, len(days))
+    weekday = np.array([1.15, 1.15, 1.1, 1.1, 1.05, 0.75, 0.6])[days.dayofweek]
+    # renewal/new-year peak in Jan, summer dip
+    season = 1.0 + 0.15 * np.cos(2 * np.pi * (days.month.to_numpy() - 1) / 12)
+    w = (1.0 + cfg.growth * t) * weekday * season
+    return w / w.sum()
+
+
+def _fmt_datetime(values: np.ndarray) -> np.ndarray:
+    return np.char.replace(np.datetime_as_string(values.astype("datetime64[s]")), "T", " ")
+
+
+def _fmt_date(values: np.ndarray) -> np.ndarray:
+    return np.datetime_as_string(values.astype("datetime64[D]"))
+
+
+def _with_nulls(rng, values: np.ndarray, null_rate: float, blank_rate: float = 0.0) -> np.ndarray:
+    out = values.astype(object)
+    roll = rng.random(len(out))
+    if blank_rate:
+        out[roll < null_rate + blank_rate] = ""
+    out[roll < null_rate] = None
+    return out
+
+
+def _join(*parts) -> np.ndarray:
+    result = np.asarray(parts[0]).astype(str)
+    for part in parts[1:]:
+        result = np.char.add(result, np.asarray(part).astype(str))
+    return result
+
+
+def _choice(rng, values: np.ndarray, n: int, p: Optional[np.ndarray] = None) -> np.ndarray:
+    return values[rng.choice(len(values), size=n, p=p)]
+
+
+# -------- table generators --------
+def generate_quote_chunk(
+    rng, cfg: GeneratorConfig, day_p: np.ndarray, first_id: int, n: int, etl_date: str
+) -> pd.DataFrame:
+    ids = np.arange(first_id, first_id + n)
+    country = _choice(rng, COUNTRIES, n, COUNTRY_WEIGHTS)
+
+    brand = np.where(country == "UK", _choice(rng, UK_BRANDS, n, UK_BRAND_WEIGHTS), "Petcover")
+    pet_type = _choice(rng, PET_TYPES, n, PET_TYPE_WEIGHTS)
+    pet_type = np.where((brand == "BB"), "BB_Commercial", pet_type)
+
+    day = rng.choice(len(day_p), size=n, p=day_p)
+    seconds = np.clip(rng.normal(14 * 3600, 3.5 * 3600, n), 0, 86_399).astype("int64")
+    created = np.datetime64(cfg.start, "s") + day.astype("timedelta64[D]") + seconds.astype("timedelta64[s]")
+    created_day = created.astype("datetime64[D]")
+
+    converted = rng.random(n) < CONVERSION_RATE
+    policy_created = created + rng.integers(0, 21, n).astype("timedelta64[D]")
+    policy_start = policy_created.astype("datetime64[D]") + rng.integers(0, 15, n).astype("timedelta64[D]")
+    policy_end = policy_start + np.timedelta64(365, "D")
+    policy_number = _join(country, "P", np.char.zfill(ids.astype(str), 10))
+    # a few legacy rows carry a placeholder instead of NULL
+    policy_number = np.where(rng.random(n) < 0.01, "NONE", policy_number)
+
+    first = _choice(rng, FIRST_NAMES, n)
+    last = _choice(rng, LAST_NAMES, n)
+
+    def only_converted(values):
+        out = values.astype(object)
+        out[~converted] = None
+        return out
+
+    return pd.DataFrame({
+        "Brand": brand,
+        "PolicyCreatedDate": only_converted(_fmt_datetime(policy_created)),
+        "QuoteNumber": _join(country, "Q", np.char.zfill(ids.astype(str), 10)),
+        "CreatedDate": _fmt_datetime(created),
+        "QuoteStartDate": _fmt_date(created_day),
+        "QuoteExpiryDate": _fmt_date(created_day + np.timedelta64(30, "D")),
+        "QuoteReceivedMethod": np.where(rng.random(n) < 0.65, "Web", "Phone"),
+        "PolicyNumber": only_converted(policy_number),
+        "PolicyStartDate": only_converted(_fmt_date(policy_start)),
+        "PolicyEndDate": only_converted(_fmt_date(policy_end)),
+        "FullName": _with_nulls(rng, _join(first, " ", last), QUOTE_NULL_RATES["FullName"], BLANK_RATE),
+        "Email": _with_nulls(
+            rng, np.char.lower(_join(first, ".", last, ids, "@example.com")),
+            QUOTE_NULL_RATES["Email"], BLANK_RATE,
+        ),
+        "Address": _with_nulls(
+            rng, _join(rng.integers(1, 300, n), " ", _choice(rng, STREETS, n), " Street"),
+            QUOTE_NULL_RATES["Address"], BLANK_RATE,
+        ),
+        "Suburb": _choice(rng, SUBURBS, n),
+        "PostCode": _with_nulls(
+            rng, np.char.zfill(rng.integers(0, 99_999, n).astype(str), 5),
+            QUOTE_NULL_RATES["PostCode"], BLANK_RATE,
+        ),
+        "ContactNo": _with_nulls(
+            rng, _join("07", rng.integers(100_000_000, 999_999_999, n)),
+            QUOTE_NULL_RATES["ContactNo"], BLANK_RATE,
+        ),
+        "PetName": _with_nulls(rng, _choice(rng, PET_NAMES, n), QUOTE_NULL_RATES["PetName"], BLANK_RATE),
+        "PetType": pet_type,
+        "PetBirthDate": _with_nulls(
+            rng, _fmt_date(created_day - rng.integers(60, 15 * 365, n).astype("timedelta64[D]")),
+            QUOTE_NULL_RATES["PetBirthDate"],
+        ),
+        "BreedName": _with_nulls(rng, _choice(rng, BREEDS, n), QUOTE_NULL_RATES["BreedName"]),
+        "CountryCode": country,
+        "CountryName": pd.Series(country).map(COUNTRY_NAMES).to_numpy(),
+        "ETLDateUploaded": etl_date,
+    })
+
+
+def derive_sales(rng, quotes: pd.DataFrame, etl_date: str) -> pd.DataFrame:
+    sold = quotes[quotes["PolicyCreatedDate"].notna()]
+    n = len(sold)
+    same_channel = rng.random(n) < 0.85
+    channel = np.where(
+        same_channel, sold["QuoteReceivedMethod"].to_numpy(),
+        np.where(sold["QuoteReceivedMethod"].to_numpy() == "Web", "Phone", "Web"),
+    )
+    return pd.DataFrame({
+        "Brand": sold["Brand"].to_numpy(),
+        "PolicyNumber": sold["PolicyNumber"].to_numpy(),
+        "CreatedDate": sold["PolicyCreatedDate"].to_numpy(),
+        "ActualStartDate": sold["PolicyStartDate"].to_numpy(),
+        "ProductName": _join(sold["PetType"].to_numpy(), " ", _choice(rng, PRODUCT_TIERS, n)),
+        "PetType": sold["PetType"].to_numpy(),
+        "ClientName": sold["FullName"].to_numpy(),
+        "PetName": sold["PetName"].to_numpy(),
+        "SaleMethod": channel,
+        "QuoteNumber": sold["QuoteNumber"].to_numpy(),
+        "QuoteCreatedDate": sold["CreatedDate"].to_numpy(),
+        "CountryCode": sold["CountryCode"].to_numpy(),
+        "CountryName": sold["CountryName"].to_numpy(),
+        "ETLDateUploaded": etl_date,
+    })
+
+
+def derive_free_policies(rng, quotes: pd.DataFrame, etl_date: str) -> pd.DataFrame:
+    fp = quotes[rng.random(len(quotes)) < FREE_POLICY_RATE]
+    n = len(fp)
+    country = fp["CountryCode"].to_numpy()
+    created = pd.to_datetime(fp["CreatedDate"]).to_numpy() + rng.integers(0, 5, n).astype("timedelta64[D]")
+    state = np.empty(n, dtype=object)
+    for code, names in STATES.items():
+        mask = country == code
+        state[mask] = _choice(rng, names, int(mask.sum()))
+    # a long tail of sub-agents: a few breeders/vets drive most free policies
+    agent_idx = np.minimum(rng.zipf(1.4, n) - 1, len(AGENTS) - 1)
+    return pd.DataFrame({
+        "Brand": fp["Brand"].to_numpy(),
+        "QuoteNumber": fp["QuoteNumber"].to_numpy(),
+        "PolicyNumber": np.char.replace(fp["QuoteNumber"].to_numpy().astype(str), "Q", "F"),
+        "CreatedDate": _fmt_datetime(created),
+        "SubAgentName": AGENTS[agent_idx],
+        "AgentCategoryId": _choice(rng, AGENT_CATEGORIES, n, AGENT_CATEGORY_WEIGHTS),
+        "PetType": fp["PetType"].to_numpy(),
+        "ProductName": _join("Free 4 Weeks ", fp["PetType"].to_numpy()),
+        "StateName": state,
+        "SaleMethod": np.where(rng.random(n) < 0.3, "Web", "Phone"),
+        "PolicyStatusName": _choice(rng, POLICY_STATUSES, n, POLICY_STATUS_WEIGHTS),
+        "CountryCode": country,
+        "CountryName": fp["CountryName"].to_numpy(),
+        "ETLDateUploaded": etl_date,
+    })
+
+
+def derive_crm(rng, quotes: pd.DataFrame) -> pd.DataFrame:
+    crm = quotes[rng.random(len(quotes)) < CRM_RATE]
+    n = len(crm)
+    converted = crm["PolicyNumber"].notna().to_numpy()
+    names = crm["FullName"].fillna("").str.split(" ", n=1, expand=True).reindex(columns=[0, 1])
+    expired = crm["QuoteExpiryDate"].to_numpy() < date.today().isoformat()
+    has_business = rng.random(n) < 0.35
+    status = _choice(rng, POLICY_STATUSES, n, POLICY_STATUS_WEIGHTS).astype(object)
+    status[~converted] = None
+    return pd.DataFrame({
+        "Brand": crm["Brand"].to_numpy(),
+        # most regions leave Country blank; reports fall back to CountryCode
+        "Country": np.where(rng.random(n) < 0.3, "", crm["CountryName"].to_numpy()),
+        "BusinessName": np.where(has_business, _choice(rng, AGENTS, n), None),
+        "BusinessType": np.where(has_business, _choice(rng, BUSINESS_TYPES, n), None),
+        "CustomerStatus": status,
+        "FreePolicy": np.where(rng.random(n) < FREE_POLICY_RATE, "Yes", "No"),
+        "QuoteStatus": np.where(converted, "Converted", np.where(expired, "Lapsed", "Live")),
+        "QuoteNumber": crm["QuoteNumber"].to_numpy(),
+        "PolicyNumber": crm["PolicyNumber"].to_numpy(),
+        "QuoteReceivedMethod": crm["QuoteReceivedMethod"].to_numpy(),
+        "QuoteCreatedDate": crm["CreatedDate"].to_numpy(),
+        "QuoteStartDate": crm["QuoteStartDate"].to_numpy(),
+        "QuoteEndDate": crm["QuoteExpiryDate"].to_numpy(),
+        "OriginalPolicyStartDate": crm["PolicyStartDate"].to_numpy(),
+        "PolicyEndDate": crm["PolicyEndDate"].to_numpy(),
+        "FirstName": names[0].to_numpy(),
+        "LastName": names[1].to_numpy(),
+        "Email": crm["Email"].to_numpy(),
+        "ContactNo": crm["ContactNo"].to_numpy(),
+        "EmailConcent": np.where(rng.random(n) < 0.7, "Yes", "No"),
+        "PetName": crm["PetName"].to_numpy(),
+        "PetType": crm["PetType"].to_numpy(),
+        "PetBirthDate": crm["PetBirthDate"].to_numpy(),
+        "PetBreedId": rng.integers(1, 400, n),
+        "BreedName": crm["BreedName"].to_numpy(),
+        "CountryCode": crm["CountryCode"].to_numpy(),
+    })
+
+
+def iter_chunks(cfg: GeneratorConfig) -> Iterator[Dict[str, pd.DataFrame]]:
+    """Yields {table_name: DataFrame} per chunk of cfg.chunk_size quotes."""
+    rng = np.random.default_rng(cfg.seed)
+    day_p = _day_weights(cfg)
+    etl_date = date.today().isoformat()
+    for first_id in range(1, cfg.quotes + 1, cfg.chunk_size):
+        n = min(cfg.chunk_size, cfg.quotes - first_id + 1)
+        quotes = generate_quote_chunk(rng, cfg, day_p, first_id, n, etl_date)
+        yield {
+            "Quote": quotes,
+            "Sales": derive_sales(rng, quotes, etl_date),
+            "FreePolicySales": derive_free_policies(rng, quotes, etl_date),
+            "CRM": derive_crm(rng, quotes),
+        }
+
+
+def _insert(cursor, table: str, df: pd.DataFrame) -> None:
+    columns = [col for col, _ in TABLES[table]]
+    frame = df[columns].astype(object).where(df[columns].notna(), None)
+    placeholders = ", ".join("?" for _ in columns)
+    cursor.executemany(
+        f'INSERT INTO "{table}" VALUES ({placeholders})',
+        frame.itertuples(index=False, name=None),
+    )
+
+
+def build_database(path: str, cfg: GeneratorConfig, tables: Optional[Sequence[str]] = None,
+    indexes: bool = True) -> Dict[str, int]:
+    """
+    (Re)creates the stand-in tables at `path` and fills them. Indexes are
+    built after the load unless `indexes` is False (the bare tables, as MIS
+    has them before app.db.migrations runs). Returns row counts per table.
+    """
+    tables: List[str] = list(tables or TABLES)
+    conn = sqlite3.connect(path)
+    counts = {t: 0 for t in tables}
+    try:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode=OFF")
+        cursor.execute("PRAGMA synchronous=OFF")
+        create_tables(cursor, tables)
+        started = time.perf_counter()
+        for chunk in iter_chunks(cfg):
+            for table in tables:
+                _insert(cursor, table, chunk[table])
+                counts[table] += len(chunk[table])
+            conn.commit()
+            logger.info(
+                "Generated %s quotes (%.0f rows/s)",
+                f"{counts.get('Quote', 0):,}",
+                sum(counts.values()) / (time.perf_counter() - started),
+            )
+        if indexes:
+            create_indexes(cursor, tables)
+        cursor.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
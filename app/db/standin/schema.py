@@ -0,0 +1,128 @@
+"""
+MIS reporting tables as loaded by the ETL endpoints (column names match the
+extraction queries plus CountryCode/CountryName/ETLDateUploaded).
+
+Dates are TEXT in ISO form so '>= ?' comparisons against 'YYYY-MM-DD'
+parameters behave like SQL Server datetime comparisons.
+"""
+from typing import Dict, List, Tuple
+
+_QUOTE = [
+    ("Brand", "TEXT"),
+    ("PolicyCreatedDate", "TEXT"),
+    ("QuoteNumber", "TEXT"),
+    ("CreatedDate", "TEXT"),
+    ("QuoteStartDate", "TEXT"),
+    ("QuoteExpiryDate", "TEXT"),
+    ("QuoteReceivedMethod", "TEXT"),
+    ("PolicyNumber", "TEXT"),
+    ("PolicyStartDate", "TEXT"),
+    ("PolicyEndDate", "TEXT"),
+    ("FullName", "TEXT"),
+    ("Email", "TEXT"),
+    ("Address", "TEXT"),
+    ("Suburb", "TEXT"),
+    ("PostCode", "TEXT"),
+    ("ContactNo", "TEXT"),
+    ("PetName", "TEXT"),
+    ("PetType", "TEXT"),
+    ("PetBirthDate", "TEXT"),
+    ("BreedName", "TEXT"),
+    ("CountryCode", "TEXT"),
+    ("CountryName", "TEXT"),
+    ("ETLDateUploaded", "TEXT"),
+]
+
+_SALES = [
+    ("Brand", "TEXT"),
+    ("PolicyNumber", "TEXT"),
+    ("CreatedDate", "TEXT"),
+    ("ActualStartDate", "TEXT"),
+    ("ProductName", "TEXT"),
+    ("PetType", "TEXT"),
+    ("ClientName", "TEXT"),
+    ("PetName", "TEXT"),
+    ("SaleMethod", "TEXT"),
+    ("QuoteNumber", "TEXT"),
+    ("QuoteCreatedDate", "TEXT"),
+    ("CountryCode", "TEXT"),
+    ("CountryName", "TEXT"),
+    ("ETLDateUploaded", "TEXT"),
+]
+
+_FREE_POLICY_SALES = [
+    ("Brand", "TEXT"),
+    ("QuoteNumber", "TEXT"),
+    ("PolicyNumber", "TEXT"),
+    ("CreatedDate", "TEXT"),
+    ("SubAgentName", "TEXT"),
+    ("AgentCategoryId", "INTEGER"),
+    ("PetType", "TEXT"),
+    ("ProductName", "TEXT"),
+    ("StateName", "TEXT"),
+    ("SaleMethod", "TEXT"),
+    ("PolicyStatusName", "TEXT"),
+    ("CountryCode", "TEXT"),
+    ("CountryName", "TEXT"),
+    ("ETLDateUploaded", "TEXT"),
+]
+
+_CRM = [
+    ("Brand", "TEXT"),
+    ("Country", "TEXT"),
+    ("BusinessName", "TEXT"),
+    ("BusinessType", "TEXT"),
+    ("CustomerStatus", "TEXT"),
+    ("FreePolicy", "TEXT"),
+    ("QuoteStatus", "TEXT"),
+    ("QuoteNumber", "TEXT"),
+    ("PolicyNumber", "TEXT"),
+    ("QuoteReceivedMethod", "TEXT"),
+    ("QuoteCreatedDate", "TEXT"),
+    ("QuoteStartDate", "TEXT"),
+    ("QuoteEndDate", "TEXT"),
+    ("OriginalPolicyStartDate", "TEXT"),
+    ("PolicyEndDate", "TEXT"),
+    ("FirstName", "TEXT"),
+    ("LastName", "TEXT"),
+    ("Email", "TEXT"),
+    ("ContactNo", "TEXT"),
+    ("EmailConcent", "TEXT"),
+    ("PetName", "TEXT"),
+    ("PetType", "TEXT"),
+    ("PetBirthDate", "TEXT"),
+    ("PetBreedId", "INTEGER"),
+    ("BreedName", "TEXT"),
+    ("CountryCode", "TEXT"),
+]
+
+TABLES: Dict[str, List[Tuple[str, str]]] = {
+    "Quote": _QUOTE,
+    "Sales": _SALES,
+    "FreePolicySales": _FREE_POLICY_SALES,
+    "CRM": _CRM,
+}
+
+# Mirrors the date-range + region access path every report uses
+INDEXES: Dict[str, List[Tuple[str, ...]]] = {
+    "Quote": [("CreatedDate",), ("CountryCode", "CreatedDate")],
+    "Sales": [("CreatedDate",), ("CountryCode", "CreatedDate")],
+    "FreePolicySales": [("CreatedDate",), ("CountryCode", "CreatedDate")],
+    "CRM": [("QuoteCreatedDate",), ("CountryCode", "QuoteCreatedDate")],
+}
+
+
+def create_tables(cursor, tables=None) -> None:
+    for name in tables or TABLES:
+        cursor.execute(f'DROP TABLE IF EXISTS "{name}"')
+        columns = ", ".join(f'"{col}" {col_type}' for col, col_type in TABLES[name])
+        cursor.execute(f'CREATE TABLE "{name}" ({columns})')
+
+
+def create_indexes(cursor, tables=None) -> None:
+    for name in tables or TABLES:
+        for cols in INDEXES.get(name, []):
+            index_name = f"IX_{name}_{'_'.join(cols)}"
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{name}" ({", ".join(cols)})'
+            )
@@ -0,0 +1,337 @@
+"""
+Synthetic UTS (policy admin) source tables for the UK/DE/AT extraction
+queries in app.db.sql_server_queries.
+
+Only the columns those queries touch are generated. The rows are shaped to
+hit every branch the queries filter or dedupe on: test and internal
+emails, the same email/pet quoted several times a day, BB (2053) quotes
+with activity answers (NULL, repeated ids, unknown ids), the Phoenix
+migration HearAboutUs rows and dangling HearAboutUs ids, quotes converted
+into several PolicyActivity rows, breed ids of 0/NULL, new horse products
+with and without an executive, child quotes, and CreatedDate values on
+either side of midnight.
+
+    python -m app.db.standin.uts --path bench_data/uts_standin.db --quotes 200000
+
+Schema-qualified names follow the dialect shim: [Master].[Breed] is the
+table Master_Breed, [dbo].[User] is User.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.db.standin.generator import FIRST_NAMES, LAST_NAMES, PET_NAMES, BREEDS, SUBURBS, _choice, _fmt_date, _fmt_datetime
+
+logger = logging.getLogger(__name__)
+
+I, T = "INTEGER", "TEXT"
+UTS_TABLES: Dict[str, List[Tuple[str, str]]] = {
+    "Quote": [
+        ("Id", I), ("QuoteNumber", T), ("ClientId", I), ("ProductId", I), ("Title", T),
+        ("FirstName", T), ("LastName", T), ("Email", T), ("Address1", T), ("Address2", T),
+        ("Suburb", T), ("PostCode", T), ("Mobile", T), ("PrimaryContactNumber", T),
+        ("PetName", T), ("PetBreedId", I), ("PetSeconderyBreedId", I), ("PetBreedId3", I),
+        ("Petbirthdate", T), ("CreatedDate", T), ("QuoteDate", T), ("ExpireDate", T),
+        ("CreatedBy", I), ("QuoteSaveFrom", I), ("QuoteParentId", I), ("HearAboutUs", I),
+        ("IsPetIdProduct", I), ("ExecutiveId", I), ("SubAgentId", I), ("PetTypeId", I),
+    ],
+    "Client": [
+        ("Id", I), ("Title", T), ("FirstName", T), ("LastName", T), ("Email", T),
+        ("Address1", T), ("Address2", T), ("Suburb", T), ("Postcode", T),
+        ("PrimaryContactNumber", T), ("AlternativeContactNumber", T), ("SendDocumentOnEmail", I),
+    ],
+    "Policy": [
+        ("Id", I), ("PolicyNumber", T), ("ClientId", I), ("CreatedDate", T),
+        ("ActualStartDate", T), ("ActualEndDate", T), ("IsPetIdProduct", I),
+        ("IsFreeProduct", I), ("InsuredName", T), ("PetName", T), ("ExecutiveId", I),
+        ("PolicyStatusId", I),
+    ],
+    "PolicyActivity": [
+        ("Id", I), ("PolicyId", I), ("QuoteId", I), ("PolicyNumber", T),
+        ("TransactionTypeId", I), ("ProductId", I), ("CreatedDate", T),
+    ],
+    "PolicyCancellation": [("Id", I), ("PolicyId", I), ("CreatedDate", T)],
+    "QuoteQuestionAnswer": [("Id", I), ("QuoteId", I), ("QuestionId", I)],
+    "QuoteQuestionAnswerDetail": [("Id", I), ("QuoteQuestionAnswerId", I), ("QuestionAnswer", T)],
+    "QuestionDetail": [("Id", I), ("QuestionDetailName", T)],
+    "HearAboutUs": [("Id", I), ("Name", T)],
+    "VuePetType": [("PetType_ID", I), ("PetTypeName", T)],
+    "Product": [("Id", I), ("ProductName", T), ("ProductCode", T), ("IsFreeProduct", I)],
+    "User": [("Id", I), ("FirstName", T)],
+    "SubAgent": [("Id", I), ("Name", T), ("AgentCategoryId", I), ("StateId", I), ("Email", T)],
+    "Master_Breed": [("Id", I), ("BreedName", T)],
+    "Master_State": [("Id", I), ("StateName", T)],
+    "Master_PolicyStatus": [("Id", I), ("PolicyStatusName", T)],
+}
+
+# Foreign keys the queries join or correlate on
+UTS_INDEXES: Dict[str, List[Tuple[str, ...]]] = {
+    "Quote": [("CreatedDate",)],
+    "Policy": [("CreatedDate",)],
+    "PolicyActivity": [("QuoteId",), ("PolicyId",)],
+    "PolicyCancellation": [("PolicyId",)],
+    "QuoteQuestionAnswer": [("QuoteId", "QuestionId")],
+    "QuoteQuestionAnswerDetail": [("QuoteQuestionAnswerId",)],
+}
+
+BB_PRODUCT = 2053
+OLD_HORSE, EXOTIC = [2049, 2050, 2051, 2052], [2, 3, 4]
+DOG, CAT = [19, 20, 21, 22, 23, 25, 26, 28, 29], [6, 7, 8, 9, 10, 11, 12, 13, 14]
+NEW_HORSE = list(range(2031, 2048))
+OTHER_PRODUCTS = [1, 30, 2100]  # in no query's product list
+BB_ACTIVITY_QUESTION = 33024
+HEAR_ABOUT_US = [
+    "Vet", "Google", "Friend",
+    "Omnis 7 Commercial / Phoenix Migration Renewal",
+    "Omnis 7 Commercial / Phoenix Migration Mid-Term",
+]
+PET_TYPES = {3: "Horse", 4: "Exotic", 6: "Dog", 7: "Cat"}
+ACTIVITIES = [
+    "Boarding", "Grooming", "Dog Walking", "Pet Sitting", "Training", "Day Care",
+    "Breeding", "Pet Taxi", "Hydrotherapy", "Show Handling", "Retail", "Mobile Grooming",
+]
+PRODUCT_CODES = {"dog": DOG, "cat": CAT, "horse": OLD_HORSE + NEW_HORSE, "exotic": EXOTIC, "bb_com": [BB_PRODUCT]}
+
+
+@dataclass
+class UTSConfig:
+    quotes: int = 200_000
+    start: date = date(2024, 1, 1)
+    end: date = date(2024, 12, 31)
+    seed: int = 42
+
+
+def _maybe(rng, values: np.ndarray, null_rate: float) -> np.ndarray:
+    out = values.astype(object)
+    out[rng.random(len(out)) < null_rate] = None
+    return out
+
+
+def _lookups() -> Dict[str, pd.DataFrame]:
+    products = [(pid, f"{code.title()} {pid}", f"{code}_{pid}", 0) for code, ids in PRODUCT_CODES.items() for pid in ids]
+    products += [(pid, f"Other {pid}", f"misc_{pid}", int(pid == OTHER_PRODUCTS[0])) for pid in OTHER_PRODUCTS]
+    return {
+        "QuestionDetail": pd.DataFrame({"Id": np.arange(1, len(ACTIVITIES) + 1), "QuestionDetailName": ACTIVITIES}),
+        "HearAboutUs": pd.DataFrame({"Id": np.arange(1, len(HEAR_ABOUT_US) + 1), "Name": HEAR_ABOUT_US}),
+        "VuePetType": pd.DataFrame({"PetType_ID": list(PET_TYPES), "PetTypeName": list(PET_TYPES.values())}),
+        "Product": pd.DataFrame(products, columns=["Id", "ProductName", "ProductCode", "IsFreeProduct"]),
+        "User": pd.DataFrame({"Id": np.arange(1, 21), "FirstName": ["FIT", "Web"] + [str(n) for n in FIRST_NAMES[:18]]}),
+        "SubAgent": pd.DataFrame({
+            "Id": np.arange(1, 51), "Name": [f"Agent {i:02d}" for i in range(1, 51)],
+            "AgentCategoryId": np.arange(50) % 4 + 5, "StateId": np.arange(50) % 4 + 1,
+            "Email": [None if i % 9 == 0 else ("ops@prowerse.com" if i % 13 == 0 else f"agent{i}@example.com") for i in range(1, 51)],
+        }),
+        "Master_Breed": pd.DataFrame({"Id": np.arange(1, len(BREEDS) + 1), "BreedName": BREEDS}),
+        "Master_State": pd.DataFrame({"Id": [1, 2, 3, 4], "StateName": ["England", "Scotland", "Wales", "Northern Ireland"]}),
+        "Master_PolicyStatus": pd.DataFrame({"Id": [1, 2, 3], "PolicyStatusName": ["Active", "Cancel", "Expired"]}),
+    }
+
+
+def generate(cfg: UTSConfig) -> Dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(cfg.seed)
+    n = cfg.quotes
+    ids = np.arange(1, n + 1)
+    days = (cfg.end - cfg.start).days + 1
+
+    product_pool = np.array(OLD_HORSE + EXOTIC + DOG + CAT + NEW_HORSE + [BB_PRODUCT] + OTHER_PRODUCTS)
+    weights = np.array(
+        [1.0] * len(OLD_HORSE) + [1.0] * len(EXOTIC) + [6.0] * len(DOG) + [4.0] * len(CAT)
+        + [0.6] * len(NEW_HORSE) + [20.0] + [0.5] * len(OTHER_PRODUCTS)
+    )
+    product = _choice(rng, product_pool, n, weights / weights.sum())
+
+    # a few customers quote the same pet several times a day: small email and
+    # pet pools per day, and 4% of timestamps pinned to either side of midnight
+    day = rng.integers(0, days, n)
+    seconds = np.clip(rng.normal(13 * 3600, 4 * 3600, n), 0, 86_399).astype("int64")
+    edge = rng.random(n)
+    seconds = np.where(edge < 0.02, 0, np.where(edge < 0.04, 86_399, seconds))
+    created = np.datetime64(cfg.start, "s") + day.astype("timedelta64[D]") + seconds.astype("timedelta64[s]")
+
+    first = _choice(rng, FIRST_NAMES, n)
+    last = _choice(rng, LAST_NAMES, n)
+    email = np.char.add(np.char.add(np.char.lower(first.astype(str)), rng.integers(0, 40, n).astype(str)), "@example.com")
+    roll = rng.random(n)
+    email = np.where(roll < 0.01, "sales@petcovergroup.com", np.where(roll < 0.015, "qa@prowerse.com", email))
+    first = np.where(rng.random(n) < 0.01, "Test", first)
+    pet = _choice(rng, PET_NAMES, n)
+    pet = np.where(rng.random(n) < 0.005, "testpet", pet)
+
+    clients = max(1, n // 2)
+    client_id = rng.integers(1, clients + 1, n)
+    breeds = np.array([0] + list(range(1, len(BREEDS) + 1)))
+    save_from = _maybe(rng, rng.integers(0, 4, n), 0.02)
+    new_horse = np.isin(product, NEW_HORSE)
+
+    quotes = pd.DataFrame({
+        "Id": ids,
+        "QuoteNumber": np.char.add("UKQ", np.char.zfill(ids.astype(str), 9)),
+        "ClientId": client_id,
+        "ProductId": product,
+        "Title": _maybe(rng, _choice(rng, np.array(["Mr", "Mrs", "Ms", "Dr"]), n), 0.2),
+        "FirstName": _maybe(rng, first, 0.05),
+        "LastName": _maybe(rng, last, 0.05),
+        "Email": email,
+        "Address1": _maybe(rng, np.char.add(rng.integers(1, 200, n).astype(str), " High Street"), 0.1),
+        "Address2": _maybe(rng, _choice(rng, np.array(["Flat 1", "Unit 2", ""]), n), 0.5),
+        "Suburb": _maybe(rng, _choice(rng, SUBURBS, n), 0.1),
+        "PostCode": _maybe(rng, np.char.add("SW", rng.integers(1, 20, n).astype(str)), 0.1),
+        "Mobile": _maybe(rng, np.char.add("07", rng.integers(100_000_000, 999_999_999, n).astype(str)), 0.4),
+        "PrimaryContactNumber": _maybe(rng, np.char.add("020", rng.integers(10_000_000, 99_999_999, n).astype(str)), 0.5),
+        "PetName": pet,
+        "PetBreedId": _maybe(rng, _choice(rng, breeds, n), 0.1),
+        "PetSeconderyBreedId": _maybe(rng, _choice(rng, breeds, n), 0.6),
+        "PetBreedId3": _maybe(rng, _choice(rng, breeds, n), 0.8),
+        "Petbirthdate": _maybe(rng, _fmt_date(created - rng.integers(60, 4000, n).astype("timedelta64[D]")), 0.05),
+        "CreatedDate": _fmt_datetime(created),
+        "QuoteDate": _fmt_date(created + rng.integers(0, 30, n).astype("timedelta64[D]")),
+        "ExpireDate": _fmt_date(created + rng.integers(30, 60, n).astype("timedelta64[D]")),
+        "CreatedBy": _maybe(rng, rng.integers(1, 21, n), 0.02),
+        "QuoteSaveFrom": save_from,
+        "QuoteParentId": np.where(rng.random(n) < 0.05, np.maximum(ids - 1, 1), None),
+        # 0 and 9+ are dangling ids, so H is NULL for them
+        "HearAboutUs": _maybe(rng, rng.integers(0, len(HEAR_ABOUT_US) + 1, n) + (rng.random(n) < 0.02) * 9, 0.05),
+        "IsPetIdProduct": _maybe(rng, rng.integers(0, 2, n), 0.1),
+        "ExecutiveId": np.where(new_horse & (rng.random(n) < 0.3), None, rng.integers(1, 21, n)),
+        "SubAgentId": _maybe(rng, rng.integers(1, 51, n), 0.3),
+    })
+
+    clients_df = pd.DataFrame({
+        "Id": np.arange(1, clients + 1),
+        "Title": _choice(rng, np.array(["Mr", "Mrs", "Ms"]), clients),
+        "FirstName": _choice(rng, FIRST_NAMES, clients),
+        "LastName": _choice(rng, LAST_NAMES, clients),
+        "Email": np.char.add(rng.integers(0, 10**6, clients).astype(str), "@example.org"),
+        "Address1": _maybe(rng, np.char.add(rng.integers(1, 99, clients).astype(str), " Park Road"), 0.05),
+        "Address2": _maybe(rng, np.full(clients, "Apt 3"), 0.7),
+        "Suburb": _choice(rng, SUBURBS, clients),
+        "Postcode": np.char.add("N", rng.integers(1, 30, clients).astype(str)),
+        "PrimaryContactNumber": _maybe(rng, np.char.add("01", rng.integers(10**8, 10**9, clients).astype(str)), 0.3),
+        "AlternativeContactNumber": _maybe(rng, np.char.add("03", rng.integers(10**8, 10**9, clients).astype(str)), 0.6),
+    })
+    clients_df.loc[rng.random(clients) < 0.01, "FirstName"] = "test"
+
+    # BB activity answers: most BB quotes answer question 33024, some another
+    # question; answers may be NULL, repeat an id or name an unknown id
+    bb = ids[product == BB_PRODUCT]
+    question = np.where(rng.random(len(bb)) < 0.9, BB_ACTIVITY_QUESTION, 33025)
+    answers = []
+    for k in rng.integers(1, 4, len(bb)):
+        picked = np.sort(rng.choice(len(ACTIVITIES) + 2, size=k, replace=False) + 1)
+        answers.append(",".join(map(str, picked)))
+    answers = np.array(answers, dtype=object)
+    answers[rng.random(len(bb)) < 0.05] = None
+    repeat = rng.random(len(bb)) < 0.03
+    answers[repeat] = [None if a is None else f"{a},{a.split(',')[0]}" for a in answers[repeat]]
+    qqa = pd.DataFrame({"Id": np.arange(1, len(bb) + 1), "QuoteId": bb, "QuestionId": question})
+    qqad = pd.DataFrame({"Id": qqa["Id"], "QuoteQuestionAnswerId": qqa["Id"], "QuestionAnswer": answers})
+
+    # ~20% convert; some policies get an endorsement activity too
+    converted = ids[rng.random(n) < 0.2]
+    m = len(converted)
+    conv_created = created[converted - 1]
+    policy_created = conv_created + rng.integers(0, 14 * 86_400, m).astype("timedelta64[s]")
+    start = policy_created.astype("datetime64[D]") + rng.integers(0, 15, m).astype("timedelta64[D]")
+    policy_ids = np.arange(1, m + 1)
+    policy_numbers = np.char.add("UKP", np.char.zfill(policy_ids.astype(str), 9))
+    policies = pd.DataFrame({
+        "Id": policy_ids,
+        "PolicyNumber": np.where(rng.random(m) < 0.005, np.char.add("TEST", policy_ids.astype(str)), policy_numbers),
+        "ClientId": client_id[converted - 1],
+        "CreatedDate": _fmt_datetime(policy_created),
+        "ActualStartDate": _fmt_date(start),
+        "ActualEndDate": _fmt_date(start + np.timedelta64(365, "D")),
+        "IsPetIdProduct": _maybe(rng, rng.integers(0, 2, m), 0.1),
+        "IsFreeProduct": _maybe(rng, (rng.random(m) < 0.08).astype(int), 0.1),
+        "InsuredName": np.where(rng.random(m) < 0.005, "Test Insured", "Insured"),
+        "PetName": pet[converted - 1],
+        "ExecutiveId": _maybe(rng, rng.integers(1, 21, m), 0.05),
+        "PolicyStatusId": rng.integers(1, 4, m),
+    })
+    endorsed = rng.random(m) < 0.04
+    activities = pd.DataFrame({
+        "PolicyId": np.concatenate([policy_ids, policy_ids[endorsed]]),
+        "QuoteId": np.concatenate([converted, converted[endorsed]]),
+        "PolicyNumber": np.concatenate([policy_numbers, policy_numbers[endorsed]]),
+        "TransactionTypeId": np.concatenate([np.ones(m, int), np.full(endorsed.sum(), 2)]),
+        "ProductId": np.concatenate([product[converted - 1], product[converted - 1][endorsed]]),
+    })
+    activities.insert(0, "Id", np.arange(1, len(activities) + 1))
+    # columns only the CRM query reads, from their own stream so the tables
+    # above stay as they were for a given seed
+    crm_rng = np.random.default_rng([cfg.seed, 1])
+    quotes["PetTypeId"] = crm_rng.choice(list(PET_TYPES), n)
+    clients_df["SendDocumentOnEmail"] = _maybe(crm_rng, (crm_rng.random(clients) < 0.7).astype(int), 0.1)
+    activities["CreatedDate"] = _fmt_datetime(np.concatenate([
+        policy_created,
+        policy_created[endorsed] + crm_rng.integers(1, 200, endorsed.sum()).astype("timedelta64[D]"),
+    ]))
+    cancelled = policy_ids[rng.random(m) < 0.06]
+    cancellations = pd.DataFrame({
+        "Id": np.arange(1, len(cancelled) + 1),
+        "PolicyId": cancelled,
+        # half on the day the policy was written (excluded from sales), half later
+        "CreatedDate": _fmt_datetime(
+            policy_created[cancelled - 1]
+            + (rng.random(len(cancelled)) < 0.5) * rng.integers(2, 90, len(cancelled)).astype("timedelta64[D]")
+        ),
+    })
+
+    return {
+        "Quote": quotes, "Client": clients_df, "Policy": policies, "PolicyActivity": activities,
+        "PolicyCancellation": cancellations, "QuoteQuestionAnswer": qqa, "QuoteQuestionAnswerDetail": qqad,
+        **_lookups(),
+    }
+
+
+def build_uts_database(path: str, cfg: UTSConfig) -> Dict[str, int]:
+    """(Re)creates the UTS source tables at `path`. Returns row counts per table."""
+    frames = generate(cfg)
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.cursor()
+        for table, columns in UTS_TABLES.items():
+            cursor.execute(f'DROP TABLE IF EXISTS "{table}"')
+            cursor.execute(f'CREATE TABLE "{table}" ({", ".join(f"{c} {t}" for c, t in columns)}, PRIMARY KEY ({columns[0][0]}))')
+            names = [c for c, _ in columns]
+            frame = frames[table][names].astype(object)
+            frame = frame.where(frame.notna(), None)
+            cursor.executemany(
+                f'INSERT INTO "{table}" VALUES ({", ".join("?" for _ in names)})',
+                frame.itertuples(index=False, name=None),
+            )
+        for table, indexes in UTS_INDEXES.items():
+            for cols in indexes:
+                cursor.execute(f'CREATE INDEX "IX_{table}_{"_".join(cols)}" ON "{table}" ({", ".join(cols)})')
+        cursor.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    return {table: len(frame) for table, frame in frames.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the synthetic UTS source stand-in database.")
+    parser.add_argument("--path", default="bench_data/uts_standin.db")
+    parser.add_argument("--quotes", type=int, default=200_000)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 1, 1))
+    parser.add_argument("--end", type=date.fromisoformat, default=date(2024, 12, 31))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    os.makedirs(os.path.dirname(args.path) or ".", exist_ok=True)
+    counts = build_uts_database(args.path, UTSConfig(args.quotes, args.start, args.end, args.seed))
+    for table, count in counts.items():
+        print(f"{table}: {count:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,62 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+import anyio
+from fastapi import Depends, FastAPI, Header, Query, Response
+from app.core.config import settings
+from app.core.dependencies import require_authentication
 from app.core.extensions import add_extensions
+from app.core.metrics import label_route, render_metrics
 from app.api.api_router import api_router
+from app.db import migrations
+from app.db.replica import get_report_engine
+from app.services.email_service.outbox import email_outbox
+from app.services.etl_jobs import etl_jobs
+from app.services.fact_store import fact_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.mis_migrate_on_startup:
+        # index builds can take minutes on a full MIS; the worker serves once they are done
+        await anyio.to_thread.run_sync(migrations.migrate)
+    # Background jobs that live as long as the worker process
+    email_outbox.start()
+    tasks = []
+    if settings.fact_store_enabled:
+        tasks.append(asyncio.create_task(fact_store.refresh_forever(get_report_engine)))
+    if settings.etl_scheduler_enabled:
+        tasks.append(asyncio.create_task(etl_jobs.run_scheduler()))
+    yield
+    for task in tasks:
+        task.cancel()
+    # running ETL jobs roll back rather than die mid-transaction
+    await etl_jobs.shutdown()
+    await email_outbox.shutdown()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(label_route)])
 
 # Sanity check
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+async def metrics_auth(
+    authorization: str | None = Header(None),
+    auth_token: str | None = Query(None),
+):
+    # scrape with a bearer token (Prometheus `authorization`), unless opened up
+    if settings.metrics_require_auth:
+        await require_authentication(authorization, auth_token)
+
+
+# Prometheus scrape target
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(metrics_auth)])
+def metrics():
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 # Add extensions
 add_extensions(app)
 
@@ -0,0 +1,148 @@
+"""
+Total-count cache for the paged reports.
+
+Every page of a report used to recount the whole filtered window. Totals are
+now cached per (table, count SQL, canonical filter set) and tagged with the
+table's data version, which ETL.load bumps after each successful load. An
+entry only answers exact requests while its version is current and it is
+younger than count_cache_ttl_seconds (the TTL bounds staleness on workers
+that did not run the load themselves).
+
+Callers can skip counting entirely (`include_total=False`) or accept an
+estimate (`approximate=True`): the fact store's in-memory rollup when it
+covers the window, else the last exact count for the same filters, however
+old, and only then a real COUNT.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.fact_store import fact_store
+from app.utils.report_helpers import first_cell_int, read_df
+
+_WS = re.compile(r"\s+")
+
+
+def canonical_filters(**filters: Any) -> Tuple[Tuple[str, Any], ...]:
+    """Order- and case-insensitive key: 'UK,AU' and ['au', 'uk'] count the same rows."""
+    items = []
+    for name, value in sorted(filters.items()):
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted({str(v).strip().upper() for v in value if str(v).strip()}))
+        elif value is not None:
+            value = str(value)
+        items.append((name, value))
+    return tuple(items)
+
+
+class CountCache:
+    def __init__(self):
+        self._entries: "OrderedDict[tuple, Tuple[int, int, float]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    # -------- data versions --------
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def bump(self, table: str) -> None:
+        """Called after a load; every cached total for `table` becomes stale."""
+        with self._lock:
+            self._versions[table] = self.version(table) + 1
+
+    # -------- entries --------
+    def _get(self, key: tuple, table: str, exact: bool) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            version, value, stored_at = entry
+            if exact and (
+                version != self.version(table)
+                or time.monotonic() - stored_at > settings.count_cache_ttl_seconds
+            ):
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _put(self, key: tuple, table: str, value: int) -> None:
+        with self._lock:
+            self._entries[key] = (self.version(table), value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.count_cache_max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def total(
+        self,
+        engine,
+        table: str,
+        count_sql: str,
+        params: Sequence[Any],
+        filters: Dict[str, Any],
+        include_total: bool = True,
+        approximate: bool = False,
+        estimate: Optional[Callable[[], Optional[int]]] = None,
+    ) -> Tuple[Optional[int], bool]:
+        """Returns (total, is_approximate); total is None when not requested."""
+        if not include_total:
+            return None, False
+        key = (table, _WS.sub(" ", count_sql).strip(), canonical_filters(**filters))
+
+        cached = self._get(key, table, exact=True)
+        if cached is not None:
+            return cached, False
+
+        if approximate:
+            estimated = estimate() if estimate is not None else None
+            if estimated is None:
+                estimated = self._get(key, table, exact=False)
+            if estimated is not None:
+                return estimated, True
+
+        # identical counts in flight (a dashboard opening several tabs) share one query
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), False
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = first_cell_int(await read_df(engine, count_sql, params), default=0)
+            self._put(key, table, value)
+            future.set_result(value)
+            return value, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+
+def fact_store_estimate(
+    table: str, start: str, end_exclusive: str,
+    country_codes=(), brands=(), pets=(),
+    clamped_days: Optional[Tuple[int, int]] = None,
+) -> Callable[[], Optional[int]]:
+    """Estimate from the in-memory rollup; None when it does not cover the window."""
+    def _estimate() -> Optional[int]:
+        facts = fact_store.covering(table, start)
+        if facts is None:
+            return None
+        return facts.count(start, end_exclusive, country_codes, brands, pets, clamped_days=clamped_days)
+
+    return _estimate
+
+
+count_cache = CountCache()
@@ -0,0 +1,73 @@
+"""
+The two rankings of CRM_Mkt_Query, applied in pandas to the rows of
+CRM_Mkt_Candidates_Query (one per quote) after a region's shards are merged.
+
+1. One quote per pet (FirstName, LastName, PetName): converted quotes first,
+   then the newest QuoteDate, then quotes with a breed, then the lowest id.
+2. One row per policy, or per pet when there is no policy: the latest
+   policy start, then the latest quote.
+
+Names are compared the way the UTS collation compares them (case-insensitive,
+trailing spaces ignored), so the pandas step picks the rows SQL Server would.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# candidate-only columns, dropped once the rows are picked
+RANKING_COLUMNS = ("QuoteId", "Converted")
+
+
+def _collation_key(values: pd.Series) -> pd.Series:
+    return values.astype("string").str.rstrip(" ").str.casefold()
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values, errors="coerce")
+
+
+def dedupe_crm(candidates: pd.DataFrame) -> pd.DataFrame:
+    """CRM rows picked from `candidates`, without the ranking columns."""
+    if candidates.empty:
+        return candidates.drop(columns=list(RANKING_COLUMNS), errors="ignore")
+
+    first = _collation_key(candidates["FirstName"])
+    last = _collation_key(candidates["LastName"])
+    pet = _collation_key(candidates["PetName"])
+
+    # 1) best quote per pet; NaT sorts last, as NULL does in a DESC ORDER BY
+    ranking = pd.DataFrame({
+        "first": first, "last": last, "pet": pet,
+        "converted": candidates["Converted"].fillna(0).astype(bool),
+        "quote_date": _dates(candidates["QuoteStartDate"]),
+        "has_breed": candidates["PetBreedId"].notna(),
+        "quote_id": candidates["QuoteId"],
+    }, index=candidates.index)
+    ranking = ranking.sort_values(
+        ["converted", "quote_date", "has_breed", "quote_id"],
+        ascending=[False, False, False, True], na_position="last", kind="stable",
+    )
+    picked = ranking.drop_duplicates(["first", "last", "pet"]).index
+
+    # 2) one row per policy, else per pet (CONCAT(FirstName, '|', LastName, '|', PetName))
+    rows = candidates.loc[picked]
+    has_policy = rows["PolicyNumber"].notna().to_numpy()
+    pet_key = first[picked].fillna("") + "|" + last[picked].fillna("") + "|" + pet[picked].fillna("")
+    group = np.where(has_policy, _collation_key(rows["PolicyNumber"]).to_numpy(), pet_key.to_numpy())
+    policy_start = _dates(rows["OriginalPolicyStartDate"]).where(has_policy)
+    final = pd.DataFrame({
+        "group": group,
+        "policy_start": policy_start,
+        "quote_created": _dates(rows["QuoteCreatedDate"]),
+    }, index=rows.index).sort_values(
+        ["policy_start", "quote_created"], ascending=False, na_position="last", kind="stable",
+    ).drop_duplicates("group")
+
+    result = candidates.loc[final.index.sort_values()].drop(columns=list(RANKING_COLUMNS))
+    logger.info(
+        "CRM dedup: %d candidate quotes -> %d pets -> %d rows", len(candidates), len(picked), len(result)
+    )
+    return result
@@ -0,0 +1,107 @@
+"""
+Per-table data versions, stored in MIS (dbo.ETLDataVersion).
+
+Report data only changes when an ETL load completes. ETL.load bumps the
+loaded table's version, and the report endpoints build their ETags from
+the versions of the tables they read (app.core.dependencies.conditional_get).
+The versions live in MIS rather than in memory, so a load run by another
+worker or by the scheduler changes every worker's ETags. Each worker
+re-reads them at most every report_etag_version_refresh_seconds, which is
+how long a worker can keep answering 304 for data that has been reloaded.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "ETLDataVersion"
+_ready = False
+
+
+def _engine():
+    from app.db import sqlserver  # engines are created on import
+
+    return sqlserver.get_mis_db_engine()
+
+
+def _ensure_table(conn) -> None:
+    global _ready
+    if _ready:
+        return
+    conn.execute(text(f"""
+    IF OBJECT_ID('dbo.{TABLE}', 'U') IS NULL
+    BEGIN
+        CREATE TABLE dbo.{TABLE} (
+            TableName NVARCHAR(128) NOT NULL PRIMARY KEY,
+            Version BIGINT NOT NULL,
+            LoadedAt DATETIME NOT NULL
+        );
+    END
+    """))
+    _ready = True
+
+
+class DataVersions:
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def bump(self, table_name: str) -> int:
+        """Called after a load of `table_name` committed; returns its new version."""
+        # one statement per execute: in a single batch the UPDATE's row count
+        # comes back first under pyodbc and .scalar() never sees the SELECT
+        params = {"table_name": table_name}
+        with _engine().begin() as conn:
+            _ensure_table(conn)
+            updated = conn.execute(text(f"""
+                UPDATE dbo.{TABLE} WITH (UPDLOCK, HOLDLOCK)
+                SET Version = Version + 1, LoadedAt = GETDATE()
+                WHERE TableName = :table_name
+            """), params).rowcount
+            if updated == 0:
+                # HOLDLOCK holds the key range to commit: a concurrent first bump
+                # blocks in its UPDATE and then updates this row
+                conn.execute(text(f"""
+                    INSERT INTO dbo.{TABLE} (TableName, Version, LoadedAt)
+                    VALUES (:table_name, 1, GETDATE())
+                """), params)
+            version = conn.execute(
+                text(f"SELECT Version FROM dbo.{TABLE} WHERE TableName = :table_name"), params
+            ).scalar()
+        with self._lock:
+            self._versions[table_name] = int(version)
+        return int(version)
+
+    def cached(self, tables: Sequence[str]) -> Optional[Tuple[int, ...]]:
+        """Versions of `tables` without a query, or None when they are due a refresh."""
+        with self._lock:
+            if (
+                self._fetched_at is None
+                or time.monotonic() - self._fetched_at > settings.report_etag_version_refresh_seconds
+            ):
+                return None
+            return tuple(self._versions.get(t, 0) for t in tables)
+
+    def refresh(self, tables: Sequence[str]) -> Optional[Tuple[int, ...]]:
+        """Re-reads every version from MIS; None when MIS cannot be read."""
+        try:
+            with _engine().begin() as conn:
+                _ensure_table(conn)
+                rows = conn.execute(text(f"SELECT TableName, Version FROM dbo.{TABLE}")).fetchall()
+        except Exception as e:
+            logger.warning("Could not read data versions: %s", e)
+            return None
+        with self._lock:
+            self._versions = {row[0]: int(row[1]) for row in rows}
+            self._fetched_at = time.monotonic()
+            return tuple(self._versions.get(t, 0) for t in tables)
+
+
+data_versions = DataVersions()
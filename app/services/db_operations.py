@@ -1,14 +1,29 @@
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_dtype
 import traceback
-from sqlalchemy import text, Table, MetaData, insert
+from sqlalchemy import text, Column, Table, MetaData, insert
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
 import logging
-from typing import Dict, Any
+from typing import Any, Dict, Iterable, List, Optional
 from datetime import datetime
 
+from app.core.config import settings
+from app.core.metrics import observe_etl_stage
+from app.db import migrations
+from app.utils.date_utils import to_python_datetimes, to_sql_datetime
+from app.utils.row_hash import ROW_HASH_COLUMN
+
 logger = logging.getLogger(__name__)
 
+# tables whose RowHash column and index are known to exist (incremental_upload)
+_HASHED_TABLES = set()
+
+# smallest INSERT ... SELECT that SQL Server compresses straight into a
+# columnstore rowgroup; smaller ones go to the delta store
+COLUMNSTORE_MIN_BATCH_ROWS = 102_400
+
 
 class DBOperationsServices:
 
@@ -17,13 +32,28 @@ class DBOperationsServices:
         """
         Dynamically truncate dataframe columns to match table schema lengths
         """
-        df_clean = df.copy()
-        valid_columns = []
+        # run constants (ETL transform keeps them as scalars in df.attrs) become
+        # columns only here, in the copy that is inserted
+        constants = df.attrs.get("etl_constants") or {}
+        # copy only the columns that will be inserted (one copy, not copy-then-select)
+        valid_columns = [name for name in table.columns.keys() if name in df.columns or name in constants]
+        df_clean = df.reindex(columns=valid_columns)
+        for name, value in constants.items():
+            if name in df_clean.columns:
+                df_clean[name] = value
         truncation_count = 0
         
         for column_name, column_obj in table.columns.items():
             if column_name in df_clean.columns:
-                valid_columns.append(column_name)
+                if isinstance(df_clean[column_name].dtype, pd.CategoricalDtype):
+                    # same strings as the object column it replaced (NULL -> None)
+                    values = df_clean[column_name].astype(object)
+                    df_clean[column_name] = values.where(values.notna(), None)
+                elif is_datetime64_dtype(df_clean[column_name].dtype):
+                    # DATETIME precision and driver datetimes for the whole column at
+                    # once, rather than per cell in _insert_frame
+                    values = to_sql_datetime(df_clean[column_name], floor=False)
+                    df_clean[column_name] = to_python_datetimes(values)
                 
                 # Get max length from column type
                 max_length = DBOperationsServices._get_sqlalchemy_length(column_obj.type)
@@ -51,7 +81,7 @@ class DBOperationsServices:
         else:
             logger.info("✅ No truncation needed - all data fits within column limits")
         
-        return df_clean[valid_columns]
+        return df_clean
 
     @staticmethod
     def _get_sqlalchemy_length(col_type) -> int | None:
@@ -91,143 +121,422 @@ class DBOperationsServices:
 
     @staticmethod
     def delete_and_upload_data(df: pd.DataFrame, table_name: str, db_engine, start_date:str,
-        end_date:str) -> Dict[str, Any]:
+        end_date:str, date_column: str = "CreatedDate") -> Dict[str, Any]:
         """
         Memory-safe batch processing with:
         - Batched deletes to clear table
-        - Millisecond-safe datetime conversion
+        - Millisecond-safe datetime conversion (vectorised, per column)
         - Chunked inserts with retry & adaptive chunk sizing
         """
+        logger.info(f"🚀 Starting upload to {table_name} ({len(df):,} rows)")
+        return DBOperationsServices.delete_and_stream_upload(
+            [df], table_name, db_engine, start_date, end_date, total_rows=len(df),
+            date_column=date_column,
+        )
+
+    @staticmethod
+    def delete_and_stream_upload(chunks: Iterable[pd.DataFrame], table_name: str, db_engine,
+        start_date: str, end_date: str, total_rows: Optional[int] = None,
+        date_column: str = "CreatedDate") -> Dict[str, Any]:
+        """
+        delete_and_upload_data for a load that arrives as an iterable of
+        frames (streaming ETL). The window delete and every insert share one
+        transaction, so readers see the old or the new window, never a mix;
+        an exception raised by `chunks` rolls the whole load back. The window
+        is the rows whose `date_column` falls in [start_date, end_date].
+        """
         try:
             # 1) Table name validation
             if not DBOperationsServices._is_valid_table_name(table_name):
                 raise HTTPException(status_code=400, detail="Invalid table name")
-            logger.info(f"🚀 Starting upload to {table_name} ({len(df):,} rows)")
+            if not DBOperationsServices._is_valid_table_name(date_column):
+                raise HTTPException(status_code=400, detail="Invalid date column")
 
             with db_engine.begin() as conn:
-                # Phase 1: Batched table clearing
-                logger.info("🧹 Clearing table with batched deletes...")
-                delete_start = datetime.now()
-                batch_size = 50_000
-                total_deleted = 0
+                total_inserted = DBOperationsServices._replace_window(
+                    conn, chunks, table_name, start_date, end_date, total_rows, date_column=date_column,
+                )
 
-                start_dt = DBOperationsServices._coerce_datetime(start_date)
-                end_dt = DBOperationsServices._coerce_datetime(end_date)
+            return {"status": "success", "rows_inserted": total_inserted}
 
-                
-                delete_stmt = text(
-                    f"DELETE TOP ({batch_size}) FROM {table_name} "
-                    "WHERE CAST(CreatedDate AS DATE) BETWEEN :start_date AND :end_date"
+        except SQLAlchemyError as e:
+            err = f"Database operation failed: {e}"
+            logger.error(f"💥 {err}\n{traceback.format_exc()}")
+            raise HTTPException(status_code=500, detail=err)
+
+        except Exception as e:
+            err = f"Operation failed: {e}"
+            logger.error(f"⛔ {err}\n{traceback.format_exc()}")
+            raise HTTPException(status_code=500, detail=err)
+
+    @staticmethod
+    def _replace_window(conn, chunks: Iterable[pd.DataFrame], table_name: str, start_date: str,
+        end_date: str, total_rows: Optional[int] = None, table: Optional[Table] = None,
+        date_column: str = "CreatedDate") -> int:
+        # Phase 1: Batched table clearing
+        DBOperationsServices._delete_window(conn, table_name, start_date, end_date, date_column)
+
+        # Phase 2: Chunked insert
+        if table is None:
+            table = Table(table_name, MetaData(), autoload_with=conn)
+
+        insert_phase_start = datetime.now()
+        total_inserted = 0
+        validated = False
+        stage = _ColumnstoreStage(conn, table) if migrations.is_columnstore(conn, table_name) else None
+        for df in chunks:
+            if not validated:
+                # Warn on column mismatches
+                DBOperationsServices.validate_dataframe_against_table(df, table)
+                validated = True
+
+            # Single step: filter columns + truncate to schema limits
+            df = DBOperationsServices.truncate_dataframe_to_table_schema(df, table)
+            if stage is not None:
+                total_inserted += stage.add(df, total_inserted, total_rows)
+            else:
+                total_inserted += DBOperationsServices._insert_frame(
+                    conn, table, df, total_inserted, total_rows
                 )
+        if stage is not None:
+            stage.close()
 
-                
+        observe_etl_stage(
+            table_name, "insert", "ALL",
+            (datetime.now() - insert_phase_start).total_seconds(), total_inserted,
+        )
+        return total_inserted
 
-                while True:
-                    result = conn.execute(
-                        delete_stmt,
-                        {"start_date": start_dt, "end_date": end_dt}
+    @staticmethod
+    def incremental_upload(chunks: Iterable[pd.DataFrame], table_name: str, db_engine, start_date: str,
+        end_date: str, key_column: str, total_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        delete_and_stream_upload that only writes what changed in the window.
+
+        Frames carry a RowHash column (ETL.transform). Rows whose
+        (CountryCode, RowHash) is already in the window are left alone; the
+        rest are matched to the rows left over by (CountryCode, key_column):
+        a pair is an UPDATE, a new key an INSERT and an old row nobody
+        claimed a DELETE. Same single transaction as the full replace, and a
+        window with rows loaded before hashing (RowHash NULL) falls back to it.
+        Only rows whose key is already in the window are held until the end.
+        """
+        try:
+            if not DBOperationsServices._is_valid_table_name(table_name):
+                raise HTTPException(status_code=400, detail="Invalid table name")
+            if not DBOperationsServices._is_valid_table_name(key_column):
+                raise HTTPException(status_code=400, detail="Invalid key column")
+
+            start_dt = DBOperationsServices._coerce_datetime(start_date)
+            end_dt = DBOperationsServices._coerce_datetime(end_date)
+            window = {"_start_date": start_dt, "_end_date": end_dt}
+
+            with db_engine.begin() as conn:
+                DBOperationsServices._ensure_row_hash_column(conn, table_name)
+                table = Table(table_name, MetaData(), autoload_with=conn)
+
+                old = pd.read_sql_query(
+                    text(
+                        f"SELECT CountryCode, [{key_column}] AS BusinessKey, RowHash FROM {table_name} "
+                        "WHERE CAST(CreatedDate AS DATE) BETWEEN :_start_date AND :_end_date"
+                    ),
+                    conn, params=window,
+                )
+                if old.empty or old["RowHash"].isna().any():
+                    logger.info(
+                        f"♻️ {table_name} window has no row hashes yet ({len(old):,} rows); replacing it"
                     )
-                    print(delete_stmt, {"start_date": start_dt, "end_date": end_dt})
-                    deleted = result.rowcount or 0
-                    total_deleted += deleted
-                    logger.info(f"   Deleted batch of {deleted:,} rows (total: {total_deleted:,})")
-                    if deleted == 0:
-                        break
+                    inserted = DBOperationsServices._replace_window(
+                        conn, chunks, table_name, start_date, end_date, total_rows, table
+                    )
+                    return {"status": "success", "mode": "replace", "rows_inserted": inserted}
 
-                logger.info(f"Table cleared in {(datetime.now() - delete_start).total_seconds():.2f}s")
+                old["CountryCode"] = old["CountryCode"].astype(str)
+                old["RowHash"] = old["RowHash"].astype("int64")
+                # (CountryCode, RowHash) -> old rows not yet matched by a new row
+                remaining = old.groupby(["CountryCode", "RowHash"]).size()
+                known_keys = pd.MultiIndex.from_frame(
+                    old.loc[old["BusinessKey"].notna(), ["CountryCode", "BusinessKey"]].astype(str)
+                )
 
-                # Phase 2: Chunked insert
-                metadata = MetaData()
-                table = Table(table_name, metadata, autoload_with=db_engine)
+                phase_start = datetime.now()
+                inserted = unchanged = 0
+                pending = []
+                validated = False
+                for df in chunks:
+                    if not validated:
+                        DBOperationsServices.validate_dataframe_against_table(df, table)
+                        if ROW_HASH_COLUMN not in df.columns:
+                            raise ValueError(f"Incremental load of {table_name} needs a {ROW_HASH_COLUMN} column")
+                        validated = True
+                    if df.empty:
+                        continue
 
-                # Warn on column mismatches
-                DBOperationsServices.validate_dataframe_against_table(df, table)
+                    hashes = pd.DataFrame({
+                        "CountryCode": df["CountryCode"].astype(str).to_numpy(),
+                        "RowHash": df[ROW_HASH_COLUMN].to_numpy(dtype="int64"),
+                    })
+                    # multiset match: the n-th copy of a hash matches if the window had n of them
+                    available = remaining.reindex(pd.MultiIndex.from_frame(hashes), fill_value=0).to_numpy()
+                    matched = hashes.groupby(["CountryCode", "RowHash"]).cumcount().to_numpy() < available
+                    if matched.any():
+                        used = hashes[matched].value_counts()
+                        remaining = remaining.sub(used, fill_value=0)
+                        remaining = remaining[remaining > 0].astype("int64")
+                        unchanged += int(matched.sum())
+                    if matched.all():
+                        continue
 
-                # Single step: filter columns + truncate to schema limits
-                df = DBOperationsServices.truncate_dataframe_to_table_schema(df, table)
-
-                insert_chunk_size = 20_000
-                total_rows = len(df)
-                total_chunks = (total_rows // insert_chunk_size) + (1 if total_rows % insert_chunk_size else 0)
-                total_inserted = 0
-                chunk_num = 0
-
-                def safe_value(val):
-                    if pd.isna(val):
-                        return None
-                    if isinstance(val, pd.Timestamp):
-                        # Convert to datetime and drop to nearest millisecond
-                        dt = val.to_pydatetime()
-                        ms = int(dt.microsecond / 1000) * 1000
-                        return dt.replace(microsecond=ms)
-                    return val
-
-                while chunk_num < total_chunks:
-                    start = chunk_num * insert_chunk_size
-                    end = start + insert_chunk_size
-                    chunk = df.iloc[start:end]
+                    changed = df[~matched]
+                    keys = changed[key_column]
+                    existing = keys.notna().to_numpy() & pd.MultiIndex.from_arrays([
+                        changed["CountryCode"].astype(str), keys.astype(str)
+                    ]).isin(known_keys)
+                    if (~existing).any():
+                        # keys the window never had cannot be updates
+                        fresh = DBOperationsServices.truncate_dataframe_to_table_schema(changed[~existing], table)
+                        inserted += DBOperationsServices._insert_frame(conn, table, fresh, inserted, total_rows)
+                    if existing.any():
+                        pending.append(changed[existing])
+
+                updated, late_inserts, deleted = DBOperationsServices._apply_changes(
+                    conn, table, key_column, old, remaining, pending, window,
+                )
+                inserted += late_inserts
+                observe_etl_stage(
+                    table_name, "incremental", "ALL",
+                    (datetime.now() - phase_start).total_seconds(), inserted + updated + deleted,
+                )
 
-                    # build records list without deprecated applymap
-                    if not chunk.empty:
-                        base = chunk.to_dict(orient="records")
-                        records = [
-                            {col: safe_value(v) for col, v in row.items()}
-                            for row in base
-                        ]
-                    else:
-                        records = []
-
-                    retries = 3
-                    while retries > 0:
-                        try:
-                            insert_start = datetime.now()
-                            # insert entire batch
-                            conn.execute(insert(table), records)
-                            n = len(records)
-                            total_inserted += n
-                            logger.info(
-                                f"📦 Inserted chunk {chunk_num+1}/{total_chunks} "
-                                f"({n:,} rows in {(datetime.now()-insert_start).total_seconds():.2f}s) | "
-                                f"Total: {total_inserted:,}/{total_rows:,}"
-                            )
-                            break
-
-                        except Exception as e:
-                            retries -= 1
-                            logger.warning(
-                                f"Insert failed on chunk {chunk_num+1}/{total_chunks} "
-                                f"(rows {start+1}-{min(end, total_rows)}): {e}"
-                            )
-                            logger.debug("Traceback:\n" + traceback.format_exc())
-                            if records:
-                                logger.debug(f"Sample row: {records[0]}")
-                            # shrink chunk and retry
-                            insert_chunk_size = max(1, insert_chunk_size // 2)
-                            logger.info(f"⚠️ Retrying with smaller chunk size: {insert_chunk_size}")
-                            end = start + insert_chunk_size
-                            chunk = df.iloc[start:end]
-                            base = chunk.to_dict(orient="records")
-                            records = [
-                                {col: safe_value(v) for col, v in row.items()}
-                                for row in base
-                            ]
-                    else:
-                        logger.error(f"❌ Failed to insert chunk {chunk_num+1} after 3 retries.")
-
-                    chunk_num += 1
-
-            return {"status": "success"}
+            logger.info(
+                f"✅ {table_name}: {unchanged:,} unchanged, {inserted:,} inserted, "
+                f"{updated:,} updated, {deleted:,} deleted"
+            )
+            return {
+                "status": "success", "mode": "incremental", "rows_inserted": inserted,
+                "rows_updated": updated, "rows_deleted": deleted, "rows_unchanged": unchanged,
+            }
 
         except SQLAlchemyError as e:
             err = f"Database operation failed: {e}"
             logger.error(f"💥 {err}\n{traceback.format_exc()}")
             raise HTTPException(status_code=500, detail=err)
 
+        except HTTPException:
+            raise
+
         except Exception as e:
             err = f"Operation failed: {e}"
             logger.error(f"⛔ {err}\n{traceback.format_exc()}")
             raise HTTPException(status_code=500, detail=err)
 
+    @staticmethod
+    def _apply_changes(conn, table: Table, key_column: str, old: pd.DataFrame, remaining: pd.Series,
+        pending: List[pd.DataFrame], window: Dict[str, Any]):
+        """Pairs held-back rows with unmatched old rows by key; returns (updated, inserted, deleted)."""
+        table_name = table.name
+        # one old row per unmatched copy; equal hashes mean equal rows, keys included
+        leftover = remaining.rename("Copies").reset_index().merge(
+            old.drop_duplicates(["CountryCode", "RowHash"]), on=["CountryCode", "RowHash"], how="left",
+        )
+        leftover = leftover.loc[leftover.index.repeat(leftover["Copies"])].reset_index(drop=True)
+        leftover["BusinessKey"] = leftover["BusinessKey"].where(
+            leftover["BusinessKey"].isna(), leftover["BusinessKey"].astype(str)
+        )
+        leftover["Copy"] = leftover.groupby(["CountryCode", "BusinessKey"], dropna=False).cumcount()
+
+        new = pd.concat(pending, ignore_index=True) if pending else pd.DataFrame()
+        if not new.empty:
+            new.attrs = pending[0].attrs
+            pairs = pd.DataFrame({
+                "CountryCode": new["CountryCode"].astype(str).to_numpy(),
+                "BusinessKey": new[key_column].astype(str).to_numpy(),
+                "Row": range(len(new)),
+            })
+            pairs["Copy"] = pairs.groupby(["CountryCode", "BusinessKey"]).cumcount()
+            pairs = pairs.merge(
+                leftover.dropna(subset=["BusinessKey"]).reset_index(),
+                on=["CountryCode", "BusinessKey", "Copy"],
+            )
+        else:
+            pairs = pd.DataFrame(columns=["Row", "RowHash", "index"])
+
+        updated = 0
+        if len(pairs):
+            start = datetime.now()
+            rows = DBOperationsServices.truncate_dataframe_to_table_schema(new.iloc[pairs["Row"].to_numpy()], table)
+            columns = list(rows.columns)
+            assignments = ", ".join(f"[{c}] = :p{i}" for i, c in enumerate(columns))
+            # TOP (1): copies of a row share its hash; each UPDATE claims one
+            stmt = text(
+                f"UPDATE TOP (1) {table_name} SET {assignments} "
+                "WHERE CountryCode = :_country_code AND RowHash = :_old_hash "
+                "AND CAST(CreatedDate AS DATE) BETWEEN :_start_date AND :_end_date"
+            )
+            records = DBOperationsServices._records(rows)
+            for record, (code, old_hash) in zip(records, pairs[["CountryCode", "RowHash"]].itertuples(index=False)):
+                params = {f"p{i}": record[c] for i, c in enumerate(columns)}
+                params.update(window, _country_code=code, _old_hash=int(old_hash))
+                record.clear()
+                record.update(params)
+            for i in range(0, len(records), 20_000):
+                conn.execute(stmt, records[i:i + 20_000])
+            updated = len(records)
+            observe_etl_stage(table_name, "update", "ALL", (datetime.now() - start).total_seconds(), updated)
+
+        inserted = 0
+        if not new.empty:
+            unpaired = np.ones(len(new), dtype=bool)
+            unpaired[pairs["Row"].to_numpy(dtype="int64")] = False
+            rest = new[unpaired]
+            if len(rest):
+                rest = DBOperationsServices.truncate_dataframe_to_table_schema(rest, table)
+                inserted = DBOperationsServices._insert_frame(conn, table, rest)
+
+        deleted = 0
+        gone = leftover.drop(index=pairs["index"]) if len(pairs) else leftover
+        if len(gone):
+            start = datetime.now()
+            gone = gone.groupby(["CountryCode", "RowHash"]).size().rename("Copies").reset_index()
+            stmt = text(
+                f"DELETE TOP (:_copies) FROM {table_name} "
+                "WHERE CountryCode = :_country_code AND RowHash = :_old_hash "
+                "AND CAST(CreatedDate AS DATE) BETWEEN :_start_date AND :_end_date"
+            )
+            conn.execute(stmt, [
+                {**window, "_copies": int(n), "_country_code": code, "_old_hash": int(h)}
+                for code, h, n in gone.itertuples(index=False)
+            ])
+            deleted = int(gone["Copies"].sum())
+            observe_etl_stage(table_name, "delete", "ALL", (datetime.now() - start).total_seconds(), deleted)
+        return updated, inserted, deleted
+
+    @staticmethod
+    def _ensure_row_hash_column(conn, table_name: str) -> None:
+        if table_name in _HASHED_TABLES:
+            return
+        conn.execute(text(f"""
+        IF COL_LENGTH('dbo.{table_name}', '{ROW_HASH_COLUMN}') IS NULL
+        BEGIN
+            ALTER TABLE dbo.{table_name} ADD {ROW_HASH_COLUMN} BIGINT NULL;
+        END
+        """))
+        # separate batch: the new column is not visible to the batch that adds it
+        conn.execute(text(f"""
+        IF NOT EXISTS (
+            SELECT 1 FROM sys.indexes
+            WHERE name = 'IX_{table_name}_{ROW_HASH_COLUMN}' AND object_id = OBJECT_ID('dbo.{table_name}')
+        )
+        BEGIN
+            CREATE INDEX IX_{table_name}_{ROW_HASH_COLUMN} ON dbo.{table_name}(CountryCode, {ROW_HASH_COLUMN});
+        END
+        """))
+        _HASHED_TABLES.add(table_name)
+
+    @staticmethod
+    def _delete_window(conn, table_name: str, start_date: str, end_date: str,
+        date_column: str = "CreatedDate") -> int:
+        logger.info("🧹 Clearing table with batched deletes...")
+        delete_start = datetime.now()
+        batch_size = 50_000
+        total_deleted = 0
+
+        start_dt = DBOperationsServices._coerce_datetime(start_date)
+        end_dt = DBOperationsServices._coerce_datetime(end_date)
+
+        delete_stmt = text(
+            f"DELETE TOP ({batch_size}) FROM {table_name} "
+            f"WHERE CAST({date_column} AS DATE) BETWEEN :start_date AND :end_date"
+        )
+
+        while True:
+            result = conn.execute(
+                delete_stmt,
+                {"start_date": start_dt, "end_date": end_dt}
+            )
+            deleted = result.rowcount or 0
+            total_deleted += deleted
+            logger.info(f"   Deleted batch of {deleted:,} rows (total: {total_deleted:,})")
+            if deleted == 0:
+                break
+
+        delete_seconds = (datetime.now() - delete_start).total_seconds()
+        observe_etl_stage(table_name, "delete", "ALL", delete_seconds, total_deleted)
+        logger.info(f"Table cleared in {delete_seconds:.2f}s")
+        return total_deleted
+
+    @staticmethod
+    def _insert_frame(conn, table: Table, df: pd.DataFrame, inserted_before: int = 0,
+        total_rows: Optional[int] = None) -> int:
+        """Inserts `df` in chunks, halving the chunk size on failure; returns rows inserted."""
+        insert_chunk_size = 20_000
+        frame_rows = len(df)
+        total_chunks = (frame_rows // insert_chunk_size) + (1 if frame_rows % insert_chunk_size else 0)
+        total_inserted = 0
+        chunk_num = 0
+        total_label = f"{total_rows:,}" if total_rows is not None else "?"
+
+        while chunk_num < total_chunks:
+            start = chunk_num * insert_chunk_size
+            end = start + insert_chunk_size
+            chunk = df.iloc[start:end]
+
+            records = DBOperationsServices._records(chunk)
+
+            retries = 3
+            while retries > 0:
+                try:
+                    insert_start = datetime.now()
+                    # insert entire batch
+                    conn.execute(insert(table), records)
+                    n = len(records)
+                    total_inserted += n
+                    logger.info(
+                        f"📦 Inserted chunk {chunk_num+1}/{total_chunks} "
+                        f"({n:,} rows in {(datetime.now()-insert_start).total_seconds():.2f}s) | "
+                        f"Total: {inserted_before + total_inserted:,}/{total_label}"
+                    )
+                    break
+
+                except Exception as e:
+                    retries -= 1
+                    logger.warning(
+                        f"Insert failed on chunk {chunk_num+1}/{total_chunks} "
+                        f"(rows {start+1}-{min(end, frame_rows)}): {e}"
+                    )
+                    logger.debug("Traceback:\n" + traceback.format_exc())
+                    if records:
+                        logger.debug(f"Sample row: {records[0]}")
+                    # shrink chunk and retry
+                    insert_chunk_size = max(1, insert_chunk_size // 2)
+                    logger.info(f"⚠️ Retrying with smaller chunk size: {insert_chunk_size}")
+                    end = start + insert_chunk_size
+                    chunk = df.iloc[start:end]
+                    records = DBOperationsServices._records(chunk)
+            else:
+                logger.error(f"❌ Failed to insert chunk {chunk_num+1} after 3 retries.")
+
+            chunk_num += 1
+
+        return total_inserted
+
+    @staticmethod
+    def _records(chunk: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Driver-ready rows: NULLs as None, timestamps as datetimes."""
+        def safe_value(val):
+            if pd.isna(val):
+                return None
+            if isinstance(val, pd.Timestamp):
+                # datetime columns arrive as datetimes (truncate_dataframe_to_table_schema)
+                return val.to_pydatetime()
+            return val
+
+        # build records list without deprecated applymap
+        return [
+            {col: safe_value(v) for col, v in row.items()}
+            for row in chunk.to_dict(orient="records")
+        ]
+
     @staticmethod
     def _is_valid_table_name(name: str) -> bool:
         return (bool(name)
@@ -252,10 +561,71 @@ class DBOperationsServices:
     @staticmethod
     def validate_dataframe_against_table(df: pd.DataFrame, table: Table) -> None:
         cols_table = set(table.columns.keys())
-        cols_df = set(df.columns)
+        cols_df = set(df.columns) | set(df.attrs.get("etl_constants") or {})
         extra = cols_df - cols_table
         missing = cols_table - cols_df
         if extra:
             logger.warning(f"⚠️ DataFrame has extra columns: {extra}")
         if missing:
-            logger.warning(f"⚠️ Missing columns in DataFrame: {missing}")
\ No newline at end of file
+            logger.warning(f"⚠️ Missing columns in DataFrame: {missing}")
+
+
+class _ColumnstoreStage:
+    """
+    Inserts into a clustered columnstore table through a #temp table.
+
+    Parameter-array inserts (fast_executemany) reach a columnstore as single
+    rows and sit in the delta store until the tuple mover compresses them.
+    Rows are staged instead and moved with one INSERT ... SELECT per
+    etl_columnstore_batch_rows, which SQL Server bulk-loads into compressed
+    rowgroups. Only the tail of a load (under 102,400 rows) lands in the
+    delta store.
+    """
+
+    def __init__(self, conn, table: Table):
+        self.conn = conn
+        self.table = table
+        self.batch_rows = max(settings.etl_columnstore_batch_rows, COLUMNSTORE_MIN_BATCH_ROWS)
+        self.stage: Optional[Table] = None
+        self.staged = 0
+
+    def add(self, df: pd.DataFrame, inserted_before: int = 0, total_rows: Optional[int] = None) -> int:
+        if df.empty:
+            return 0
+        if self.stage is None:
+            self._create(list(df.columns))
+        inserted = DBOperationsServices._insert_frame(self.conn, self.stage, df, inserted_before, total_rows)
+        self.staged += inserted
+        if self.staged >= self.batch_rows:
+            self.flush()
+        return inserted
+
+    def flush(self) -> None:
+        if not self.staged:
+            return
+        start = datetime.now()
+        columns = ", ".join(f"[{c.name}]" for c in self.stage.columns)
+        self.conn.execute(text(
+            f"INSERT INTO {self.table.name} ({columns}) SELECT {columns} FROM {self.stage.name}"
+        ))
+        self.conn.execute(text(f"TRUNCATE TABLE {self.stage.name}"))
+        logger.info(
+            f"🧊 Moved {self.staged:,} staged rows into columnstore {self.table.name} "
+            f"in {(datetime.now() - start).total_seconds():.2f}s"
+        )
+        self.staged = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self.stage is not None:
+            self.conn.execute(text(f"DROP TABLE {self.stage.name}"))
+            self.stage = None
+
+    def _create(self, names: List[str]) -> None:
+        columns = [c for c in self.table.columns if c.name in names]
+        name = f"#{self.table.name}_stage"
+        # SELECT INTO copies the column types (and lengths) of the target
+        self.conn.execute(text(
+            f"SELECT TOP 0 {', '.join(f'[{c.name}]' for c in columns)} INTO {name} FROM {self.table.name}"
+        ))
+        self.stage = Table(name, MetaData(), *[Column(c.name, c.type) for c in columns])
@@ -0,0 +1,157 @@
+"""
+In-process outbound email queue.
+
+Requests enqueue a rendered message and return; one worker per process
+sends them over a transport that lives as long as the worker (a pooled
+HTTP client for Mailgun, one reusable SMTP session), so a slow or failing
+mail provider no longer holds up /auth/retrieve-password.
+
+- the worker takes up to email_batch_size queued messages at a time: SMTP
+  sends them on one session, Mailgun concurrently over the pool;
+- a failed message is re-queued after email_backoff_seconds * 2**attempt,
+  and dropped (logged, counted) after email_retries attempts;
+- the queue is bounded (email_queue_max): enqueue raises RuntimeError when
+  it is full rather than growing without limit;
+- shutdown drains what is queued for a few seconds, then gives up.
+
+The queue is in memory: messages still queued when a worker dies are lost.
+EMAIL_TRANSPORT picks "smtp", "mailgun" or "none" (log and drop).
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import observe_email
+from app.services.email_service.template_path import load_templates
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboundEmail:
+    to_email: str
+    subject: str
+    html_content: str
+    from_email: Optional[str] = None
+    attempts: int = 0
+
+
+class _LogTransport:
+    """EMAIL_TRANSPORT=none: the message is logged, not sent."""
+
+    async def send_batch(self, messages):
+        for m in messages:
+            logger.info("Email to %s not sent (EMAIL_TRANSPORT=none): %s", m.to_email, m.subject)
+        return []
+
+    async def close(self):
+        pass
+
+
+def _transport():
+    if settings.email_transport == "smtp":
+        from app.services.email_service.srv.smpt import smtp_transport
+
+        return smtp_transport
+    if settings.email_transport == "mailgun":
+        from app.services.email_service.srv.mailgun import mailgun_transport
+
+        return mailgun_transport
+    if settings.email_transport == "none":
+        return _LogTransport()
+    raise ValueError(f"Unknown EMAIL_TRANSPORT {settings.email_transport!r}")
+
+
+class EmailOutbox:
+    def __init__(self, transport=None):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._retries: Set[asyncio.Task] = set()
+        # None: the one EMAIL_TRANSPORT names, picked at start()
+        self._transport = transport
+
+    def start(self) -> None:
+        """Compiles the templates and starts the worker (idempotent; needs a running loop)."""
+        if self._worker is not None and not self._worker.done():
+            return
+        load_templates()
+        self._transport = self._transport or _transport()
+        self._queue = asyncio.Queue(maxsize=settings.email_queue_max)
+        self._worker = asyncio.create_task(self._run(), name="email-outbox")
+
+    def enqueue(self, to_email: str, subject: str, html_content: str, from_email: Optional[str] = None) -> None:
+        self.start()
+        try:
+            self._queue.put_nowait(OutboundEmail(to_email, subject, html_content, from_email))
+        except asyncio.QueueFull:
+            observe_email("rejected")
+            raise RuntimeError("Email outbox is full")
+        observe_email("queued")
+
+    @property
+    def pending(self) -> int:
+        return (self._queue.qsize() if self._queue is not None else 0) + len(self._retries)
+
+    async def _run(self) -> None:
+        while True:
+            batch: List[OutboundEmail] = [await self._queue.get()]
+            while len(batch) < settings.email_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                failures = await self._transport.send_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures = [(m, e) for m in batch]
+            failed = {id(m) for m, _ in failures}
+            for m in batch:
+                if id(m) not in failed:
+                    observe_email("sent")
+            for m, error in failures:
+                self._retry(m, error)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _retry(self, message: OutboundEmail, error: Exception) -> None:
+        message.attempts += 1
+        if message.attempts > settings.email_retries:
+            observe_email("failed")
+            logger.error(
+                "Giving up on email to %s after %d attempts: %s", message.to_email, message.attempts, error
+            )
+            return
+        delay = settings.email_backoff_seconds * 2 ** (message.attempts - 1)
+        observe_email("retried")
+        logger.warning(
+            "Email to %s failed (attempt %d), retrying in %.0fs: %s", message.to_email, message.attempts, delay, error
+        )
+        task = asyncio.create_task(self._requeue(message, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue(self, message: OutboundEmail, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put(message)
+
+    async def shutdown(self, timeout: float = 10.0) -> None:
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self.pending:
+            logger.warning("Email outbox stopped with %d message(s) unsent", self.pending)
+        for task in [self._worker, *self._retries]:
+            task.cancel()
+        await asyncio.gather(self._worker, *self._retries, return_exceptions=True)
+        self._worker = None
+        await self._transport.close()
+
+
+email_outbox = EmailOutbox()
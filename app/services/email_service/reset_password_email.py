@@ -1,6 +1,6 @@
 from app.core.config import settings
 from app.services.email_service.template_path import template_env
-from app.services.email_service.srv.mailgun import send_via_mailgun_api
+from app.services.email_service.outbox import email_outbox
 
 
 async def send_reset_password_email(
@@ -15,11 +15,11 @@ async def send_reset_password_email(
         app_name=settings.app_name,
         expiry_time=settings.access_token_expire_minutes,
     )
-    
-    # MAILGUN Account is disabled. We are trying to fix it
-    # await send_via_mailgun_api(
-    #     from_email=from_email or settings.email_from,
-    #     to_email=to_email,
-    #     subject=subject,
-    #     html_content=html_content,
-    # )
+
+    # queued: the outbox worker sends it (EMAIL_TRANSPORT) and retries on failure
+    email_outbox.enqueue(
+        from_email=from_email or settings.email_from,
+        to_email=to_email,
+        subject=subject,
+        html_content=html_content,
+    )
@@ -1,35 +1,77 @@
+import asyncio
+import logging
+from typing import List, Optional, Sequence, Tuple
+
 import httpx
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class MailgunTransport:
+    """Mailgun API sender holding one pooled HTTP client (keep-alive connections)."""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=settings.mailgun_api_url,
+                auth=("api", settings.mailgun_api_key),
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def send(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        from_email: str | None = None,
+    ) -> None:
+        if from_email is None:
+            from_email = settings.email_from
+
+        data = {
+            "from": f"{settings.app_name} <{from_email}>",
+            "to": [to_email],
+            "subject": subject,
+            "html": html_content,
+        }
+        response = await self._get_client().post(f"/v3/{settings.mailgun_domain}/messages", data=data)
+
+        if response.status_code >= 400:
+            error_body = response.text
+            logger.error("[Mailgun Error] %s %s", response.status_code, error_body)
+            # include details in the exception so you can see it in the traceback
+            raise RuntimeError(
+                f"Failed to send email via Mailgun API "
+                f"(status={response.status_code} body={error_body})"
+            )
+
+    async def send_batch(self, messages: Sequence) -> List[Tuple[object, Exception]]:
+        """Sends `messages` concurrently over the pool; returns (message, error) per failure."""
+        results = await asyncio.gather(
+            *(self.send(m.to_email, m.subject, m.html_content, m.from_email) for m in messages),
+            return_exceptions=True,
+        )
+        return [(m, r) for m, r in zip(messages, results) if isinstance(r, Exception)]
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+mailgun_transport = MailgunTransport()
+
+
 async def send_via_mailgun_api(
     to_email: str,
     subject: str,
     html_content: str,
     from_email: str | None = None,
 ):
-    if from_email is None:
-        from_email = settings.default_from_email
-
-    url = f"https://api.mailgun.net/v3/{settings.mailgun_domain}/messages"
-
-    data = {
-        "from": f"{settings.app_name} <{from_email}>",
-        "to": [to_email],
-        "subject": subject,
-        "html": html_content,
-    }
-
-    async with httpx.AsyncClient(
-        auth=("api", settings.mailgun_api_key),
-        timeout=10.0,
-    ) as client:
-        response = await client.post(url, data=data)
-
-    if response.status_code >= 400:
-        error_body = response.text
-        print(f"[Mailgun Error] {response.status_code} {error_body}")
-        # include details in the exception so you can see it in the traceback
-        raise RuntimeError(
-            f"Failed to send email via Mailgun API "
-            f"(status={response.status_code} body={error_body})"
-        )
+    await mailgun_transport.send(to_email, subject, html_content, from_email)
@@ -1,24 +1,90 @@
+import asyncio
+import logging
 from email.message import EmailMessage
-from aiosmtplib import SMTP
+from typing import List, Optional, Sequence, Tuple
+
+from aiosmtplib import SMTP, SMTPServerDisconnected
 from app.core.config import settings
 
-async def send_via_smtp(from_email: str, to_email: str, subject: str, html_content: str):
+logger = logging.getLogger(__name__)
+
+
+def _message(from_email: str, to_email: str, subject: str, html_content: str) -> EmailMessage:
     msg = EmailMessage()
     msg["Subject"] = subject
     msg["From"] = from_email
     msg["To"] = to_email
     msg.add_alternative(html_content, subtype="html")
+    return msg
+
+
+class SMTPTransport:
+    """
+    One SMTP session, connected and logged in on first use and reused for
+    every message after that. A session the server dropped while idle is
+    reopened once before the send counts as failed.
+    """
+
+    def __init__(self):
+        self._smtp: Optional[SMTP] = None
+        self._lock = asyncio.Lock()
+
+    async def _session(self) -> SMTP:
+        if self._smtp is None or not self._smtp.is_connected:
+            smtp = SMTP(
+                hostname=settings.smtp_server,
+                port=settings.smtp_port,
+                start_tls=settings.smtp_use_tls,  # for port 587 (STARTTLS)
+            )
+            await smtp.connect()
+            if settings.smtp_user:
+                await smtp.login(settings.smtp_user, settings.smtp_password)
+            self._smtp = smtp
+        return self._smtp
+
+    async def _send(self, msg: EmailMessage) -> None:
+        try:
+            await (await self._session()).send_message(msg)
+        except SMTPServerDisconnected:
+            self._smtp = None
+            await (await self._session()).send_message(msg)
 
+    async def send(self, from_email: str, to_email: str, subject: str, html_content: str) -> None:
+        async with self._lock:
+            await self._send(_message(from_email, to_email, subject, html_content))
+
+    async def send_batch(self, messages: Sequence) -> List[Tuple[object, Exception]]:
+        """Sends `messages` one after another on the session; returns (message, error) per failure."""
+        failures = []
+        async with self._lock:
+            for m in messages:
+                try:
+                    await self._send(_message(m.from_email or settings.email_from, m.to_email, m.subject, m.html_content))
+                except Exception as e:
+                    failures.append((m, e))
+                    # the next message starts a fresh session
+                    await self._drop()
+        return failures
+
+    async def _drop(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._drop()
+
+
+smtp_transport = SMTPTransport()
+
+
+async def send_via_smtp(from_email: str, to_email: str, subject: str, html_content: str):
     try:
-        smtp = SMTP(
-            hostname=settings.smtp_server,
-            port=settings.smtp_port,
-            start_tls=settings.smtp_use_tls,  # for port 587 (STARTTLS)
-        )
-        await smtp.connect()
-        await smtp.login(settings.smtp_user, settings.smtp_password)
-        await smtp.send_message(msg)
-        await smtp.quit()
+        await smtp_transport.send(from_email, to_email, subject, html_content)
     except Exception as e:
-        print(f"[Email Error] Failed to send email to {to_email}: {e}")
+        logger.error("[Email Error] Failed to send email to %s: %s", to_email, e)
         raise RuntimeError("Failed to send email") from e
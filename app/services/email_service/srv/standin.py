@@ -0,0 +1,137 @@
+"""
+Local stand-in for the mail providers: an SMTP sink and a Mailgun-style
+HTTP endpoint that accept everything and keep what they received.
+
+    python -m app.services.email_service.srv.standin --smtp-port 2525 --http-port 8025 --delay 2
+
+then point SMTP_SERVER/SMTP_PORT (SMTP_USE_TLS=false) or MAILGUN_API_URL at
+it. `--delay` makes every message take that long, like a slow provider.
+`connections` counts the connections opened, which shows whether the
+transports reuse them.
+"""
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MailSink:
+    host: str = "127.0.0.1"
+    smtp_port: int = 0
+    http_port: int = 0
+    delay: float = 0.0
+    messages: List[dict] = field(default_factory=list)
+    connections: dict = field(default_factory=lambda: {"smtp": 0, "http": 0})
+    _servers: list = field(default_factory=list)
+
+    async def start(self) -> "MailSink":
+        smtp = await asyncio.start_server(self._smtp, self.host, self.smtp_port)
+        http = await asyncio.start_server(self._http, self.host, self.http_port)
+        self._servers = [smtp, http]
+        self.smtp_port = smtp.sockets[0].getsockname()[1]
+        self.http_port = http.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+
+    # -------- SMTP (EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT) --------
+    async def _smtp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections["smtp"] += 1
+
+        async def reply(line: str) -> None:
+            writer.write(line.encode("ascii") + b"\r\n")
+            await writer.drain()
+
+        await reply("220 standin ESMTP")
+        envelope: dict = {}
+        try:
+            while line := await reader.readline():
+                verb = line.decode("utf-8", "replace").strip().split(" ", 1)[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    writer.write(b"250-standin\r\n250-AUTH PLAIN LOGIN\r\n")
+                    await reply("250 8BITMIME")
+                elif verb == "AUTH":
+                    await reply("235 2.7.0 Authentication successful")
+                elif verb == "MAIL":
+                    envelope = {"from": line.decode().split(":", 1)[1].strip(), "to": []}
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    envelope.setdefault("to", []).append(line.decode().split(":", 1)[1].strip())
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    body = []
+                    while (data := await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        body.append(data)
+                    await asyncio.sleep(self.delay)
+                    self.messages.append({"via": "smtp", **envelope, "data": b"".join(body)})
+                    await reply("250 OK queued")
+                elif verb in ("RSET", "NOOP"):
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            writer.close()
+
+    # -------- HTTP (POST /v3/<domain>/messages, keep-alive) --------
+    async def _http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections["http"] += 1
+        try:
+            while request_line := await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                await asyncio.sleep(self.delay)
+                form = {k: v if len(v) > 1 else v[0] for k, v in parse_qs(body.decode()).items()}
+                self.messages.append({"via": "http", "path": request_line.decode().split(" ")[1], **form})
+                payload = b'{"id": "<standin>", "message": "Queued. Thank you."}'
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode("ascii") + payload
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(args) -> None:
+    sink = await MailSink(args.host, args.smtp_port, args.http_port, args.delay).start()
+    logger.info("SMTP on %s:%d, HTTP on %s:%d", args.host, sink.smtp_port, args.host, sink.http_port)
+    seen = 0
+    while True:
+        await asyncio.sleep(1)
+        for message in sink.messages[seen:]:
+            logger.info("%s message to %s", message["via"], message.get("to"))
+        seen = len(sink.messages)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local SMTP/HTTP mail sink.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--smtp-port", type=int, default=2525)
+    parser.add_argument("--http-port", type=int, default=8025)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per message")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,4 +6,12 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 template_env = Environment(
     loader=FileSystemLoader(os.path.join(BASE_DIR, "email_templates")),
     autoescape=select_autoescape(["html", "xml"]),
+    # templates only change with a deploy: no stat() per get_template
+    auto_reload=False,
 )
+
+
+def load_templates() -> None:
+    """Compiles every template once (at startup), so no request pays for it."""
+    for name in template_env.list_templates():
+        template_env.get_template(name)
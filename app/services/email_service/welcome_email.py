@@ -1,6 +1,6 @@
 from app.core.config import settings
 from app.services.email_service.template_path import template_env
-from app.services.email_service.srv.mailgun import send_via_mailgun_api
+from app.services.email_service.outbox import email_outbox
 
 async def send_welcome_email(
     from_email: str | None,
@@ -16,8 +16,8 @@ async def send_welcome_email(
         expiry_time=settings.access_token_expire_minutes,
     )
 
-    await send_via_mailgun_api(
-        from_email=from_email or settings.default_from_email,
+    email_outbox.enqueue(
+        from_email=from_email or settings.email_from,
         to_email=to_email,
         subject=subject,
         html_content=html_content,
@@ -1,10 +1,26 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from tracemalloc import start
-from typing import List, Literal
+from typing import Any, Dict, List, Literal, Optional, Union
+import anyio
 from fastapi import HTTPException
 import pandas as pd
+from pandas.api.types import union_categoricals
 from sqlalchemy import TextClause
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
 from app.services.db_operations import DBOperationsServices # noqa;
+from app.core.metrics import observe_etl_memory, observe_etl_retry, observe_etl_stage
+from app.core.config import settings
+from app.db.replica import REPLICA_TABLES, ReplicaStage, ReplicaWriter
+from app.db.sql_server_queries.registry import SourceQuery
+from app.services.count_cache import count_cache
+from app.services.data_version import data_versions
+from app.services.fact_store import fact_store
+from app.utils.date_utils import split_date_range, to_sql_datetime
+from app.utils.row_hash import ROW_HASH_COLUMN, row_hashes
 import logging
+import random
 import time
 import numpy as np
 import os
@@ -16,6 +32,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Repeated text columns from the source queries; stored as categoricals when
+# there are at most CATEGORY_MAX_RATIO distinct values per row
+CATEGORY_COLUMNS = (
+    "CountryCode", "CountryName", "Brand", "PetType", "QuoteReceivedMethod",
+    "SaleMethod", "PolicyStatusName", "ProductName",
+)
+CATEGORY_MAX_RATIO = 0.5
+# frame.attrs key: {column: value} set once per run, written by the loader
+ETL_CONSTANTS = "etl_constants"
+# Business key per fact table for incremental loads (settings.etl_incremental_load);
+# a key can repeat within a window (one row per quote per pet), rows are told
+# apart by their RowHash
+BUSINESS_KEYS: Dict[str, str] = {
+    "Quote": "QuoteNumber",
+    "Sales": "PolicyNumber",
+    "FreePolicySales": "PolicyNumber",
+}
+# anyio.CapacityLimiter per source database ("host/database"), see ETL._source_limiter
+_SOURCE_LIMITERS: Dict[str, anyio.CapacityLimiter] = {}
+
 
 class ETL:
     @staticmethod
@@ -25,41 +61,54 @@ class ETL:
         end_date: str,
         country_code: str,
         country_name: str,
-        query: TextClause,
-        extraction_type: Literal["quote", "sales"] = "quote"
+        query: Union[SourceQuery, TextClause],
+        extraction_type: Literal["quote", "sales", "crm"] = "quote",
+        table_name: str = "unknown",
+        shard: Optional[str] = None,
     ) -> pd.DataFrame:
+        """
+        Runs the source query over start_date..end_date. With `shard` (or
+        settings.etl_extract_shard) set to "week"/"month" the window is read as
+        calendar shards, at most etl_extract_source_concurrency at a time per
+        source database; a shard that hits a connection error or timeout is
+        retried on its own, and the shards are merged in date order.
+        """
         try:
             start = time.time()
- 
-            if extraction_type == 'quote':
-                # Quote queries already handle end-date as exclusive in SQL using DATEADD(DAY, 1, ?)
-                if country_code.lower() in ('nz', 'au'):
-                    params = (start_date, end_date)
-                else:  # UK, DE, AT have two subqueries, each needs start/end
-                    params = (start_date, end_date, start_date, end_date)
-            else:
-                params = (start_date, end_date)
-            
+            shards = split_date_range(start_date, end_date, shard or settings.etl_extract_shard)
+            limiter = ETL._source_limiter(engine)
+            frames: List[Optional[pd.DataFrame]] = [None] * len(shards)
+            failures: List[BaseException] = []
 
-            # Use the engine directly — this engages SQLAlchemy's optimizations
-            df = pd.read_sql_query(
-                sql=query.text,
-                con=engine,
-                params= params 
-            )
+            async def read(index: int, shard_start: str, shard_end: str, cancel_scope) -> None:
+                params = ETL._extraction_params(extraction_type, country_code, shard_start, shard_end, query)
+                try:
+                    frames[index] = await ETL._read_shard(
+                        engine, query, params, limiter, table_name, country_code, f"{shard_start}..{shard_end}",
+                    )
+                except Exception as exc:
+                    # the window is only loadable whole: stop the shards still queued
+                    failures.append(exc)
+                    cancel_scope.cancel()
 
-            df["CountryCode"] = country_code
-            df["CountryName"] = country_name            
-            
-            if country_code.lower() in ('at', 'de'):
-                df["Brand"] = "Petcover"
+            async with anyio.create_task_group() as tg:
+                for index, (shard_start, shard_end) in enumerate(shards):
+                    tg.start_soon(read, index, shard_start, shard_end, tg.cancel_scope)
+            if failures:
+                raise failures[0]
+
+            df = ETL._merge_shards(frames)
+            ETL._tag_region(df, country_code, country_name)
 
             end = time.time()
+            observe_etl_stage(table_name, "extract", country_code, end - start, len(df))
             logger.info(
-                "Extracted %d rows for country_code: %s in %.2f seconds",
+                "Extracted %d rows for country_code: %s in %.2f seconds (%s, %d shard(s))",
                 len(df),
                 country_code,
-                end - start
+                end - start,
+                getattr(query, "name", "unregistered query"),
+                len(shards),
             )
             return df
 
@@ -69,25 +118,79 @@ class ETL:
                 detail=f"Extraction failed: {str(e)}"
             )
 
+    @staticmethod
+    def _source_limiter(engine) -> anyio.CapacityLimiter:
+        """One concurrency cap per source database, shared by every extraction."""
+        key = f"{engine.url.host}/{engine.url.database}"
+        limiter = _SOURCE_LIMITERS.get(key)
+        if limiter is None:
+            limiter = _SOURCE_LIMITERS[key] = anyio.CapacityLimiter(settings.etl_extract_source_concurrency)
+        return limiter
+
+    @staticmethod
+    async def _read_shard(engine, query, params, limiter, table_name, country_code, label) -> pd.DataFrame:
+        attempts = settings.etl_extract_retries + 1
+        def read():
+            started = time.time()
+            # Use the engine directly — this engages SQLAlchemy's optimizations
+            frame = pd.read_sql_query(sql=query.text, con=engine, params=params)
+            return frame, time.time() - started
+
+        for attempt in range(1, attempts + 1):
+            try:
+                frame, elapsed = await anyio.to_thread.run_sync(read, limiter=limiter)
+            except Exception as exc:
+                if not ETL._transient(exc) or attempt == attempts:
+                    raise
+                delay = settings.etl_extract_backoff_seconds * 2 ** (attempt - 1) * random.uniform(1.0, 1.5)
+                observe_etl_retry(table_name, country_code)
+                logger.warning(
+                    "Extract %s/%s %s failed (attempt %d/%d), retrying in %.1fs: %s",
+                    table_name, country_code, label, attempt, attempts, delay, ETL._driver_error(exc),
+                )
+                await anyio.sleep(delay)
+                continue
+            logger.info(
+                "Extracted shard %s/%s %s: %d rows in %.2f seconds",
+                table_name, country_code, label, len(frame), elapsed,
+            )
+            return frame
+
+    @staticmethod
+    def _transient(exc: BaseException) -> bool:
+        """Connection drops and timeouts are worth a retry; SQL errors are not."""
+        if isinstance(exc, pd.errors.DatabaseError) and exc.__cause__ is not None:
+            exc = exc.__cause__  # pandas wraps the SQLAlchemy error
+        if isinstance(exc, DBAPIError):
+            return exc.connection_invalidated or isinstance(exc, (OperationalError, InterfaceError))
+        return isinstance(exc, (TimeoutError, ConnectionError))
+
+    @staticmethod
+    def _driver_error(exc: BaseException) -> str:
+        # the wrapped messages repeat the whole source query
+        cause = exc.__cause__ if isinstance(exc, pd.errors.DatabaseError) else exc
+        return f"{type(cause).__name__}: {getattr(cause, 'orig', None) or cause}"
+
+    @staticmethod
+    def _merge_shards(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        # empty shards come back all-object; leaving them out keeps the dtypes
+        filled = [frame for frame in frames if len(frame)]
+        if not filled:
+            return frames[0]
+        if len(filled) == 1:
+            return filled[0]
+        return pd.concat(filled, ignore_index=True)
+
     @staticmethod
     async def transform(
         data: pd.DataFrame,
-        cleanup_date: List[str] = ['CreatedDate', 'ETLDateUploaded']
+        cleanup_date: List[str] = ['CreatedDate', 'ETLDateUploaded'],
+        table_name: str = "unknown",
+        region: str = "unknown",
     ) -> pd.DataFrame:
         try:
-            data["ETLDateUploaded"] = pd.Timestamp.today().normalize().strftime("%Y-%m-%d") # Current date ETL was triggered
-
-            # print(data["QuoteCreatedDate"])
-
-            def clean_date(col: str):
-                if col in data.columns:
-                    parsed = pd.to_datetime(data[col], errors='coerce')
-                    parsed = parsed.where(parsed >= pd.Timestamp('1753-01-01'))
-                    data[col] = parsed.where(parsed.notna(), np.nan)
-
-            for item in cleanup_date:
-                clean_date(item)
-            
+            start = time.time()
+            data = ETL._transform_frame(data, cleanup_date, table_name, region)
 
             # # Save to excel
             # output_dir = "etl_outputs"
@@ -98,6 +201,10 @@ class ETL:
 
             # logger.info(f"✅ Transformed data saved to Excel: {excel_path}")            
 
+            observe_etl_stage(table_name, "transform", region, time.time() - start, len(data))
+            saved = data.attrs.get("memory_saved_bytes", 0)
+            observe_etl_memory(table_name, region, saved)
+            logger.info("Transform %s/%s saved %.1f MB with compact dtypes", table_name, region, saved / 1e6)
             return data
 
         except Exception as e:
@@ -106,6 +213,104 @@ class ETL:
                 detail=f"Transformation failed: {str(e)}"
             )
 
+    @staticmethod
+    def _extraction_params(
+        extraction_type: str, country_code: str, start_date: str, end_date: str,
+        query: Union[SourceQuery, TextClause, None] = None,
+    ) -> tuple:
+        if isinstance(query, SourceQuery):
+            # registered queries know how many date ranges they bind
+            return query.parameters(start_date, end_date)
+        if extraction_type == 'quote':
+            # Quote queries already handle end-date as exclusive in SQL using DATEADD(DAY, 1, ?)
+            if country_code.lower() in ('nz', 'au'):
+                return (start_date, end_date)
+            # UK, DE, AT have two subqueries, each needs start/end
+            return (start_date, end_date, start_date, end_date)
+        return (start_date, end_date)
+
+    @staticmethod
+    def _tag_region(df: pd.DataFrame, country_code: str, country_name: str) -> None:
+        df["CountryCode"] = country_code
+        df["CountryName"] = country_name
+
+        if country_code.lower() in ('at', 'de'):
+            df["Brand"] = "Petcover"
+
+    @staticmethod
+    def _transform_frame(
+        data: pd.DataFrame,
+        cleanup_date: List[str],
+        table_name: str = "unknown",
+        region: str = "unknown",
+    ) -> pd.DataFrame:
+        # Current date ETL was triggered; one value per run, so it stays a
+        # scalar until the loader writes it (see ETL_CONSTANTS)
+        data.attrs[ETL_CONSTANTS] = {"ETLDateUploaded": pd.Timestamp.today().normalize()}
+
+        # parse (if not already datetime64), 1753 floor and ms truncation in one pass
+        for item in cleanup_date:
+            if item in data.columns:
+                data[item] = to_sql_datetime(data[item])
+        if ETL.incremental(table_name):
+            # on the cleaned values, before dtype compaction: what MIS will hold
+            data[ROW_HASH_COLUMN] = row_hashes(data)
+        return ETL._optimize_dtypes(data, table_name, region)
+
+    @staticmethod
+    def incremental(table_name: str) -> bool:
+        return settings.etl_incremental_load and table_name in BUSINESS_KEYS
+
+    @staticmethod
+    def _optimize_dtypes(data: pd.DataFrame, table_name: str, region: str) -> pd.DataFrame:
+        """Low-cardinality text -> category, integers -> smallest int; bytes saved go to attrs."""
+        before = int(data.memory_usage(deep=True).sum())
+        rows = len(data)
+        for col in CATEGORY_COLUMNS:
+            if col in data.columns and (data[col].dtype == object or isinstance(data[col].dtype, pd.StringDtype)):
+                if data[col].nunique(dropna=True) <= max(1, rows * CATEGORY_MAX_RATIO):
+                    data[col] = data[col].astype("category")
+        for col in data.select_dtypes(include="integer").columns:
+            data[col] = pd.to_numeric(data[col], downcast="integer")
+        # floats stay float64: money columns would lose cents as float32
+        after = int(data.memory_usage(deep=True).sum())
+        data.attrs["memory_saved_bytes"] = before - after
+        logger.debug(
+            "Transform %s/%s: %d rows, %.1f MB -> %.1f MB",
+            table_name, region, rows, before / 1e6, after / 1e6,
+        )
+        return data
+
+    @staticmethod
+    def combine(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """pd.concat for transformed frames: keeps shared categoricals and run constants."""
+        frames = [f for f in frames if len(f.columns)]
+        if not frames:
+            return pd.DataFrame()
+        for col in frames[0].columns:
+            if all(col in f.columns and isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames):
+                # concat turns differing categories into object; align them first
+                categories = union_categoricals([f[col] for f in frames]).categories
+                for f in frames:
+                    f[col] = f[col].cat.set_categories(categories)
+        constants = [f.attrs.get(ETL_CONSTANTS, {}) for f in frames]
+        if any(c != constants[0] for c in constants):
+            # e.g. a run across midnight: write each frame's own values
+            frames = [ETL.with_constants(f) for f in frames]
+            constants = [{}]
+        saved = sum(f.attrs.get("memory_saved_bytes", 0) for f in frames)
+        combined = pd.concat(frames, ignore_index=True)
+        combined.attrs = {ETL_CONSTANTS: constants[0], "memory_saved_bytes": saved}
+        return combined
+
+    @staticmethod
+    def with_constants(data: pd.DataFrame) -> pd.DataFrame:
+        """`data` with the run constants as real columns (for writers that need them)."""
+        constants = data.attrs.get(ETL_CONSTANTS)
+        if not constants:
+            return data
+        return data.assign(**constants)
+
     @staticmethod
     def load(
         data: pd.DataFrame,
@@ -113,19 +318,261 @@ class ETL:
         db_engine,
         start_date: str,
         end_date: str,
+        date_column: str = "CreatedDate",
     ):
+        if not data.attrs.get(ETL_CONSTANTS) and "ETLDateUploaded" not in data.columns:
+            # a plain pd.concat drops attrs when they differ per frame; ETL.combine keeps them
+            data.attrs[ETL_CONSTANTS] = {"ETLDateUploaded": pd.Timestamp.today().normalize()}
         try:
-            result = DBOperationsServices.delete_and_upload_data(
-                df=data,
-                table_name=table_name,
-                db_engine=db_engine,
-                start_date=start_date,
-                end_date=end_date,
-            )
+            if ETL.incremental(table_name) and ROW_HASH_COLUMN in data.columns:
+                result = DBOperationsServices.incremental_upload(
+                    [data], table_name, db_engine, start_date, end_date,
+                    key_column=BUSINESS_KEYS[table_name], total_rows=len(data),
+                )
+            else:
+                result = DBOperationsServices.delete_and_upload_data(
+                    df=data,
+                    table_name=table_name,
+                    db_engine=db_engine,
+                    start_date=start_date,
+                    end_date=end_date,
+                    date_column=date_column,
+                )
             logger.info(result)
-            return result
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Loading failed: {str(e)}"
             )
+        count_cache.bump(table_name)
+        ETL.mirror_to_replica(data, table_name, start_date, end_date, date_column)
+        try:
+            fact_store.apply_load(table_name, data, start_date, end_date)
+        except Exception:
+            logger.exception("Fact store update failed for %s; next refresh will catch up", table_name)
+        ETL.bump_data_version(table_name)
+        return result
+
+    @staticmethod
+    def bump_data_version(table_name: str) -> None:
+        # last, once the replica and the fact store hold the new rows too: a new
+        # version tells every worker's report ETags that the data changed
+        try:
+            data_versions.bump(table_name)
+        except Exception:
+            logger.exception("Data version bump failed for %s; report ETags stay on the old version", table_name)
+
+    @staticmethod
+    def mirror_to_replica(data: pd.DataFrame, table_name: str, start_date: str, end_date: str,
+        date_column: str = "CreatedDate") -> None:
+        """Best effort: a replica failure must not fail a load that reached MIS."""
+        if table_name not in REPLICA_TABLES:
+            return
+        if not (settings.report_backend == "replica" or settings.replica_write_on_load):
+            # not mirroring now, but an earlier backfill must not keep answering for this window
+            ETL.invalidate_replica(table_name, start_date, end_date, date_column)
+            return
+        if REPLICA_TABLES[table_name] != date_column:
+            # the replica partitions by another date, so this window is not one of its windows
+            logger.info("Replica %s not mirrored: loaded by %s, partitioned by %s",
+                        table_name, date_column, REPLICA_TABLES[table_name])
+            ETL.invalidate_replica(table_name, start_date, end_date, date_column)
+            return
+        try:
+            ReplicaWriter.write_window(ETL.with_constants(data), table_name, start_date, end_date)
+        except Exception:
+            logger.exception("Replica write failed for %s (%s to %s)", table_name, start_date, end_date)
+            ETL.invalidate_replica(table_name, start_date, end_date, date_column)
+
+    @staticmethod
+    def invalidate_replica(table_name: str, start_date: str, end_date: str,
+        date_column: str = "CreatedDate") -> None:
+        """
+        For a load that reached MIS but not the replica: the window stops being
+        mirrored, or the whole table when it was loaded by another date than the
+        replica's (CRM by QuoteStartDate), since rows of any of its months may
+        have changed. Reads there go to MIS until python -m app.db.replica
+        --backfill copies them again.
+        """
+        try:
+            if REPLICA_TABLES[table_name] == date_column:
+                ReplicaWriter.invalidate(table_name, start_date, end_date)
+            else:
+                ReplicaWriter.invalidate(table_name)
+        except Exception:
+            logger.exception("Replica invalidation failed for %s; its mirrored ranges are stale", table_name)
+
+    @staticmethod
+    async def stream_load(
+        regions: List[Dict[str, Any]],
+        table_name: str,
+        db_engine,
+        start_date: str,
+        end_date: str,
+        cleanup_date: List[str],
+        extraction_type: Literal["quote", "sales", "crm"] = "quote",
+        progress: Optional[Any] = None,
+        lease: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Streaming alternative to extraction -> transform -> pd.concat -> load.
+
+        Every region is read with `chunksize` on its own thread, each chunk
+        is transformed and handed to the loader through a bounded queue, and
+        the loader inserts while the regions are still being read. Peak
+        memory is about (regions + queue slots + 1) chunks whatever the date
+        range. The load keeps delete_and_upload_data's semantics: one
+        transaction, rolled back if any region fails.
+
+        `progress` (an etl_jobs.PipelineProgress) is told about every
+        extracted and inserted chunk and can cancel the load between chunks;
+        a lost `lease` (etl_lease.ETLLease) aborts it the same way.
+        """
+        return await anyio.to_thread.run_sync(
+            lambda: ETL._run_stream(
+                regions, table_name, db_engine, start_date, end_date, cleanup_date, extraction_type,
+                progress, lease,
+            )
+        )
+
+    @staticmethod
+    def _extract_chunks(region: Dict[str, Any], start_date: str, end_date: str, extraction_type: str):
+        params = ETL._extraction_params(
+            extraction_type, region["country_code"], start_date, end_date, region["query"]
+        )
+        # stream_results: the driver fetches as pandas asks, instead of buffering the result
+        with region["engine"].connect().execution_options(stream_results=True) as conn:
+            for chunk in pd.read_sql_query(
+                sql=region["query"].text, con=conn, params=params,
+                chunksize=settings.etl_stream_chunk_rows,
+            ):
+                ETL._tag_region(chunk, region["country_code"], region["country_name"])
+                yield chunk
+
+    @staticmethod
+    def _run_stream(regions, table_name, db_engine, start_date, end_date, cleanup_date, extraction_type,
+        progress=None, lease=None):
+        chunks: "queue.Queue" = queue.Queue(maxsize=settings.etl_stream_queue_chunks)
+        stop = threading.Event()
+        done = object()
+
+        def offer(item) -> bool:
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(region):
+            code = region["country_code"]
+            extract_seconds = transform_seconds = 0.0
+            rows = saved = 0
+            try:
+                started = time.time()
+                for chunk in ETL._extract_chunks(region, start_date, end_date, extraction_type):
+                    extract_seconds += time.time() - started
+                    started = time.time()
+                    chunk = ETL._transform_frame(chunk, cleanup_date, table_name, code)
+                    transform_seconds += time.time() - started
+                    rows += len(chunk)
+                    saved += chunk.attrs.get("memory_saved_bytes", 0)
+                    if progress is not None:
+                        progress.extracted(code, len(chunk))
+                    if not offer(chunk):
+                        return
+                    started = time.time()
+                observe_etl_stage(table_name, "extract", code, extract_seconds, rows)
+                observe_etl_stage(table_name, "transform", code, transform_seconds, rows)
+                observe_etl_memory(table_name, code, saved)
+                logger.info(
+                    "Extracted %d rows for country_code: %s (streamed, %.1f MB saved by compact dtypes)",
+                    rows, code, saved / 1e6,
+                )
+                if progress is not None:
+                    progress.region_done(code)
+            except Exception as e:
+                if progress is not None:
+                    progress.region_done(code, error=str(e))
+                offer(HTTPException(status_code=500, detail=f"Extraction failed ({code}): {e}"))
+            finally:
+                offer(done)
+
+        replica = None
+        if (settings.report_backend == "replica" or settings.replica_write_on_load) and table_name in REPLICA_TABLES:
+            replica = ReplicaStage(table_name, start_date, end_date)
+        facts = fact_store.begin_load(table_name)
+        loaded = {"rows": 0}
+
+        def consume():
+            nonlocal replica
+            remaining = len(regions)
+            while remaining:
+                if progress is not None:
+                    progress.raise_if_cancelled()
+                if lease is not None:
+                    lease.check()
+                try:
+                    # wake up now and then so a cancel is not stuck behind a slow region
+                    item = chunks.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if item is done:
+                    remaining -= 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                loaded["rows"] += len(item)
+                yield item
+                if progress is not None:
+                    progress.inserted(len(item))
+                # derived stores see the chunk after the insert consumed it
+                if replica is not None:
+                    try:
+                        replica.add(ETL.with_constants(item))
+                    except Exception:
+                        logger.exception("Replica staging failed for %s; skipping mirror", table_name)
+                        replica.discard()
+                        replica = None
+                if facts is not None:
+                    facts.add(item)
+
+        with ThreadPoolExecutor(max_workers=len(regions), thread_name_prefix=f"etl-{table_name}") as pool:
+            for region in regions:
+                pool.submit(produce, region)
+            try:
+                if ETL.incremental(table_name):
+                    result = DBOperationsServices.incremental_upload(
+                        consume(), table_name, db_engine, start_date, end_date,
+                        key_column=BUSINESS_KEYS[table_name],
+                    )
+                else:
+                    result = DBOperationsServices.delete_and_stream_upload(
+                        consume(), table_name, db_engine, start_date, end_date
+                    )
+            except Exception:
+                if replica is not None:
+                    replica.discard()
+                raise
+            finally:
+                stop.set()
+
+        logger.info(result)
+        count_cache.bump(table_name)
+        if replica is not None:
+            try:
+                replica.commit()
+            except Exception:
+                logger.exception("Replica write failed for %s (%s to %s)", table_name, start_date, end_date)
+                ETL.invalidate_replica(table_name, start_date, end_date)
+        elif table_name in REPLICA_TABLES:
+            # mirroring is off, or staging failed part-way
+            ETL.invalidate_replica(table_name, start_date, end_date)
+        if facts is not None:
+            try:
+                facts.commit(start_date, end_date)
+            except Exception:
+                logger.exception("Fact store update failed for %s; next refresh will catch up", table_name)
+        ETL.bump_data_version(table_name)
+        return {"rows_loaded": loaded["rows"], "load_status": result}
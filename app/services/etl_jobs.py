@@ -0,0 +1,599 @@
+"""
+Background ETL jobs.
+
+GET /etl_mis/etl_route runs every pipeline inside one HTTP request: proxies
+time out, the worker is tied up and a client retry starts a second load of
+the same tables. Jobs run the same pipelines (streaming mode: bounded
+memory, one transaction per table) on the worker's event loop instead:
+
+- POST /etl_mis/jobs starts a job and returns its id straight away; 409 while
+  a job for any of the same tables is still running in this worker;
+- GET /etl_mis/jobs/{job_id} reports progress per pipeline and per region:
+  rows extracted, chunks and rows inserted, and an ETA based on the size and
+  speed of the last successful run of that pipeline;
+- POST /etl_mis/jobs/{job_id}/cancel stops the job between chunks. The table
+  being loaded rolls back; tables that already finished stay loaded;
+- every job is recorded in the MIS table ETLRunHistory;
+- with ETL_SCHEDULER_ENABLED, ETL_SCHEDULES (daily "at" or "every_minutes")
+  start jobs without an external cron hitting the API.
+
+Each pipeline runs under the table's ETL lease (app.services.etl_lease), so
+a job never loads a table and date range another worker is already
+loading; such a pipeline is marked "skipped".
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import anyio
+from fastapi import HTTPException, status
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services.etl import ETL
+from app.services.etl_lease import ETLLeaseConflict, etl_lease
+from app.services.etl_pipelines import PIPELINES, build_regions, source_engines
+
+logger = logging.getLogger(__name__)
+
+# how long shutdown waits for cancelled jobs to roll back
+SHUTDOWN_GRACE_SECONDS = 30
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class ETLJobCancelled(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _error_text(e: Exception) -> str:
+    return str(getattr(e, "detail", None) or e)[:4000]
+
+
+class PipelineProgress:
+    """
+    Progress of one pipeline in a job. ETL._run_stream calls the hooks from
+    its producer and loader threads, so every update takes the job lock.
+    """
+
+    def __init__(self, job: "ETLJob", pipeline: str):
+        self._job = job
+        self.pipeline = pipeline
+        self.status = "pending"
+        self.regions: Dict[str, Dict[str, Any]] = {}
+        self.rows_extracted = 0
+        self.rows_inserted = 0
+        self.chunks_inserted = 0
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        # (rows, seconds) expected from previous runs; None until one succeeded
+        self.expected: Optional[Tuple[int, float]] = None
+        self._started = 0.0
+
+    # -------- hooks for ETL._run_stream --------
+    def extracted(self, region: str, rows: int) -> None:
+        with self._job._lock:
+            entry = self._region(region)
+            entry["rows_extracted"] += rows
+            entry["chunks"] += 1
+            self.rows_extracted += rows
+
+    def region_done(self, region: str, error: Optional[str] = None) -> None:
+        with self._job._lock:
+            entry = self._region(region)
+            entry["status"] = "failed" if error else "extracted"
+            entry["error"] = error
+
+    def inserted(self, rows: int) -> None:
+        with self._job._lock:
+            self.rows_inserted += rows
+            self.chunks_inserted += 1
+
+    def raise_if_cancelled(self) -> None:
+        if self._job.cancel_requested.is_set():
+            raise ETLJobCancelled(f"ETL job {self._job.id} cancelled")
+
+    # -------- runner side --------
+    def start(self) -> None:
+        with self._job._lock:
+            self.status = "running"
+            self.started_at = _now()
+            self._started = time.monotonic()
+
+    def finish(self, state: str, error: Optional[str] = None) -> None:
+        with self._job._lock:
+            self.status = state
+            self.error = error
+            self.finished_at = _now()
+
+    def _region(self, region: str) -> Dict[str, Any]:
+        return self.regions.setdefault(
+            region, {"status": "extracting", "rows_extracted": 0, "chunks": 0, "error": None}
+        )
+
+    def eta_seconds(self) -> Optional[float]:
+        if self.status == "pending":
+            return round(self.expected[1], 1) if self.expected else None
+        if self.status != "running":
+            return 0.0 if self.status == "succeeded" else None
+        elapsed = time.monotonic() - self._started
+        if self.expected and self.rows_inserted and elapsed > 0:
+            remaining_rows = max(self.expected[0] - self.rows_inserted, 0)
+            return round(remaining_rows / (self.rows_inserted / elapsed), 1)
+        if self.expected:
+            return round(max(self.expected[1] - elapsed, 0.0), 1)
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        duration = None
+        if self.started_at is not None:
+            duration = ((self.finished_at or _now()) - self.started_at).total_seconds()
+        return {
+            "status": self.status,
+            "table_name": PIPELINES[self.pipeline].table_name,
+            "rows_extracted": self.rows_extracted,
+            "rows_inserted": self.rows_inserted,
+            "chunks_inserted": self.chunks_inserted,
+            "expected_rows": self.expected[0] if self.expected else None,
+            "eta_seconds": self.eta_seconds(),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "duration_seconds": round(duration, 1) if duration is not None else None,
+            "regions": {code: dict(entry) for code, entry in self.regions.items()},
+            "error": self.error,
+        }
+
+
+class ETLJob:
+    def __init__(self, pipelines: Sequence[str], start_date: date, end_date: date, triggered_by: str):
+        self.id = uuid.uuid4().hex
+        self.pipelines = list(pipelines)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.triggered_by = triggered_by
+        self.status = "queued"
+        self.created_at = _now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.rows_loaded = 0
+        self.error: Optional[str] = None
+        self.cancel_requested = threading.Event()
+        self._lock = threading.Lock()
+        self.progress = {name: PipelineProgress(self, name) for name in self.pipelines}
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def eta_seconds(self) -> Optional[float]:
+        if not self.active:
+            return None
+        etas = [p.eta_seconds() for p in self.progress.values() if p.status in ("pending", "running")]
+        return round(sum(etas), 1) if etas and None not in etas else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "pipelines": self.pipelines,
+                "start_date": self.start_date.isoformat(),
+                "end_date": self.end_date.isoformat(),
+                "triggered_by": self.triggered_by,
+                "created_at": _iso(self.created_at),
+                "started_at": _iso(self.started_at),
+                "finished_at": _iso(self.finished_at),
+                "rows_loaded": self.rows_loaded,
+                "cancel_requested": self.cancel_requested.is_set(),
+                "eta_seconds": self.eta_seconds(),
+                "progress": {name: p.as_dict() for name, p in self.progress.items()},
+                "error": self.error,
+            }
+
+
+class ETLRunHistory:
+    """ETLRunHistory in MIS: one row per job, upserted as the job moves on."""
+
+    TABLE = "ETLRunHistory"
+
+    def __init__(self):
+        self._ready = False
+
+    @staticmethod
+    def _engine():
+        from app.db import sqlserver  # engines are created on import
+
+        return sqlserver.get_mis_db_engine()
+
+    def _ensure_table(self, conn) -> None:
+        if self._ready:
+            return
+        conn.execute(text(f"""
+        IF OBJECT_ID('dbo.{self.TABLE}', 'U') IS NULL
+        BEGIN
+            CREATE TABLE dbo.{self.TABLE} (
+                JobId NVARCHAR(32) NOT NULL PRIMARY KEY,
+                Pipelines NVARCHAR(200) NOT NULL,
+                StartDate DATE NOT NULL,
+                EndDate DATE NOT NULL,
+                TriggeredBy NVARCHAR(100) NOT NULL,
+                Status NVARCHAR(20) NOT NULL,
+                CreatedAt DATETIME2 NOT NULL,
+                StartedAt DATETIME2 NULL,
+                FinishedAt DATETIME2 NULL,
+                RowsLoaded BIGINT NULL,
+                Progress NVARCHAR(MAX) NULL,
+                Error NVARCHAR(MAX) NULL
+            );
+            CREATE INDEX IX_{self.TABLE}_CreatedAt ON dbo.{self.TABLE}(CreatedAt);
+        END
+        """))
+        self._ready = True
+
+    @staticmethod
+    def _naive(value: Optional[datetime]) -> Optional[datetime]:
+        # stored as UTC in DATETIME2
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value is not None else None
+
+    def save(self, job: ETLJob) -> None:
+        row = job.as_dict()
+        params = {
+            "job_id": job.id,
+            "pipelines": ",".join(job.pipelines),
+            "start_date": job.start_date,
+            "end_date": job.end_date,
+            "triggered_by": job.triggered_by[:100],
+            "status": row["status"],
+            "created_at": self._naive(job.created_at),
+            "started_at": self._naive(job.started_at),
+            "finished_at": self._naive(job.finished_at),
+            "rows_loaded": job.rows_loaded,
+            "progress": json.dumps(row["progress"]),
+            "error": job.error,
+        }
+        with self._engine().begin() as conn:
+            self._ensure_table(conn)
+            updated = conn.execute(text(f"""
+                UPDATE dbo.{self.TABLE}
+                SET Status = :status, StartedAt = :started_at, FinishedAt = :finished_at,
+                    RowsLoaded = :rows_loaded, Progress = :progress, Error = :error
+                WHERE JobId = :job_id
+            """), params).rowcount
+            if not updated:
+                conn.execute(text(f"""
+                    INSERT INTO dbo.{self.TABLE} (
+                        JobId, Pipelines, StartDate, EndDate, TriggeredBy, Status, CreatedAt,
+                        StartedAt, FinishedAt, RowsLoaded, Progress, Error
+                    ) VALUES (
+                        :job_id, :pipelines, :start_date, :end_date, :triggered_by, :status, :created_at,
+                        :started_at, :finished_at, :rows_loaded, :progress, :error
+                    )
+                """), params)
+
+    @staticmethod
+    def _as_dict(row) -> Dict[str, Any]:
+        def utc(value):
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            return value.replace(tzinfo=timezone.utc).isoformat() if value is not None else None
+
+        return {
+            "job_id": row.JobId,
+            "status": row.Status,
+            "pipelines": row.Pipelines.split(","),
+            "start_date": str(row.StartDate)[:10],
+            "end_date": str(row.EndDate)[:10],
+            "triggered_by": row.TriggeredBy,
+            "created_at": utc(row.CreatedAt),
+            "started_at": utc(row.StartedAt),
+            "finished_at": utc(row.FinishedAt),
+            "rows_loaded": row.RowsLoaded,
+            "cancel_requested": False,
+            "eta_seconds": None,
+            "progress": json.loads(row.Progress) if row.Progress else {},
+            "error": row.Error,
+        }
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._engine().begin() as conn:
+            self._ensure_table(conn)
+            row = conn.execute(
+                text(f"SELECT * FROM dbo.{self.TABLE} WHERE JobId = :job_id"), {"job_id": job_id}
+            ).fetchone()
+        return self._as_dict(row) if row else None
+
+    def recent(self, limit: int, status_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        where = "WHERE Status = :status" if status_filter else ""
+        with self._engine().begin() as conn:
+            self._ensure_table(conn)
+            rows = conn.execute(
+                text(
+                    f"SELECT * FROM dbo.{self.TABLE} {where} ORDER BY CreatedAt DESC "
+                    f"OFFSET 0 ROWS FETCH NEXT {int(limit)} ROWS ONLY"
+                ),
+                {"status": status_filter},
+            ).fetchall()
+        return [self._as_dict(row) for row in rows]
+
+    def expected(self, pipeline: str, window_days: int) -> Optional[Tuple[int, float]]:
+        """(rows, seconds) of the last successful load of `pipeline`, scaled to `window_days`."""
+        for run in self.recent(20, status_filter="succeeded"):
+            stats = run["progress"].get(pipeline)
+            if not stats or not stats.get("rows_inserted") or not stats.get("duration_seconds"):
+                continue
+            days = (date.fromisoformat(run["end_date"]) - date.fromisoformat(run["start_date"])).days + 1
+            scale = window_days / max(days, 1)
+            return int(stats["rows_inserted"] * scale), float(stats["duration_seconds"]) * scale
+        return None
+
+    def last_created(self, triggered_by: str) -> Optional[datetime]:
+        with self._engine().begin() as conn:
+            self._ensure_table(conn)
+            value = conn.execute(
+                text(f"SELECT MAX(CreatedAt) FROM dbo.{self.TABLE} WHERE TriggeredBy = :triggered_by"),
+                {"triggered_by": triggered_by},
+            ).scalar()
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value.replace(tzinfo=timezone.utc) if value is not None else None
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """One ETL_SCHEDULES entry; times are the worker's local time, like the endpoint date defaults."""
+
+    name: str
+    pipelines: Tuple[str, ...]
+    days_back: int
+    at: Optional[dt_time] = None
+    every: Optional[timedelta] = None
+
+    @staticmethod
+    def parse(raw: Dict[str, Any]) -> "Schedule":
+        name = str(raw["name"])
+        pipelines = tuple(raw.get("pipelines") or PIPELINES)
+        unknown = [p for p in pipelines if p not in PIPELINES]
+        if unknown:
+            raise ValueError(f"schedule {name}: unknown pipelines {unknown}")
+        at = dt_time.fromisoformat(raw["at"]) if raw.get("at") else None
+        every = timedelta(minutes=float(raw["every_minutes"])) if raw.get("every_minutes") else None
+        if (at is None) == (every is None):
+            raise ValueError(f"schedule {name}: set exactly one of 'at' or 'every_minutes'")
+        return Schedule(name, pipelines, int(raw.get("days_back", 365)), at, every)
+
+    @property
+    def trigger(self) -> str:
+        return f"schedule:{self.name}"
+
+    def due(self, last: datetime, now: datetime) -> bool:
+        if self.every is not None:
+            return now >= last + self.every
+        slot = datetime.combine(now.date(), self.at)
+        return now >= slot > last
+
+    def window(self, today: date) -> Tuple[date, date]:
+        return today - timedelta(days=self.days_back), today
+
+
+class ETLJobManager:
+    def __init__(self):
+        self._jobs: "OrderedDict[str, ETLJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.history = ETLRunHistory()
+
+    # -------- API --------
+    def submit(self, pipelines: Sequence[str], start_date: date, end_date: date,
+        triggered_by: str = "api") -> ETLJob:
+        pipelines = list(dict.fromkeys(pipelines))
+        unknown = [p for p in pipelines if p not in PIPELINES]
+        if unknown or not pipelines:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown pipelines: {unknown}; expected some of {list(PIPELINES)}",
+            )
+        if start_date > end_date:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date is after end_date")
+        for other in self._jobs.values():
+            busy = set(other.pipelines) & set(pipelines)
+            if other.active and busy:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"ETL job {other.id} is already loading {sorted(busy)}",
+                )
+        job = ETLJob(pipelines, start_date, end_date, triggered_by)
+        self._jobs[job.id] = job
+        self._tasks[job.id] = asyncio.create_task(self._run(job))
+        logger.info("ETL job %s queued (%s, %s to %s, %s)", job.id, pipelines, start_date, end_date, triggered_by)
+        return job
+
+    async def get(self, job_id: str) -> Dict[str, Any]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.as_dict()
+        found = await anyio.to_thread.run_sync(lambda: self.history.get(job_id))
+        if found is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="ETL job not found")
+        return found
+
+    async def recent(self, limit: int) -> List[Dict[str, Any]]:
+        try:
+            runs = await anyio.to_thread.run_sync(lambda: self.history.recent(limit))
+        except Exception:
+            logger.exception("Could not read ETL run history")
+            runs = []
+        # this worker's jobs are fresher than their last history write
+        live = {job.id: job.as_dict() for job in self._jobs.values()}
+        merged = {run["job_id"]: run for run in runs}
+        merged.update(live)
+        return sorted(merged.values(), key=lambda run: run["created_at"], reverse=True)[:limit]
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="ETL job not found in this worker",
+            )
+        if not job.active:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"ETL job {job_id} already {job.status}",
+            )
+        job.cancel_requested.set()
+        logger.info("ETL job %s cancel requested", job_id)
+        return job.as_dict()
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs and give their loads a moment to roll back."""
+        tasks = [self._tasks[job_id] for job_id, job in self._jobs.items() if job.active and job_id in self._tasks]
+        for job in self._jobs.values():
+            if job.active:
+                job.cancel_requested.set()
+        if tasks:
+            await asyncio.wait(tasks, timeout=SHUTDOWN_GRACE_SECONDS)
+
+    # -------- runner --------
+    async def _save(self, job: ETLJob) -> None:
+        try:
+            await anyio.to_thread.run_sync(lambda: self.history.save(job))
+        except Exception:
+            logger.exception("Could not record ETL job %s in %s", job.id, ETLRunHistory.TABLE)
+
+    async def _expected(self, pipeline: str, window_days: int) -> Optional[Tuple[int, float]]:
+        try:
+            return await anyio.to_thread.run_sync(lambda: self.history.expected(pipeline, window_days))
+        except Exception:
+            logger.debug("No ETA baseline for %s", pipeline, exc_info=True)
+            return None
+
+    async def _run(self, job: ETLJob) -> None:
+        from app.db import sqlserver  # engines are created on import
+
+        start, end = job.start_date.isoformat(), job.end_date.isoformat()
+        window_days = (job.end_date - job.start_date).days + 1
+        for name in job.pipelines:
+            job.progress[name].expected = await self._expected(name, window_days)
+        with job._lock:
+            job.status = "running"
+            job.started_at = _now()
+        await self._save(job)
+        final, error = "failed", None
+        try:
+            engines = source_engines()
+            mis_engine = sqlserver.get_mis_db_engine()
+            for name in job.pipelines:
+                progress = job.progress[name]
+                if job.cancel_requested.is_set():
+                    break
+                pipeline = PIPELINES[name]
+                progress.start()
+                await self._save(job)
+                try:
+                    async with etl_lease(pipeline.table_name, start, end, f"job:{job.id}") as lease:
+                        result = await ETL.stream_load(
+                            build_regions(pipeline, engines), pipeline.table_name, mis_engine, start, end,
+                            list(pipeline.cleanup_dates), extraction_type=pipeline.extraction_type,
+                            progress=progress, lease=lease,
+                        )
+                except ETLLeaseConflict as e:
+                    # another run (another worker, or a direct /etl_* call) is loading
+                    # this table and range; a lease lost mid-load surfaces as a failed load
+                    logger.warning("ETL job %s skipped %s: %s", job.id, name, e.detail)
+                    progress.finish("skipped", e.detail)
+                    continue
+                except Exception as e:
+                    if job.cancel_requested.is_set():
+                        progress.finish("cancelled")
+                        break
+                    progress.finish("failed", _error_text(e))
+                    raise
+                progress.finish("succeeded")
+                with job._lock:
+                    job.rows_loaded += result["rows_loaded"]
+                await self._save(job)
+            if job.cancel_requested.is_set():
+                final = "cancelled"
+            elif all(p.status == "skipped" for p in job.progress.values()):
+                final = "skipped"
+            else:
+                final = "succeeded"
+        except asyncio.CancelledError:
+            final, error = "cancelled", "worker shutting down"
+            raise
+        except Exception as e:
+            logger.exception("ETL job %s failed", job.id)
+            error = _error_text(e)
+        finally:
+            for progress in job.progress.values():
+                if progress.status == "pending":
+                    progress.finish("skipped")
+                elif progress.status == "running":
+                    progress.finish(final, error)
+            with job._lock:
+                job.status = final
+                job.error = error
+                job.finished_at = _now()
+            await self._save(job)
+            self._tasks.pop(job.id, None)
+            self._trim()
+            logger.info("ETL job %s %s (%d rows)", job.id, job.status, job.rows_loaded)
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(self._jobs) - settings.etl_jobs_kept_in_memory)]:
+            del self._jobs[job_id]
+
+    # -------- scheduler --------
+    async def run_scheduler(self) -> None:
+        """Start scheduled jobs when due; a run missed while no worker was up is caught up once."""
+        try:
+            schedules = [Schedule.parse(raw) for raw in settings.etl_schedules]
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error("ETL_SCHEDULES is invalid, scheduler not started: %s", e)
+            return
+        if not schedules:
+            logger.info("ETL scheduler enabled but ETL_SCHEDULES is empty")
+            return
+
+        started = datetime.now()
+        last: Dict[str, datetime] = {}
+        for schedule in schedules:
+            try:
+                previous = await anyio.to_thread.run_sync(lambda: self.history.last_created(schedule.trigger))
+            except Exception:
+                logger.exception("Could not read the last %s run; counting from now", schedule.name)
+                previous = None
+            # never run before: wait for the first slot instead of firing on deploy
+            last[schedule.name] = previous.astimezone().replace(tzinfo=None) if previous else started
+        logger.info("ETL scheduler started: %s", [s.name for s in schedules])
+
+        while True:
+            now = datetime.now()
+            for schedule in schedules:
+                if not schedule.due(last[schedule.name], now):
+                    continue
+                last[schedule.name] = now
+                start_date, end_date = schedule.window(now.date())
+                try:
+                    self.submit(schedule.pipelines, start_date, end_date, triggered_by=schedule.trigger)
+                except HTTPException as e:
+                    logger.warning("Scheduled ETL %s skipped: %s", schedule.name, e.detail)
+            await asyncio.sleep(settings.etl_scheduler_poll_seconds)
+
+
+etl_jobs = ETLJobManager()
@@ -0,0 +1,221 @@
+"""
+Exclusive ETL leases, stored in MIS (dbo.ETLLease).
+
+Two loads of the same table and overlapping dates would both run the
+batched DELETE and the chunked inserts, fighting over locks and doubling
+the work on SQL Server. Every ETL run (endpoint or background job) holds a
+lease on (table, start_date..end_date) for its whole duration:
+
+- acquiring fails with 409, or waits up to `wait_seconds`, while a live
+  lease overlaps the range;
+- a heartbeat thread pushes ExpiresAt forward every etl_lease_ttl_seconds/3;
+  the lease of a worker that died expires after etl_lease_ttl_seconds and
+  is reclaimed by the next acquire;
+- a holder whose heartbeat finds the lease gone (reclaimed after the
+  database was unreachable for a whole TTL) stops between chunks.
+
+Times are the database clock (GETDATE()), so workers with skewed clocks
+agree on expiry.
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import anyio
+from fastapi import HTTPException, status
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "ETLLease"
+_ready = False
+
+
+def _engine():
+    from app.db import sqlserver  # engines are created on import
+
+    return sqlserver.get_mis_db_engine()
+
+
+def _ensure_table(conn) -> None:
+    global _ready
+    if _ready:
+        return
+    conn.execute(text(f"""
+    IF OBJECT_ID('dbo.{TABLE}', 'U') IS NULL
+    BEGIN
+        CREATE TABLE dbo.{TABLE} (
+            LeaseId NVARCHAR(32) NOT NULL PRIMARY KEY,
+            TableName NVARCHAR(128) NOT NULL,
+            StartDate DATE NOT NULL,
+            EndDate DATE NOT NULL,
+            Holder NVARCHAR(200) NOT NULL,
+            AcquiredAt DATETIME NOT NULL,
+            HeartbeatAt DATETIME NOT NULL,
+            ExpiresAt DATETIME NOT NULL
+        );
+        CREATE INDEX IX_{TABLE}_TableName ON dbo.{TABLE}(TableName, StartDate, EndDate);
+    END
+    """))
+    _ready = True
+
+
+class ETLLeaseConflict(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+class ETLLease:
+    def __init__(self, table_name: str, start_date: str, end_date: str, holder: str):
+        self.id = uuid.uuid4().hex
+        self.table_name = table_name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{holder}"[:200]
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    # -------- acquire / release --------
+    def try_acquire(self) -> Optional[Dict[str, Any]]:
+        """Takes the lease and returns None, or returns the live lease in the way."""
+        params = {
+            "lease_id": self.id, "table_name": self.table_name,
+            "start_date": self.start_date, "end_date": self.end_date,
+            "holder": self.holder, "ttl": settings.etl_lease_ttl_seconds,
+        }
+        with _engine().begin() as conn:
+            _ensure_table(conn)
+            reclaimed = conn.execute(text(f"""
+                DELETE FROM dbo.{TABLE}
+                WHERE TableName = :table_name AND ExpiresAt < GETDATE()
+            """), params).rowcount
+            if reclaimed:
+                logger.warning("Reclaimed %d stale ETL lease(s) on %s", reclaimed, self.table_name)
+            # UPDLOCK+HOLDLOCK: range-locks the overlap check until commit, so two
+            # acquirers cannot both see "free" and both insert
+            row = conn.execute(text(f"""
+                SELECT LeaseId, Holder, StartDate, EndDate, AcquiredAt, ExpiresAt
+                FROM dbo.{TABLE} WITH (UPDLOCK, HOLDLOCK)
+                WHERE TableName = :table_name
+                  AND StartDate <= :end_date AND EndDate >= :start_date
+            """), params).fetchone()
+            if row is not None:
+                return {
+                    "lease_id": row.LeaseId, "holder": row.Holder,
+                    "start_date": str(row.StartDate)[:10], "end_date": str(row.EndDate)[:10],
+                    "acquired_at": str(row.AcquiredAt), "expires_at": str(row.ExpiresAt),
+                }
+            conn.execute(text(f"""
+                INSERT INTO dbo.{TABLE} (
+                    LeaseId, TableName, StartDate, EndDate, Holder, AcquiredAt, HeartbeatAt, ExpiresAt
+                ) VALUES (
+                    :lease_id, :table_name, :start_date, :end_date, :holder,
+                    GETDATE(), GETDATE(), DATEADD(SECOND, :ttl, GETDATE())
+                )
+            """), params)
+        self._start_heartbeat()
+        logger.info(
+            "ETL lease %s on %s %s..%s taken by %s",
+            self.id, self.table_name, self.start_date, self.end_date, self.holder,
+        )
+        return None
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout=5)
+        try:
+            with _engine().begin() as conn:
+                conn.execute(text(f"DELETE FROM dbo.{TABLE} WHERE LeaseId = :lease_id"), {"lease_id": self.id})
+        except Exception:
+            # it expires on its own after etl_lease_ttl_seconds
+            logger.exception("Could not release ETL lease %s on %s", self.id, self.table_name)
+
+    def check(self) -> None:
+        """Raise if the lease was lost; long-running holders call this between chunks."""
+        if self.lost.is_set():
+            raise ETLLeaseConflict(
+                f"ETL lease on {self.table_name} {self.start_date}..{self.end_date} was lost; load aborted"
+            )
+
+    # -------- heartbeat --------
+    def _start_heartbeat(self) -> None:
+        self._heartbeat = threading.Thread(
+            target=self._beat, name=f"etl-lease-{self.table_name}", daemon=True
+        )
+        self._heartbeat.start()
+
+    def _beat(self) -> None:
+        interval = max(1.0, settings.etl_lease_ttl_seconds / 3)
+        while not self._stop.wait(interval):
+            try:
+                with _engine().begin() as conn:
+                    renewed = conn.execute(text(f"""
+                        UPDATE dbo.{TABLE}
+                        SET HeartbeatAt = GETDATE(), ExpiresAt = DATEADD(SECOND, :ttl, GETDATE())
+                        WHERE LeaseId = :lease_id
+                    """), {"lease_id": self.id, "ttl": settings.etl_lease_ttl_seconds}).rowcount
+            except Exception:
+                # keep trying: the lease only goes once it has expired and been reclaimed
+                logger.warning("ETL lease %s heartbeat failed", self.id, exc_info=True)
+                continue
+            if not renewed:
+                logger.error("ETL lease %s on %s was reclaimed by another run", self.id, self.table_name)
+                self.lost.set()
+                return
+
+
+@asynccontextmanager
+async def etl_lease(table_name: str, start_date: str, end_date: str, holder: str, wait_seconds: float = 0):
+    """
+    Hold the ETL lease for `table_name` and the date range for the body of
+    the `async with`. Raises ETLLeaseConflict (409) if an overlapping run
+    still holds it after `wait_seconds`.
+    """
+    lease = ETLLease(table_name, start_date, end_date, holder)
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        blocking = await anyio.to_thread.run_sync(lease.try_acquire)
+        if blocking is None:
+            break
+        if time.monotonic() >= deadline:
+            raise ETLLeaseConflict(
+                f"{table_name} {blocking['start_date']}..{blocking['end_date']} is being loaded by "
+                f"{blocking['holder']} (lease {blocking['lease_id']}, expires {blocking['expires_at']})"
+            )
+        logger.info("Waiting for ETL lease on %s held by %s", table_name, blocking["holder"])
+        await asyncio.sleep(min(settings.etl_lease_poll_seconds, max(0.0, deadline - time.monotonic())))
+    try:
+        yield lease
+    finally:
+        await anyio.to_thread.run_sync(lease.release)
+
+
+def active_leases() -> List[Dict[str, Any]]:
+    with _engine().begin() as conn:
+        _ensure_table(conn)
+        rows = conn.execute(text(f"""
+            SELECT LeaseId, TableName, StartDate, EndDate, Holder, AcquiredAt, HeartbeatAt, ExpiresAt,
+                   CASE WHEN ExpiresAt < GETDATE() THEN 1 ELSE 0 END AS Expired
+            FROM dbo.{TABLE}
+            ORDER BY AcquiredAt
+        """)).fetchall()
+    return [
+        {
+            "lease_id": row.LeaseId, "table_name": row.TableName,
+            "start_date": str(row.StartDate)[:10], "end_date": str(row.EndDate)[:10],
+            "holder": row.Holder, "acquired_at": str(row.AcquiredAt),
+            "heartbeat_at": str(row.HeartbeatAt), "expires_at": str(row.ExpiresAt),
+            "expired": bool(row.Expired),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,532 @@
+"""
+In-process fact store for the summary tiles.
+
+The Quote and Sales columns the tiles filter and group on are held as typed
+NumPy arrays sorted by created day:
+
+    day        int32 days since 1970-01-01 (CreatedDate)
+    country    dictionary codes of UPPER(CountryCode)
+    brand      dictionary codes of UPPER(Brand)
+    pet        bit flags, one per whereFilters pet pattern
+    method     dictionary codes of the normalised receive/sale method
+    has_key    COUNT(<key column>) weight
+    + Quote:   unconverted, incomplete, expiry_day
+
+A per-day offset index turns a date window into a contiguous slice, so a
+tile is a handful of boolean masks and an `np.bincount` over that slice.
+
+The query methods return DataFrames shaped like the services' SQL results,
+so the services keep their shaping code and only swap the data source; they
+fall back to `read_df` whenever the store is disabled, not loaded yet, or
+does not reach back far enough for the requested window.
+"""
+import asyncio
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import anyio
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from app.core.config import settings
+from app.db.read_routing import ReadRoutingEngine
+from app.db.replica import ReplicaEngine
+from app.utils.report_helpers import PET_PATTERNS
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+_NO_DAY = np.iinfo(np.int32).min
+
+# one bit per LIKE pattern, in the CASE order of the pet-type summaries
+_PET_BITS = {"%cat%": 0, "%dog%": 1, "%horse%": 2, "%exotic%": 3, "%bb_com%": 4}
+_PET_NAMES = ("Cat", "Dog", "Horse", "Exotic", "BB", "Others")
+_PHONE_ALIASES = {"contact center": "phone", "contact_center": "phone"}
+
+_INCOMPLETE_COLUMNS = ("FullName", "Email", "Address", "PostCode", "ContactNo", "PetType", "PetName")
+
+
+def _like_regex(pattern: str) -> "re.Pattern":
+    # SQL LIKE: '_' matches any single character
+    return re.compile("".join("." if ch == "_" else re.escape(ch) for ch in pattern.strip("%")))
+
+
+_PET_REGEXES = [(bit, _like_regex(pattern)) for pattern, bit in _PET_BITS.items()]
+
+# first matching bit wins, as in the CASE expression; 0 flags -> 'Others'
+_PET_CATEGORY = np.full(1 << len(_PET_BITS), len(_PET_NAMES) - 1, dtype=np.uint8)
+for _flags in range(1, len(_PET_CATEGORY)):
+    _PET_CATEGORY[_flags] = (_flags & -_flags).bit_length() - 1
+
+
+def _to_day(value: Union[str, date]) -> int:
+    return int((np.datetime64(str(value)[:10], "D") - _EPOCH).astype(np.int64))
+
+
+def _day_numbers(values: pd.Series) -> np.ndarray:
+    ts = pd.to_datetime(values, errors="coerce")
+    days = ts.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    out = (days - _EPOCH).astype(np.int64)
+    out[ts.isna().to_numpy()] = _NO_DAY
+    return out.astype(np.int32)
+
+
+def _plain(values: pd.Series) -> pd.Series:
+    # ETL frames carry categoricals; fillna/where with new values needs object
+    return values.astype(object) if isinstance(values.dtype, pd.CategoricalDtype) else values
+
+
+def _upper(values: pd.Series) -> pd.Series:
+    values = _plain(values)
+    return values.where(values.isna(), values.astype(str).str.upper())
+
+
+def _normalise_method(values: pd.Series) -> pd.Series:
+    # same normalisation the receive-method charts apply in pandas
+    # NULL reads back as None and becomes 'none' there too
+    return _plain(values).fillna("None").astype(str).str.strip().str.lower().replace(_PHONE_ALIASES)
+
+
+def _encode(values: pd.Series, labels: List[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Dictionary-encodes `values`, extending `labels`; label 0 is NULL."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    labels = list(labels)
+    index = {label: i for i, label in enumerate(labels)}
+    mapping = np.zeros(len(uniques) + 1, dtype=np.int32)  # last slot: NA sentinel -> 0
+    for i, unique in enumerate(uniques):
+        if unique not in index:
+            index[unique] = len(labels)
+            labels.append(unique)
+        mapping[i] = index[unique]
+    dtype = np.uint8 if len(labels) <= 0xFF else np.uint16 if len(labels) <= 0xFFFF else np.int32
+    return mapping[codes].astype(dtype), labels
+
+
+def _pet_flags(pet_types: pd.Series) -> np.ndarray:
+    lowered = _plain(pet_types).fillna("").astype(str).str.lower()
+    codes, uniques = pd.factorize(lowered)
+    flags = np.zeros(len(uniques), dtype=np.uint8)
+    for i, text in enumerate(uniques):
+        for bit, regex in _PET_REGEXES:
+            if regex.search(text):
+                flags[i] |= 1 << bit
+    return flags[codes] if len(codes) else np.zeros(0, dtype=np.uint8)
+
+
+def _blank(values: pd.Series) -> pd.Series:
+    # NULLIF(LTRIM(RTRIM(x)), '') IS NULL
+    return values.isna() | (values.astype(str).str.strip(" ") == "")
+
+
+@dataclass(frozen=True)
+class FactSpec:
+    table: str
+    key_column: str  # the column the service SQL COUNT()s
+    method_column: str
+    source_sql: str
+
+
+_QUOTE_SPEC = FactSpec(
+    table="Quote",
+    key_column="QuoteNumber",
+    method_column="QuoteReceivedMethod",
+    source_sql="""
+        SELECT
+            CreatedDate, CountryCode, Brand, PetType, QuoteReceivedMethod, QuoteExpiryDate,
+            CASE WHEN QuoteNumber IS NULL THEN 0 ELSE 1 END AS HasKey,
+            CASE WHEN PolicyNumber IS NULL OR PolicyNumber LIKE '%NONE%' THEN 1 ELSE 0 END AS Unconverted,
+            CASE WHEN ( NULLIF(LTRIM(RTRIM(FullName)),  '') IS NULL
+                     OR NULLIF(LTRIM(RTRIM(Email)),     '') IS NULL
+                     OR NULLIF(LTRIM(RTRIM(Address)),   '') IS NULL
+                     OR NULLIF(LTRIM(RTRIM(PostCode)),  '') IS NULL
+                     OR NULLIF(LTRIM(RTRIM(ContactNo)), '') IS NULL
+                     OR NULLIF(LTRIM(RTRIM(PetType)),   '') IS NULL
+                     OR NULLIF(LTRIM(RTRIM(PetName)),   '') IS NULL )
+                 THEN 1 ELSE 0 END AS Incomplete
+        FROM Quote
+        WHERE CreatedDate >= ?
+    """,
+)
+
+_SALES_SPEC = FactSpec(
+    table="Sales",
+    key_column="PolicyNumber",
+    method_column="SaleMethod",
+    source_sql="""
+        SELECT
+            CreatedDate, CountryCode, Brand, PetType, SaleMethod,
+            CASE WHEN PolicyNumber IS NULL THEN 0 ELSE 1 END AS HasKey
+        FROM Sales
+        WHERE CreatedDate >= ?
+    """,
+)
+
+FACT_SPECS: Dict[str, FactSpec] = {spec.table: spec for spec in (_QUOTE_SPEC, _SALES_SPEC)}
+
+
+def _encode_frame(spec: FactSpec, df: pd.DataFrame, labels: Dict[str, List[Any]]):
+    """One chunk of source rows (SQL projection or an ETL frame) -> column arrays."""
+    cols: Dict[str, np.ndarray] = {"day": _day_numbers(df["CreatedDate"])}
+    labels = dict(labels)
+    cols["country"], labels["country"] = _encode(_upper(df["CountryCode"]), labels["country"])
+    cols["brand"], labels["brand"] = _encode(_upper(df["Brand"]), labels["brand"])
+    cols["method"], labels["method"] = _encode(_normalise_method(df[spec.method_column]), labels["method"])
+    cols["pet"] = _pet_flags(df["PetType"])
+    if "HasKey" in df.columns:
+        cols["has_key"] = df["HasKey"].to_numpy(dtype=bool)
+    else:
+        cols["has_key"] = df[spec.key_column].notna().to_numpy()
+
+    if spec is _QUOTE_SPEC:
+        if "Unconverted" in df.columns:
+            cols["unconverted"] = df["Unconverted"].to_numpy(dtype=bool)
+        else:
+            policy = df["PolicyNumber"]
+            cols["unconverted"] = (
+                policy.isna() | policy.astype(str).str.contains("none", case=False, regex=False)
+            ).to_numpy()
+        if "Incomplete" in df.columns:
+            cols["incomplete"] = df["Incomplete"].to_numpy(dtype=bool)
+        else:
+            incomplete = np.zeros(len(df), dtype=bool)
+            for col in _INCOMPLETE_COLUMNS:
+                incomplete |= _blank(df[col]).to_numpy()
+            cols["incomplete"] = incomplete
+        cols["expiry_day"] = _day_numbers(df["QuoteExpiryDate"])
+
+    keep = cols["day"] != _NO_DAY  # NULL CreatedDate never satisfies a date predicate
+    if not keep.all():
+        cols = {name: values[keep] for name, values in cols.items()}
+    return cols, labels
+
+
+def _empty_labels() -> Dict[str, List[Any]]:
+    return {"country": [None], "brand": [None], "method": [None]}
+
+
+@dataclass
+class FactTable:
+    spec: FactSpec
+    columns: Dict[str, np.ndarray]
+    labels: Dict[str, List[Any]]
+    covered_from: int  # first day the store is complete from
+    loaded_at: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        order = np.argsort(self.columns["day"], kind="stable")
+        self.columns = {name: values[order] for name, values in self.columns.items()}
+        day = self.columns["day"]
+        self.day0 = int(day[0]) if len(day) else self.covered_from
+        last = int(day[-1]) if len(day) else self.day0
+        span = np.arange(self.day0, last + 2, dtype=np.int32)
+        # offsets[d - day0] = first row created on or after day d
+        self.offsets = np.searchsorted(day, span)
+        dates = _EPOCH + span.astype("timedelta64[D]")
+        month_start = dates.astype("datetime64[M]")
+        self.day_month = month_start.astype(np.int32)  # months since 1970-01
+        self.day_dom = ((dates - month_start.astype("datetime64[D]")).astype(np.int32) + 1).astype(np.uint8)
+        self.day_dim = (
+            ((month_start + 1).astype("datetime64[D]") - month_start.astype("datetime64[D]")).astype(np.uint8)
+        )
+
+    def __len__(self) -> int:
+        return len(self.columns["day"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self.columns.values()) + self.offsets.nbytes
+
+    @classmethod
+    def from_parts(cls, spec: FactSpec, parts: Sequence[Dict[str, np.ndarray]], labels, covered_from: int):
+        names = parts[0].keys() if parts else ()
+        columns = {name: np.concatenate([p[name] for p in parts]) for name in names}
+        if not columns:
+            columns, labels = _encode_frame(spec, pd.DataFrame(columns=_frame_columns(spec)), labels)
+        return cls(spec=spec, columns=columns, labels=labels, covered_from=covered_from)
+
+    def covers(self, start: Union[str, date]) -> bool:
+        return _to_day(start) >= self.covered_from
+
+    # -------- selection --------
+    def _slice(self, start: Union[str, date], end_exclusive: Union[str, date]) -> Tuple[int, int]:
+        last = len(self.offsets) - 1
+        lo = min(max(_to_day(start) - self.day0, 0), last)
+        hi = min(max(_to_day(end_exclusive) - self.day0, 0), last)
+        return int(self.offsets[lo]), int(self.offsets[max(hi, lo)])
+
+    def _lut(self, name: str, wanted: Sequence[str]) -> np.ndarray:
+        lut = np.zeros(len(self.labels[name]), dtype=bool)
+        wanted = set(wanted)
+        for i, label in enumerate(self.labels[name]):
+            if label is not None and label in wanted:
+                lut[i] = True
+        return lut
+
+    def _filter(self, lo: int, hi: int, country_codes, brands, pets) -> np.ndarray:
+        """Row mask over [lo, hi) equivalent to whereFilters()."""
+        mask = np.ones(hi - lo, dtype=bool)
+        codes = [str(c).strip().upper() for c in country_codes or () if str(c).strip()]
+        if codes:
+            mask &= self._lut("country", codes)[self.columns["country"][lo:hi]]
+        brand_codes = [str(b).strip().upper() for b in brands or () if str(b).strip()]
+        if brand_codes:
+            mask &= self._lut("brand", brand_codes)[self.columns["brand"][lo:hi]]
+        bits = 0
+        for p in pets or ():
+            pattern = PET_PATTERNS.get(p.lower())
+            if pattern:
+                bits |= 1 << _PET_BITS[pattern]
+        if bits:
+            mask &= (self.columns["pet"][lo:hi] & bits) != 0
+        return mask
+
+    def _rel_days(self, lo: int, hi: int) -> np.ndarray:
+        return self.columns["day"][lo:hi] - self.day0
+
+    # -------- tiles (frames shaped like the service SQL) --------
+    def quote_summary(
+        self, start, end_exclusive, prev_start, prev_end_exclusive, current_date,
+        country_codes=(), brands=(), pets=(),
+    ) -> pd.DataFrame:
+        lo, hi = self._slice(min(str(start), str(prev_start)), max(str(end_exclusive), str(prev_end_exclusive)))
+        mask = self._filter(lo, hi, country_codes, brands, pets)
+        day = self.columns["day"][lo:hi]
+        current = mask & (day >= _to_day(start)) & (day < _to_day(end_exclusive))
+        previous = mask & (day >= _to_day(prev_start)) & (day < _to_day(prev_end_exclusive))
+        open_quote = current & self.columns["unconverted"][lo:hi]
+        expiry = self.columns["expiry_day"][lo:hi]
+        has_expiry = expiry != _NO_DAY
+        today_day = _to_day(current_date)
+        return pd.DataFrame([{
+            "currentPeriodTotalQuotes": int(np.count_nonzero(current)),
+            "lastPeriodTotalQuotes": int(np.count_nonzero(previous)),
+            "liveQuotes": int(np.count_nonzero(open_quote & has_expiry & (expiry >= today_day))),
+            "lapsedQuotes": int(np.count_nonzero(open_quote & has_expiry & (expiry < today_day))),
+            "incompleteQuoteDetails": int(np.count_nonzero(current & self.columns["incomplete"][lo:hi])),
+        }])
+
+    def monthly_counts(
+        self, start, end_exclusive, country_codes=(), brands=(), pets=(),
+        day_window: Optional[Tuple[int, int]] = None,
+    ) -> pd.DataFrame:
+        """year/month/value, COUNT(key) per month; optional day-of-month window (wraps when start > end)."""
+        lo, hi = self._slice(start, end_exclusive)
+        mask = self._filter(lo, hi, country_codes, brands, pets)
+        rel = self._rel_days(lo, hi)
+        if day_window is not None:
+            start_day, end_day = day_window
+            dom = self.day_dom[rel]
+            if start_day <= end_day:
+                mask &= (dom >= start_day) & (dom <= end_day)
+            else:
+                mask &= (dom >= start_day) | (dom <= end_day)
+        months = self.day_month[rel][mask]
+        if not len(months):
+            return pd.DataFrame(columns=["year", "month", "value"])
+        m0 = int(months.min())
+        rows = np.bincount(months - m0)
+        values = np.bincount(months - m0, weights=self.columns["has_key"][lo:hi][mask])
+        present = np.flatnonzero(rows)
+        absolute = present + m0
+        return pd.DataFrame({
+            "year": 1970 + absolute // 12,
+            "month": absolute % 12 + 1,
+            "value": values[present].astype(np.int64),
+        })
+
+    def pet_type_counts(self, start, end_exclusive, country_codes=(), brands=(), pets=()) -> pd.DataFrame:
+        """value/name per pet category, ORDER BY name DESC."""
+        lo, hi = self._slice(start, end_exclusive)
+        mask = self._filter(lo, hi, country_codes, brands, pets)
+        category = _PET_CATEGORY[self.columns["pet"][lo:hi][mask]]
+        rows = np.bincount(category, minlength=len(_PET_NAMES))
+        values = np.bincount(category, weights=self.columns["has_key"][lo:hi][mask], minlength=len(_PET_NAMES))
+        out = pd.DataFrame({
+            "value": [int(values[i]) for i in range(len(_PET_NAMES)) if rows[i]],
+            "name": [_PET_NAMES[i] for i in range(len(_PET_NAMES)) if rows[i]],
+        })
+        return out.sort_values("name", ascending=False, ignore_index=True)
+
+    def method_by_month(
+        self, start, end_exclusive, country_codes=(), brands=(), pets=(),
+        clamped_days: Optional[Tuple[int, int]] = None,
+        period_column: str = "ReportingPeriod",
+    ) -> pd.DataFrame:
+        """
+        value/<method>/<period_column> per (method, month). `clamped_days`
+        keeps days in [start, end] with both bounds clamped to the month's
+        last day (the DAY(EOMONTH()) CASEs in the same-period SQL).
+        """
+        lo, hi = self._slice(start, end_exclusive)
+        mask = self._filter(lo, hi, country_codes, brands, pets)
+        rel = self._rel_days(lo, hi)
+        if clamped_days is not None:
+            start_day, end_day = clamped_days
+            dom, dim = self.day_dom[rel], self.day_dim[rel]
+            mask &= (dom >= np.minimum(start_day, dim)) & (dom <= np.minimum(end_day, dim))
+        months = self.day_month[rel][mask]
+        method_col = self.spec.method_column
+        if not len(months):
+            return pd.DataFrame(columns=["value", method_col, period_column])
+        n_methods = len(self.labels["method"])
+        m0 = int(months.min())
+        group = (months - m0).astype(np.int64) * n_methods + self.columns["method"][lo:hi][mask]
+        rows = np.bincount(group)
+        values = np.bincount(group, weights=self.columns["has_key"][lo:hi][mask])
+        present = np.flatnonzero(rows)
+        month_index = present // n_methods + m0
+        return pd.DataFrame({
+            "value": values[present].astype(np.int64),
+            method_col: [self.labels["method"][i] for i in present % n_methods],
+            period_column: month_index.astype("datetime64[M]").astype("datetime64[ns]"),
+        })
+
+    def count(
+        self, start, end_exclusive, country_codes=(), brands=(), pets=(),
+        clamped_days: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        """COUNT(key) over the window, optionally with the clamped day-of-month filter."""
+        lo, hi = self._slice(start, end_exclusive)
+        mask = self._filter(lo, hi, country_codes, brands, pets)
+        if clamped_days is not None:
+            rel = self._rel_days(lo, hi)
+            start_day, end_day = clamped_days
+            dom, dim = self.day_dom[rel], self.day_dim[rel]
+            mask &= (dom >= np.minimum(start_day, dim)) & (dom <= np.minimum(end_day, dim))
+        return int(np.count_nonzero(self.columns["has_key"][lo:hi] & mask))
+
+    def method_totals(self, start, end_exclusive, country_codes=(), brands=(), pets=()) -> pd.DataFrame:
+        """<method>/value for the window (the receive-method period totals)."""
+        lo, hi = self._slice(start, end_exclusive)
+        mask = self._filter(lo, hi, country_codes, brands, pets)
+        codes = self.columns["method"][lo:hi][mask]
+        rows = np.bincount(codes, minlength=len(self.labels["method"]))
+        values = np.bincount(codes, weights=self.columns["has_key"][lo:hi][mask], minlength=len(rows))
+        present = np.flatnonzero(rows)
+        return pd.DataFrame({
+            self.spec.method_column: [self.labels["method"][i] for i in present],
+            "value": values[present].astype(np.int64),
+        })
+
+
+def _frame_columns(spec: FactSpec) -> List[str]:
+    base = ["CreatedDate", "CountryCode", "Brand", "PetType", spec.method_column, "HasKey"]
+    if spec is _QUOTE_SPEC:
+        base += ["QuoteExpiryDate", "Unconverted", "Incomplete"]
+    return base
+
+
+class FactStore:
+    """Holds one immutable FactTable per fact; reloads swap the reference."""
+
+    def __init__(self):
+        self._tables: Dict[str, FactTable] = {}
+        self._lock = threading.Lock()
+
+    def covering(self, table_name: str, start: Union[str, date]) -> Optional[FactTable]:
+        """The loaded table if it reaches back to `start`, else None (use SQL)."""
+        if not settings.fact_store_enabled:
+            return None
+        facts = self._tables.get(table_name)
+        if facts is None or not facts.covers(start):
+            return None
+        return facts
+
+    def load(self, table_name: str, engine, history_start: Optional[date] = None) -> FactTable:
+        spec = FACT_SPECS[table_name]
+        if history_start is None:
+            history_start = date.today().replace(day=1) - relativedelta(months=settings.fact_store_history_months)
+        started = time.perf_counter()
+        params = (history_start.isoformat(),)
+        if isinstance(engine, ReadRoutingEngine):
+            engine = engine.pick()
+        if isinstance(engine, ReplicaEngine):
+            chunks = [engine.read_sql(spec.source_sql, params)]
+        else:
+            chunks = pd.read_sql_query(spec.source_sql, engine, params=params, chunksize=250_000)
+        labels = _empty_labels()
+        parts = []
+        for chunk in chunks:
+            cols, labels = _encode_frame(spec, chunk, labels)
+            parts.append(cols)
+        facts = FactTable.from_parts(spec, parts, labels, covered_from=_to_day(history_start))
+        with self._lock:
+            self._tables[table_name] = facts
+        logger.info(
+            "Fact store %s: %d rows (%.1f MB) from %s in %.2fs",
+            table_name, len(facts), facts.nbytes / 1e6, history_start, time.perf_counter() - started,
+        )
+        return facts
+
+    def load_all(self, engine, history_start: Optional[date] = None) -> None:
+        for table_name in FACT_SPECS:
+            self.load(table_name, engine, history_start)
+
+    def apply_load(self, table_name: str, data: pd.DataFrame, start_date: str, end_date: str) -> None:
+        """
+        Splices an ETL load into the loaded table without a DB round trip:
+        rows whose CreatedDate falls in [start_date, end_date] are replaced,
+        as DBOperationsServices.delete_and_upload_data does in MIS.
+        """
+        pending = self.begin_load(table_name)
+        if pending is not None:
+            pending.add(data)
+            pending.commit(start_date, end_date)
+
+    def begin_load(self, table_name: str) -> Optional["FactLoad"]:
+        """Chunk-wise apply_load for streaming ETL; None when there is nothing to update."""
+        spec = FACT_SPECS.get(table_name)
+        current = self._tables.get(table_name)
+        if spec is None or current is None:
+            return None
+        return FactLoad(self, table_name, current)
+
+    def _splice(self, base: FactTable, table_name: str, parts, labels, start_date: str, end_date: str) -> None:
+        with self._lock:
+            current = self._tables.get(table_name)
+            if current is not base:
+                # reloaded meanwhile; codes in `parts` refer to the old labels
+                logger.info("Fact store %s reloaded during an ETL load; next refresh picks it up", table_name)
+                return
+            day = current.columns["day"]
+            keep = (day < _to_day(start_date)) | (day > _to_day(end_date))
+            kept = {name: values[keep] for name, values in current.columns.items()}
+            self._tables[table_name] = FactTable.from_parts(
+                current.spec, [kept, *parts], labels, covered_from=current.covered_from
+            )
+
+    async def refresh_forever(self, engine_factory) -> None:
+        """Initial load, then a full reload every fact_store_refresh_seconds."""
+        while True:
+            try:
+                await anyio.to_thread.run_sync(lambda: self.load_all(engine_factory()))
+            except Exception:
+                logger.exception("Fact store load failed; summaries stay on SQL")
+            await asyncio.sleep(settings.fact_store_refresh_seconds)
+
+
+class FactLoad:
+    """Encodes an ETL load chunk by chunk (a few bytes per row) and splices it in on commit."""
+
+    def __init__(self, store: FactStore, table_name: str, base: FactTable):
+        self._store = store
+        self._table_name = table_name
+        self._base = base
+        self._labels = base.labels
+        self._parts: List[Dict[str, np.ndarray]] = []
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        cols, self._labels = _encode_frame(self._base.spec, chunk, self._labels)
+        self._parts.append(cols)
+
+    def commit(self, start_date: str, end_date: str) -> None:
+        self._store._splice(self._base, self._table_name, self._parts, self._labels, start_date, end_date)
+
+
+fact_store = FactStore()
@@ -1,15 +1,21 @@
 from fastapi import HTTPException
 from typing import List, Optional, Union, Dict, Any
-from app.utils.report_helpers import normalize_input, parse_dates, normalize_regions, WhereBuilder, read_df
+from app.utils.report_helpers import (
+    normalize_input, parse_dates, normalize_regions, WhereBuilder, read_df, generate_ndjson_stream,
+)
 from datetime import datetime, timezone, date
 import pandas as pd
 import logging
 import calendar
 
+from app.core.metrics import instrument_service
+from app.services.count_cache import count_cache
+
 
 logger = logging.getLogger(__name__)
 
 
+@instrument_service
 class Policy:
     
     @staticmethod
@@ -200,6 +206,9 @@ class Policy:
               
         brands:str = "all", 
         pet_types:str = "all",
+        include_total: bool = True,
+        approximate_total: bool = False,
+        stream: bool = False,
     ) -> Dict[str, Any]:
         try:
             # --- pagination guards ---
@@ -269,7 +278,26 @@ class Policy:
             if free_policy_filter:
                 wb.add_in("FreePolicy", free_policy_filter)
 
-            # --- query: CTE + windowed total + page, with SAME day-window per month (start_day..end_day) ---
+            # --- total: counted (and cached) on its own so paging does not recount it ---
+            count_sql = f"""
+                SELECT COUNT(*) AS TotalRecords
+                FROM CRM
+                WHERE {wb.sql()}
+                    AND DAY({date_basis}) >=
+                        CASE
+                            WHEN ? > DAY(EOMONTH({date_basis}))
+                            THEN DAY(EOMONTH({date_basis}))
+                            ELSE ?
+                        END
+                    AND DAY({date_basis}) <=
+                        CASE
+                            WHEN ? > DAY(EOMONTH({date_basis}))
+                            THEN DAY(EOMONTH({date_basis}))
+                            ELSE ?
+                        END
+            """
+
+            # --- page query: CTE + page, with SAME day-window per month (start_day..end_day) ---
             sql = f"""
                 WITH Base AS (
                     SELECT
@@ -300,27 +328,26 @@ class Policy:
                 )
                 SELECT
                     GETUTCDATE() AS DateExtracted,
-                    b.*,
-                    COUNT(*) OVER() AS TotalRecords
+                    b.*
                 FROM Base b
                 ORDER BY b.{date_basis} {order}, b.PolicyNumber
                 OFFSET ? ROWS FETCH NEXT ? ROWS ONLY;
             """
 
-            # params: tuple-pack so pylance is happy
-            params = (*wb.parameters(), start_day, start_day, end_day, end_day, int(skip), int(limit))
-            df: pd.DataFrame = await read_df(engine, sql, params)
-
-            if df.empty:
-                total = 0
-                records = []
-            else:
-                total = int(df.iloc[0].get("TotalRecords", 0)) if "TotalRecords" in df.columns else 0
-                if "TotalRecords" in df.columns:
-                    df = df.drop(columns=["TotalRecords"])
-                records = df.to_dict(orient="records")
+            day_params = (start_day, start_day, end_day, end_day)
+            total, total_approximate = await count_cache.total(
+                engine, "CRM", count_sql, (*wb.parameters(), *day_params),
+                filters=dict(
+                    start=start_str, end=end_plus_1, regions=region_list,
+                    status=status_filter, free_policy=free_policy_filter,
+                    start_day=start_day, end_day=end_day,
+                ),
+                include_total=include_total, approximate=approximate_total,
+            )
 
-            return {
+            # params: tuple-pack so pylance is happy
+            params = (*wb.parameters(), *day_params, int(skip), int(limit))
+            page = {
                 "meta": {
                     "start_date": start_str,
                     "end_date": end_str,
@@ -336,10 +363,16 @@ class Policy:
                     "generated_at": datetime.now(timezone.utc).isoformat(),
                 },
                 "total": total,
+                "total_approximate": total_approximate,
                 "skip": skip,
                 "limit": limit,
-                "data": records,
             }
+            if stream:
+                return generate_ndjson_stream(engine, sql, params, page)
+
+            df: pd.DataFrame = await read_df(engine, sql, params)
+            page["data"] = df.to_dict(orient="records") if not df.empty else []
+            return page
 
         except ValueError as ve:
             raise HTTPException(status_code=400, detail=f"Invalid dates: {ve}")
@@ -4,34 +4,16 @@ from app.utils.report_helpers import (
     normalize_input, parse_dates, normalize_regions, WhereBuilder,
     format_filename, generate_csv_stream, whereFilters
 )
+from app.core.metrics import instrument_service
 from datetime import datetime, date
 import calendar
-import io
-import csv
 
+@instrument_service
 class PolicyStream:
     @staticmethod
     def _generate_csv_stream(engine, sql: str, params: tuple, filename: str) -> StreamingResponse:
-        def generate():
-            with engine.connect() as conn:
-                result = conn.exec_driver_sql(sql, params, execution_options={"stream_results": True})
-                cols = list(result.keys())
-                buf = io.StringIO()
-                writer = csv.writer(buf, lineterminator="\n")
-
-                writer.writerow(cols)
-                yield buf.getvalue(); buf.seek(0); buf.truncate(0)
-
-                while True:
-                    rows = result.fetchmany(5000)
-                    if not rows:
-                        break
-                    for r in rows:
-                        writer.writerow(list(r))
-                    yield buf.getvalue(); buf.seek(0); buf.truncate(0)
-
-        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-        return StreamingResponse(generate(), media_type="text/csv", headers=headers)
+        # Single export engine so every download is instrumented the same way
+        return generate_csv_stream(engine, sql, params, filename)
 
     
     @staticmethod
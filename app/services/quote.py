@@ -1,7 +1,8 @@
 from fastapi import HTTPException
 from typing import List, Union, Dict, Any,Optional
 from app.utils.report_helpers import (
-    normalize_input, parse_dates, normalize_regions, WhereBuilder, read_df, first_cell_int, whereFilters
+    normalize_input, parse_dates, normalize_regions, WhereBuilder, read_df, first_cell_int, whereFilters,
+    generate_ndjson_stream,
 )
 from datetime import datetime, timezone,date, timedelta  
 import pandas as pd
@@ -10,6 +11,9 @@ from calendar import monthrange
 
 from app.utils.date_utils import today
 from app.core.enums import ReportTypeEnum
+from app.core.metrics import instrument_service
+from app.services.count_cache import count_cache, fact_store_estimate
+from app.services.fact_store import fact_store
 
 from app.services.sales import Sales
 
@@ -24,6 +28,7 @@ def add_months(dt: date, months: int) -> date:
 
 
 
+@instrument_service
 class Quote:
     @staticmethod
     async def QuoteSummary(
@@ -104,7 +109,14 @@ class Quote:
                 *wb.parameters(),
             ]
 
-            df: pd.DataFrame = await read_df(engine, sql, all_params)
+            facts = fact_store.covering("Quote", prev_start_str)
+            if facts is not None:
+                df = facts.quote_summary(
+                    start_str, end_plus_1, prev_start_str, prev_end_plus_1, current_date_str,
+                    country_code_list, brand_list, pet_list,
+                )
+            else:
+                df: pd.DataFrame = await read_df(engine, sql, all_params)
 
             # --- Summary shaping ---
             if not df.empty:
@@ -187,7 +199,14 @@ class Quote:
                     oldest_month_anchor, upper_bound_exclusive,
                 ]
 
-            ltm_df: pd.DataFrame = await read_df(engine, ltm_sql, ltm_params)
+            facts = fact_store.covering("Quote", oldest_month_anchor)
+            if facts is not None:
+                ltm_df = facts.monthly_counts(
+                    oldest_month_anchor, upper_bound_exclusive, country_code_list, brand_list, pet_list,
+                    day_window=(start_day, end_day) if same_calendar_month else None,
+                )
+            else:
+                ltm_df: pd.DataFrame = await read_df(engine, ltm_sql, ltm_params)
 
             # Map results to {YYYY-MM: count}
             counts_by_yyyymm: Dict[str, int] = {}
@@ -245,7 +264,10 @@ class Quote:
         skip: int = 0, limit: int = 100,
         brands:str = "all",
         pet_types:str = "all",
-        report_type: ReportTypeEnum = ReportTypeEnum.TOTAL_QUOTES,         
+        report_type: ReportTypeEnum = ReportTypeEnum.TOTAL_QUOTES,
+        include_total: bool = True,
+        approximate_total: bool = False,
+        stream: bool = False,
     ) -> Dict[str, Any]:
         try:
             start_str, end_plus_1, _ = parse_dates(start_date, end_date)
@@ -312,16 +334,33 @@ class Quote:
                 OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
             """
 
-            total_df = await read_df(engine, count_sql, wb.parameters())
-            total = first_cell_int(total_df, default=0)
+            total, total_approximate = await count_cache.total(
+                engine, "Quote", count_sql, wb.parameters(),
+                filters=dict(
+                    start=start_str, end=end_plus_1,
+                    countries=country_code_list, brands=brand_list, pets=pet_list,
+                ),
+                include_total=include_total, approximate=approximate_total,
+                estimate=fact_store_estimate(
+                    "Quote", start_str, end_plus_1, country_code_list, brand_list, pet_list
+                ),
+            )
 
             data_params = (*wb.parameters(), int(skip), int(limit))
             # wb.parameters() + (int(skip), int(limit))
+            if stream:
+                return generate_ndjson_stream(engine, data_sql, data_params, {
+                    "total": total,
+                    "total_approximate": total_approximate,
+                    "skip": skip,
+                    "limit": limit,
+                })
             data_df = await read_df(engine, data_sql, data_params)
             # print(data_sql, data_params)
 
             return {
                 "total": total,
+                "total_approximate": total_approximate,
                 "skip": skip,
                 "limit": limit,
                 "data": data_df.to_dict(orient="records") if not data_df.empty else []
@@ -383,7 +422,11 @@ class Quote:
                     ORDER BY name DESC
                 """
 
-                df: pd.DataFrame = await read_df(engine, sql, wb.parameters())
+                facts = fact_store.covering("Quote", start_str)
+                if facts is not None:
+                    df = facts.pet_type_counts(start_str, end_plus_1, country_code_list, brand_list, pet_list)
+                else:
+                    df: pd.DataFrame = await read_df(engine, sql, wb.parameters())
                 rows = df.to_dict(orient="records") if not df.empty else []
                 totals = {r["name"]: int(r["value"]) for r in rows}
 
@@ -411,7 +454,10 @@ class Quote:
         quoteStatus: str = 'All', 
         skip: int = 0, limit: int = 100,
         brands:str = "all",
-        pet_types:str = "all"
+        pet_types:str = "all",
+        include_total: bool = True,
+        approximate_total: bool = False,
+        stream: bool = False,
     ) -> Dict[str, Any]:
         try:
             start_str, end_plus_1, _ = parse_dates(start_date, end_date)
@@ -454,16 +500,33 @@ class Quote:
                 OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
             """
 
-            total_df = await read_df(engine, count_sql, wb.parameters())
-            total = first_cell_int(total_df, default=0)
+            total, total_approximate = await count_cache.total(
+                engine, "Quote", count_sql, wb.parameters(),
+                filters=dict(
+                    start=start_str, end=end_plus_1,
+                    countries=country_code_list, brands=brand_list, pets=pet_list,
+                ),
+                include_total=include_total, approximate=approximate_total,
+                estimate=fact_store_estimate(
+                    "Quote", start_str, end_plus_1, country_code_list, brand_list, pet_list
+                ),
+            )
 
             data_params = (*wb.parameters(), int(skip), int(limit))
             # wb.parameters() + (int(skip), int(limit))
+            if stream:
+                return generate_ndjson_stream(engine, data_sql, data_params, {
+                    "total": total,
+                    "total_approximate": total_approximate,
+                    "skip": skip,
+                    "limit": limit,
+                })
             data_df = await read_df(engine, data_sql, data_params)
             # print(data_sql, data_params)
 
             return {
                 "total": total,
+                "total_approximate": total_approximate,
                 "skip": skip,
                 "limit": limit,
                 "data": data_df.to_dict(orient="records") if not data_df.empty else []
@@ -593,7 +656,10 @@ class Quote:
         limit: int = 100,
         brands:str = "all", 
         pet_types:str = "all",
-        quoteStatus: str = 'All', 
+        quoteStatus: str = 'All',
+        include_total: bool = True,
+        approximate_total: bool = False,
+        stream: bool = False,
     ) -> Dict[str, Any]:
         try:
             start_str, end_plus_1, _ = parse_dates(start_date, end_date)
@@ -638,15 +704,32 @@ class Quote:
                 OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
             """
 
-            total_df = await read_df(engine, count_sql, wb.parameters())
-            total = first_cell_int(total_df, default=0)
+            total, total_approximate = await count_cache.total(
+                engine, "Quote", count_sql, wb.parameters(),
+                filters=dict(
+                    start=start_str, end=end_plus_1,
+                    countries=country_code_list, brands=brand_list, pets=pet_list,
+                ),
+                include_total=include_total, approximate=approximate_total,
+                estimate=fact_store_estimate(
+                    "Quote", start_str, end_plus_1, country_code_list, brand_list, pet_list
+                ),
+            )
 
             data_params = wb.parameters() + (int(skip), int(limit))
+            if stream:
+                return generate_ndjson_stream(engine, data_sql, data_params, {
+                    "total": total,
+                    "total_approximate": total_approximate,
+                    "skip": skip,
+                    "limit": limit,
+                })
             data_df = await read_df(engine, data_sql, data_params)
             # data_df["Converted"] = data_df["Converted"].astype(bool)
 
             return {
                 "total": total,
+                "total_approximate": total_approximate,
                 "skip": skip,
                 "limit": limit,
                 "data": data_df.to_dict(orient="records") if not data_df.empty else []
@@ -728,7 +811,7 @@ class Quote:
                     ORDER BY QuoteReportingPeriod ASC
                 """
                 # Params: lower bound (start_day) twice, upper bound (end_day) twice
-                df: pd.DataFrame = await read_df(engine, sql, (*wb.parameters(), start_day, start_day, end_day, end_day))
+                sql_params = (*wb.parameters(), start_day, start_day, end_day, end_day)
             else:
                 sql = f"""
                     SELECT
@@ -742,7 +825,17 @@ class Quote:
                         DATEFROMPARTS(YEAR(CreatedDate), MONTH(CreatedDate), 1)
                     ORDER BY QuoteReportingPeriod ASC
                 """
-                df: pd.DataFrame = await read_df(engine, sql, (*wb.parameters(),))
+                sql_params = (*wb.parameters(),)
+
+            facts = fact_store.covering("Quote", start_str)
+            if facts is not None:
+                df = facts.method_by_month(
+                    start_str, end_plus_1, country_code_list, brand_list, pet_list,
+                    clamped_days=(start_day, end_day) if same_calendar_month else None,
+                    period_column="QuoteReportingPeriod",
+                )
+            else:
+                df: pd.DataFrame = await read_df(engine, sql, sql_params)
 
             if df.empty:
                 chart, totals = [], {}
@@ -804,7 +897,13 @@ class Quote:
                     WHERE {wb_period.sql()}
                     GROUP BY QuoteReceivedMethod
                 """
-                period_df = await read_df(engine, period_sql, wb_period.parameters())
+                facts = fact_store.covering("Quote", _period_start_str)
+                if facts is not None:
+                    period_df = facts.method_totals(
+                        _period_start_str, _period_end_plus_1, country_code_list, brand_list, pet_list
+                    )
+                else:
+                    period_df = await read_df(engine, period_sql, wb_period.parameters())
                 period_totals = {"web": 0, "phone": 0}
                 if not period_df.empty:
                     for _, r in period_df.iterrows():
@@ -848,7 +947,9 @@ class Quote:
         months: Optional[int] = 7,        
         brands:str = "all", 
         pet_types:str = "all",
-        quoteStatus: str = 'All', 
+        quoteStatus: str = 'All',
+        include_total: bool = True,
+        approximate_total: bool = False,
     ) -> Dict[str, Any]:
         try:
             skip = max(0, int(skip))
@@ -885,7 +986,25 @@ class Quote:
             wb = whereFilters(wb=wb,country_codes=country_code_list,brands=brand_list, pets=pet_list)
             
 
-            # Single query: return data page + windowed total count
+            # The total is counted (and cached) separately so paging does not recount it
+            count_sql = f"""
+                SELECT COUNT(QuoteNumber) AS TotalRecords
+                FROM Quote
+                WHERE {wb.sql()}
+                    AND DAY(CreatedDate) >=
+                        CASE
+                            WHEN ? > DAY(EOMONTH(CreatedDate))
+                            THEN DAY(EOMONTH(CreatedDate))
+                            ELSE ?
+                        END
+                    AND DAY(CreatedDate) <=
+                        CASE
+                            WHEN ? > DAY(EOMONTH(CreatedDate))
+                            THEN DAY(EOMONTH(CreatedDate))
+                            ELSE ?
+                        END
+            """
+
             data_sql = f"""
                 WITH Base AS (
                     SELECT
@@ -920,28 +1039,34 @@ class Quote:
                             ELSE ?
                         END
                 )
-                SELECT
-                    b.*,
-                    COUNT(QuoteNumber) OVER() AS TotalRecords
+                SELECT b.*
                 FROM Base b
                 ORDER BY b.CreatedDate DESC, b.QuoteNumber
                 OFFSET ? ROWS FETCH NEXT ? ROWS ONLY;
             """
 
-            params = (*wb.parameters(), start_day, start_day, end_day, end_day, int(skip), int(limit))
-            data_df = await read_df(engine, data_sql, params)
+            day_params = (start_day, start_day, end_day, end_day)
+            total, total_approximate = await count_cache.total(
+                engine, "Quote", count_sql, (*wb.parameters(), *day_params),
+                filters=dict(
+                    start=start_str, end=end_plus_1,
+                    countries=country_code_list, brands=brand_list, pets=pet_list,
+                    start_day=start_day, end_day=end_day,
+                ),
+                include_total=include_total, approximate=approximate_total,
+                estimate=fact_store_estimate(
+                    "Quote", start_str, end_plus_1, country_code_list, brand_list, pet_list,
+                    clamped_days=(start_day, end_day),
+                ),
+            )
 
-            if data_df.empty:
-                total = 0
-                records = []
-            else:
-                total = int(data_df.iloc[0].get("TotalRecords", 0)) if "TotalRecords" in data_df.columns else 0
-                if "TotalRecords" in data_df.columns:
-                    data_df = data_df.drop(columns=["TotalRecords"])
-                records = data_df.to_dict(orient="records")
+            params = (*wb.parameters(), *day_params, int(skip), int(limit))
+            data_df = await read_df(engine, data_sql, params)
+            records = data_df.to_dict(orient="records") if not data_df.empty else []
 
             return {
                 "total": total,
+                "total_approximate": total_approximate,
                 "skip": skip,
                 "limit": limit,
                 "start_date": start_str,
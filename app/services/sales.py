@@ -1,7 +1,8 @@
 from fastapi import HTTPException
 from typing import List, Union, Dict, Any,Optional
 from app.utils.report_helpers import (
-    normalize_input, parse_dates, normalize_regions, WhereBuilder, read_df, first_cell_int, whereFilters
+    normalize_input, parse_dates, normalize_regions, WhereBuilder, read_df, first_cell_int, whereFilters,
+    generate_ndjson_stream,
 )
 from datetime import datetime, timezone,date, timedelta  
 import pandas as pd
@@ -10,6 +11,9 @@ from calendar import monthrange
 
 from app.utils.date_utils import today
 from app.core.enums import ReportTypeEnum
+from app.core.metrics import instrument_service
+from app.services.count_cache import count_cache, fact_store_estimate
+from app.services.fact_store import fact_store
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +26,7 @@ def add_months(dt: date, months: int) -> date:
 
 
 
+@instrument_service
 class Sales:
     @staticmethod
     async def SalesSummary(
@@ -115,7 +120,14 @@ class Sales:
                     oldest_month_anchor, upper_bound_exclusive,
                 ]
 
-            ltm_df: pd.DataFrame = await read_df(engine, ltm_sql, ltm_params)
+            facts = fact_store.covering("Sales", oldest_month_anchor)
+            if facts is not None:
+                ltm_df = facts.monthly_counts(
+                    oldest_month_anchor, upper_bound_exclusive, country_code_list, brand_list, pet_list,
+                    day_window=(start_day, end_day) if same_calendar_month else None,
+                )
+            else:
+                ltm_df: pd.DataFrame = await read_df(engine, ltm_sql, ltm_params)
 
             # Map results to {YYYY-MM: count}
             counts_by_yyyymm: Dict[str, int] = {}
@@ -206,7 +218,11 @@ class Sales:
                     ORDER BY name DESC
                 """
 
-                df: pd.DataFrame = await read_df(engine, sql, wb.parameters())
+                facts = fact_store.covering("Sales", start_str)
+                if facts is not None:
+                    df = facts.pet_type_counts(start_str, end_plus_1, country_code_list, brand_list, pet_list)
+                else:
+                    df: pd.DataFrame = await read_df(engine, sql, wb.parameters())
                 rows = df.to_dict(orient="records") if not df.empty else []
                 totals = {r["name"]: int(r["value"]) for r in rows}
 
@@ -332,7 +348,10 @@ class Sales:
         skip: int = 0, limit: int = 100,
         brands:str = "all",
         pet_types:str = "all",
-        report_type: ReportTypeEnum = ReportTypeEnum.TOTAL_QUOTES,         
+        report_type: ReportTypeEnum = ReportTypeEnum.TOTAL_QUOTES,
+        include_total: bool = True,
+        approximate_total: bool = False,
+        stream: bool = False,
     ) -> Dict[str, Any]:
         try:
             start_str, end_plus_1, _ = parse_dates(start_date, end_date)
@@ -369,16 +388,30 @@ class Sales:
                 OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
             """
 
-            total_df = await read_df(engine, count_sql, wb.parameters())
-            total = first_cell_int(total_df, default=0)
+            total, total_approximate = await count_cache.total(
+                engine, "FreePolicySales", count_sql, wb.parameters(),
+                filters=dict(
+                    start=start_str, end=end_plus_1,
+                    countries=country_code_list, brands=brand_list, pets=pet_list,
+                ),
+                include_total=include_total, approximate=approximate_total,
+            )
 
             data_params = (*wb.parameters(), int(skip), int(limit))
             # wb.parameters() + (int(skip), int(limit))
+            if stream:
+                return generate_ndjson_stream(engine, data_sql, data_params, {
+                    "total": total,
+                    "total_approximate": total_approximate,
+                    "skip": skip,
+                    "limit": limit,
+                })
             data_df = await read_df(engine, data_sql, data_params)
             # print(data_sql, data_params)
 
             return {
                 "total": total,
+                "total_approximate": total_approximate,
                 "skip": skip,
                 "limit": limit,
                 "data": data_df.to_dict(orient="records") if not data_df.empty else []
@@ -396,7 +429,10 @@ class Sales:
         skip: int = 0, limit: int = 100,
         brands:str = "all",
         pet_types:str = "all",
-        report_type: ReportTypeEnum = ReportTypeEnum.TOTAL_QUOTES,         
+        report_type: ReportTypeEnum = ReportTypeEnum.TOTAL_QUOTES,
+        include_total: bool = True,
+        approximate_total: bool = False,
+        stream: bool = False,
     ) -> Dict[str, Any]:
         try:
             start_str, end_plus_1, _ = parse_dates(start_date, end_date)
@@ -428,16 +464,33 @@ class Sales:
                 OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
             """
 
-            total_df = await read_df(engine, count_sql, wb.parameters())
-            total = first_cell_int(total_df, default=0)
+            total, total_approximate = await count_cache.total(
+                engine, "Sales", count_sql, wb.parameters(),
+                filters=dict(
+                    start=start_str, end=end_plus_1,
+                    countries=country_code_list, brands=brand_list, pets=pet_list,
+                ),
+                include_total=include_total, approximate=approximate_total,
+                estimate=fact_store_estimate(
+                    "Sales", start_str, end_plus_1, country_code_list, brand_list, pet_list
+                ),
+            )
 
             data_params = (*wb.parameters(), int(skip), int(limit))
             # wb.parameters() + (int(skip), int(limit))
+            if stream:
+                return generate_ndjson_stream(engine, data_sql, data_params, {
+                    "total": total,
+                    "total_approximate": total_approximate,
+                    "skip": skip,
+                    "limit": limit,
+                })
             data_df = await read_df(engine, data_sql, data_params)
             # print(data_sql, data_params)
 
             return {
                 "total": total,
+                "total_approximate": total_approximate,
                 "skip": skip,
                 "limit": limit,
                 "data": data_df.to_dict(orient="records") if not data_df.empty else []
@@ -518,7 +571,7 @@ class Sales:
                     ORDER BY SalesReportingPeriod ASC
                 """
                 # Params: lower bound (start_day) twice, upper bound (end_day) twice
-                df: pd.DataFrame = await read_df(engine, sql, (*wb.parameters(), start_day, start_day, end_day, end_day))
+                sql_params = (*wb.parameters(), start_day, start_day, end_day, end_day)
             else:
                 sql = f"""
                     SELECT
@@ -532,7 +585,17 @@ class Sales:
                         DATEFROMPARTS(YEAR(CreatedDate), MONTH(CreatedDate), 1)
                     ORDER BY SalesReportingPeriod ASC
                 """
-                df: pd.DataFrame = await read_df(engine, sql, (*wb.parameters(),))
+                sql_params = (*wb.parameters(),)
+
+            facts = fact_store.covering("Sales", start_str)
+            if facts is not None:
+                df = facts.method_by_month(
+                    start_str, end_plus_1, country_code_list, brand_list, pet_list,
+                    clamped_days=(start_day, end_day) if same_calendar_month else None,
+                    period_column="SalesReportingPeriod",
+                )
+            else:
+                df: pd.DataFrame = await read_df(engine, sql, sql_params)
 
             if df.empty:
                 chart, totals = [], {}
@@ -602,7 +665,13 @@ class Sales:
                         ELSE LOWER(LTRIM(RTRIM(SaleMethod)))
                     END
                 """
-                period_df = await read_df(engine, period_sql, wb_period.parameters())
+                facts = fact_store.covering("Sales", _period_start_str)
+                if facts is not None:
+                    period_df = facts.method_totals(
+                        _period_start_str, _period_end_plus_1, country_code_list, brand_list, pet_list
+                    )
+                else:
+                    period_df = await read_df(engine, period_sql, wb_period.parameters())
                 period_totals = {"web": 0, "phone": 0}
                 if not period_df.empty:
                     for _, r in period_df.iterrows():
@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.core.request_context import RequestContext, get_request_context
+from app.utils.sql_fingerprint import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+# international (+44 ...) or national trunk-prefixed (07...) numbers; a bare
+# digit run would also take dates, amounts and ids
+_PHONE = re.compile(r"^\(?[+0][\d\s\-()]{6,}$")
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[T ][\d:.]+(?:Z|[+-]\d{2}:?\d{2})?)?$")
+_MAX_PARAM_LEN = 64
+
+
+def redact_param(value: Any) -> Any:
+    """Keeps filter values (dates, codes, LIKE patterns) but masks anything
+    that looks like customer data."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    text_value = str(value)
+    # date filters ('YYYY-MM-DD' from parse_dates) are what the summary groups by
+    if _ISO_DATE.match(text_value):
+        return text_value
+    if _EMAIL.search(text_value):
+        return "<redacted:email>"
+    if _PHONE.match(text_value) and sum(c.isdigit() for c in text_value) >= 7:
+        return "<redacted:phone>"
+    if len(text_value) > _MAX_PARAM_LEN:
+        return text_value[:_MAX_PARAM_LEN] + "..."
+    return text_value
+
+
+def _entry_time(entry: Dict[str, Any]) -> datetime:
+    try:
+        return datetime.fromisoformat(entry.get("ts", ""))
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _engine_name(engine) -> str:
+    url = getattr(engine, "url", None)
+    if url is None:
+        return "unknown"
+    return f"{url.host or 'local'}/{url.database or ''}"
+
+
+class SlowQueryLog:
+    """
+    Writes one JSON object per slow statement to a size-rotated file and
+    reads them back for the admin endpoint.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold_ms: int,
+        max_bytes: int,
+        backups: int,
+    ):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._writer: Optional[logging.Logger] = None
+
+    def _get_writer(self) -> logging.Logger:
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            writer = logging.getLogger("mis.slow_query")
+            writer.setLevel(logging.INFO)
+            writer.propagate = False
+            handler = RotatingFileHandler(
+                self.path,
+                maxBytes=self._max_bytes,
+                backupCount=self._backups,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            writer.addHandler(handler)
+            self._writer = writer
+        return self._writer
+
+    def maybe_record(
+        self,
+        engine,
+        sql: str,
+        params: Sequence[Any],
+        elapsed: float,
+        rows: Optional[int],
+        error: Optional[str] = None,
+        ctx: Optional[RequestContext] = None,
+    ) -> None:
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+        fingerprint, normalized = fingerprint_sql(sql)
+        ctx = ctx or get_request_context()
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "fingerprint": fingerprint,
+            "sql": normalized,
+            "params": [redact_param(p) for p in params],
+            "rows": rows,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "engine": _engine_name(engine),
+            "endpoint": ctx.endpoint if ctx else None,
+            "path": ctx.path if ctx else None,
+            "service_method": ctx.service_method if ctx else None,
+            "request_id": ctx.request_id if ctx else None,
+            "user_sub": ctx.user_sub if ctx else None,
+            "error": error,
+        }
+        try:
+            self._get_writer().info(json.dumps(entry, default=str))
+        except Exception as e:  # never fail a report because the log is unwritable
+            logger.warning("Failed to write slow query entry: %s", e)
+
+    def _files_newest_first(self) -> List[str]:
+        files = [self.path] + [f"{self.path}.{i}" for i in range(1, self._backups + 1)]
+        return [f for f in files if os.path.exists(f)]
+
+    def query(
+        self,
+        limit: int = 100,
+        fingerprint: Optional[str] = None,
+        service_method: Optional[str] = None,
+        request_id: Optional[str] = None,
+        min_elapsed_ms: float = 0,
+        since: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        if since is not None:
+            # entries are stamped in UTC; a naive `since` is taken as UTC too
+            since = since.astimezone(timezone.utc) if since.tzinfo else since.replace(tzinfo=timezone.utc)
+        results: List[Dict[str, Any]] = []
+        for file_path in self._files_newest_first():
+            with open(file_path, encoding="utf-8") as fh:
+                lines = fh.readlines()
+            for line in reversed(lines):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if fingerprint and entry.get("fingerprint") != fingerprint:
+                    continue
+                if service_method and entry.get("service_method") != service_method:
+                    continue
+                if request_id and entry.get("request_id") != request_id:
+                    continue
+                if entry.get("elapsed_ms", 0) < min_elapsed_ms:
+                    continue
+                if since is not None and _entry_time(entry) < since:
+                    # files are append-only, so everything older follows
+                    return results
+                results.append(entry)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def summary(self, since: Optional[datetime] = None, top: int = 20) -> List[Dict[str, Any]]:
+        """Groups entries by fingerprint and filter combination, slowest first."""
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for entry in self.query(limit=1_000_000, since=since):
+            key = (entry.get("fingerprint"), json.dumps(entry.get("params"), default=str))
+            group = groups.setdefault(key, {
+                "fingerprint": entry.get("fingerprint"),
+                "service_method": entry.get("service_method"),
+                "params": entry.get("params"),
+                "count": 0,
+                "total_elapsed_ms": 0.0,
+                "max_elapsed_ms": 0.0,
+                "sql": entry.get("sql"),
+            })
+            group["count"] += 1
+            group["total_elapsed_ms"] += entry.get("elapsed_ms", 0)
+            group["max_elapsed_ms"] = max(group["max_elapsed_ms"], entry.get("elapsed_ms", 0))
+        ranked = sorted(groups.values(), key=lambda g: g["total_elapsed_ms"], reverse=True)
+        for group in ranked:
+            group["avg_elapsed_ms"] = round(group["total_elapsed_ms"] / group["count"], 1)
+            group["total_elapsed_ms"] = round(group["total_elapsed_ms"], 1)
+        return ranked[:top]
+
+
+slow_query_log = SlowQueryLog(
+    path=settings.slow_query_log_path,
+    threshold_ms=settings.slow_query_threshold_ms,
+    max_bytes=settings.slow_query_log_max_bytes,
+    backups=settings.slow_query_log_backups,
+)
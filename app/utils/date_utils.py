@@ -1,5 +1,82 @@
-from datetime import datetime, timedelta
+import re
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_dtype, is_numeric_dtype
+from pandas.tseries.api import guess_datetime_format
+
+# SQL Server DATETIME: nothing before 1753-01-01, and (roughly) millisecond precision
+SQL_DATETIME_MIN = np.datetime64("1753-01-01", "ms")
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _parse_datetimes(values: pd.Series, fmt: Optional[str] = None) -> pd.Series:
+    """pd.to_datetime with an explicit format where one can be known up front."""
+    first = values.first_valid_index()
+    if fmt is None and first is not None and not is_numeric_dtype(values):
+        sample = values.loc[first]
+        if isinstance(sample, str):
+            sample = sample.strip()
+            # ISO strings (what pyodbc/CONVERT give us) take pandas' C fast path even
+            # with mixed precision; anything else parses with the format of its first value
+            fmt = "ISO8601" if _ISO_DATE.match(sample) else guess_datetime_format(sample)
+        elif not isinstance(sample, (datetime, date)):
+            fmt = None
+    if fmt is None:
+        return pd.to_datetime(values, errors="coerce")
+    return pd.to_datetime(values, format=fmt, errors="coerce")
+
+
+def to_sql_datetime(values: pd.Series, fmt: Optional[str] = None, floor: bool = True) -> pd.Series:
+    """
+    Normalise a date column for a SQL Server DATETIME insert in one pass:
+    parse (skipped for columns that are already datetime64), truncate to
+    milliseconds and, with `floor`, null out values before 1753-01-01.
+    Unparseable values become NaT.
+    """
+    if not is_datetime64_dtype(values.dtype):
+        values = _parse_datetimes(values, fmt)
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            values = values.dt.tz_localize(None)
+    # the unit cast truncates toward the earlier millisecond, like the old per-cell replace()
+    arr = values.to_numpy(dtype="datetime64[ms]", copy=values.dtype == "datetime64[ms]")
+    if floor:
+        too_early = arr < SQL_DATETIME_MIN  # NaT compares False
+        if too_early.any():
+            arr[too_early] = np.datetime64("NaT", "ms")
+    return pd.Series(arr, index=values.index, name=values.name)
+
+
+def to_python_datetimes(values: pd.Series) -> pd.Series:
+    """datetime64 column -> object column of datetime.datetime / None, as the DB driver wants."""
+    # pandas 3 returns a RangeIndex Series here; take the values, not its index
+    pydatetimes = np.asarray(values.dt.to_pydatetime(), dtype=object)
+    converted = pd.Series(pydatetimes, index=values.index, name=values.name, dtype=object)
+    return converted.where(values.notna(), None)
+
+
+
+def split_date_range(start_date: str, end_date: str, unit: str = "none") -> List[Tuple[str, str]]:
+    """
+    Inclusive ISO (start, end) pairs covering start_date..end_date, cut at
+    calendar weeks (Mondays) or months; "none" returns the range as is.
+    """
+    if unit not in ("none", "week", "month"):
+        raise ValueError(f"Unknown shard unit {unit!r}; expected 'none', 'week' or 'month'")
+    start, end = date.fromisoformat(start_date[:10]), date.fromisoformat(end_date[:10])
+    if unit == "none" or start > end:
+        return [(start_date, end_date)]
+    shards = []
+    while start <= end:
+        if unit == "week":
+            following = start + timedelta(days=7 - start.weekday())
+        else:
+            following = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        shards.append((start.isoformat(), min(following - timedelta(days=1), end).isoformat()))
+        start = following
+    return shards
 
 
 def today():
@@ -5,8 +5,21 @@ import pandas as pd
 import anyio
 import io
 import csv
+import json
+import logging
+import time
+from decimal import Decimal
 from fastapi.responses import StreamingResponse
 
+from app.core.config import settings
+from app.core.metrics import ExportMetrics, observe_query
+from app.core.request_context import get_request_context
+from app.db.read_routing import ReadRoutingEngine
+from app.db.replica import ReplicaEngine
+from app.services.slow_query_log import slow_query_log
+
+logger = logging.getLogger(__name__)
+
 # -------- dates --------
 def parse_dates(start_date: Union[str, date], end_date: Union[str, date]) -> Tuple[str, str, str]:
     """Returns (start_str, end_plus_1_str, end_str) in 'YYYY-MM-DD'."""
@@ -96,9 +109,24 @@ class WhereBuilder:
 
 # -------- pandas runner (offloads to a worker thread) --------
 async def read_df(engine, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
-    return await anyio.to_thread.run_sync(
-        lambda: pd.read_sql_query(sql=sql, con=engine, params=tuple(params))
-    )
+    started = time.perf_counter()
+    try:
+        if isinstance(engine, (ReplicaEngine, ReadRoutingEngine)):
+            df = await anyio.to_thread.run_sync(lambda: engine.read_sql(sql, params))
+        else:
+            df = await anyio.to_thread.run_sync(
+                lambda: pd.read_sql_query(sql=sql, con=engine, params=tuple(params))
+            )
+    except Exception as e:
+        slow_query_log.maybe_record(engine, sql, params, time.perf_counter() - started, None, error=str(e))
+        raise
+    elapsed = time.perf_counter() - started
+    observe_query(sql, elapsed, len(df))
+    slow_query_log.maybe_record(engine, sql, params, elapsed, len(df))
+    ctx = get_request_context()
+    if ctx is not None and ctx.profile is not None:
+        ctx.profile.record_query(sql, elapsed, len(df))
+    return df
 
 def first_cell_int(df: pd.DataFrame, default: int = 0) -> int:
     if df.empty:
@@ -108,15 +136,16 @@ def first_cell_int(df: pd.DataFrame, default: int = 0) -> int:
 
 
 # _________ Filters _____________________
+PET_PATTERNS = {
+    "cat":   "%cat%",
+    "dog":   "%dog%",
+    "horse": "%horse%",
+    "exotic":"%exotic%",
+    "bbc":    "%bb_com%",
+    "bbcom": "%bb_com%",
+}
+
 def whereFilters(country_codes:list, wb:WhereBuilder, brands:list, pets:list) -> WhereBuilder:
-    pet_patterns = {
-        "cat":   "%cat%",
-        "dog":   "%dog%",
-        "horse": "%horse%",
-        "exotic":"%exotic%",
-        "bbc":    "%bb_com%",
-        "bbcom": "%bb_com%",
-    }
 
     # Normalize case for exact-match filters to avoid collation/case issues
     if country_codes:
@@ -133,7 +162,7 @@ def whereFilters(country_codes:list, wb:WhereBuilder, brands:list, pets:list) ->
     if pet_tokens:
         likes, params = [], []
         for p in pet_tokens:
-            patt = pet_patterns.get(p)
+            patt = PET_PATTERNS.get(p)
             if patt:
                 likes.append("LOWER(COALESCE(PetType, '')) LIKE ?")
                 params.append(patt)
@@ -143,23 +172,102 @@ def whereFilters(country_codes:list, wb:WhereBuilder, brands:list, pets:list) ->
 
 # ---------- Generate CSV Stream -----------------
 def generate_csv_stream(engine, sql: str, params: tuple, filename: str) -> StreamingResponse:
+    metrics = ExportMetrics(sql)
+    # the generator runs in the threadpool after the endpoint returned
+    ctx = get_request_context()
+
     def generate():
-        with engine.connect() as conn:
-            result = conn.exec_driver_sql(sql, params, execution_options={"stream_results": True})
-            cols = list(result.keys())
-            buf = io.StringIO()
-            writer = csv.writer(buf, lineterminator="\n")
-
-            writer.writerow(cols)
-            yield buf.getvalue(); buf.seek(0); buf.truncate(0)
-
-            while True:
-                rows = result.fetchmany(5000)
-                if not rows:
-                    break
-                for r in rows:
-                    writer.writerow(list(r))
-                yield buf.getvalue(); buf.seek(0); buf.truncate(0)
+        started = time.perf_counter()
+        total_rows = 0
+        try:
+            with engine.connect() as conn:
+                result = conn.exec_driver_sql(sql, params, execution_options={"stream_results": True})
+                cols = list(result.keys())
+                buf = io.StringIO()
+                writer = csv.writer(buf, lineterminator="\n")
+
+                writer.writerow(cols)
+                chunk = buf.getvalue().encode("utf-8"); buf.seek(0); buf.truncate(0)
+                metrics.streamed_bytes.inc(len(chunk))
+                yield chunk
+
+                while True:
+                    rows = result.fetchmany(5000)
+                    if not rows:
+                        break
+                    total_rows += len(rows)
+                    for r in rows:
+                        writer.writerow(list(r))
+                    chunk = buf.getvalue().encode("utf-8"); buf.seek(0); buf.truncate(0)
+                    metrics.streamed_bytes.inc(len(chunk))
+                    yield chunk
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            slow_query_log.maybe_record(engine, sql, params, elapsed, total_rows, error=str(e), ctx=ctx)
+            logger.exception("CSV export %s failed after %d rows: %s", filename, total_rows, e)
+            raise
+        elapsed = time.perf_counter() - started
+        metrics.observe(elapsed, total_rows)
+        slow_query_log.maybe_record(engine, sql, params, elapsed, total_rows, ctx=ctx)
+        if ctx is not None and ctx.profile is not None:
+            ctx.profile.export_stream_seconds += elapsed
 
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
     return StreamingResponse(generate(), media_type="text/csv", headers=headers)
+
+
+# ---------- Generate NDJSON Stream -----------------
+def _json_default(value):
+    # what jsonable_encoder makes of the driver's types in the JSON responses
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def generate_ndjson_stream(engine, sql: str, params: tuple, head: dict) -> StreamingResponse:
+    """
+    '?stream=true' on the paged *_data endpoints: newline-delimited JSON, the
+    first line being `head` (the JSON response without "data") and then one
+    object per row, fetched from a server-side cursor report_stream_batch_rows
+    at a time. Nothing holds more than one batch, so time to first byte and
+    memory do not grow with `limit`.
+    """
+    metrics = ExportMetrics(sql)
+    # the generator runs in the threadpool after the endpoint returned
+    ctx = get_request_context()
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_json_default).encode
+
+    def generate():
+        started = time.perf_counter()
+        total_rows = 0
+        chunk = (dumps(head) + "\n").encode("utf-8")
+        metrics.streamed_bytes.inc(len(chunk))
+        yield chunk
+
+        try:
+            with engine.connect() as conn:
+                result = conn.exec_driver_sql(sql, params, execution_options={"stream_results": True})
+                cols = list(result.keys())
+                while True:
+                    rows = result.fetchmany(settings.report_stream_batch_rows)
+                    if not rows:
+                        break
+                    total_rows += len(rows)
+                    chunk = "".join(dumps(dict(zip(cols, r))) + "\n" for r in rows).encode("utf-8")
+                    metrics.streamed_bytes.inc(len(chunk))
+                    yield chunk
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            slow_query_log.maybe_record(engine, sql, params, elapsed, total_rows, error=str(e), ctx=ctx)
+            logger.exception("NDJSON stream %s failed after %d rows: %s",
+                             ctx.path if ctx is not None else "", total_rows, e)
+            raise
+        elapsed = time.perf_counter() - started
+        metrics.observe(elapsed, total_rows)
+        slow_query_log.maybe_record(engine, sql, params, elapsed, total_rows, ctx=ctx)
+        if ctx is not None and ctx.profile is not None:
+            ctx.profile.export_stream_seconds += elapsed
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
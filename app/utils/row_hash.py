@@ -0,0 +1,45 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+ROW_HASH_COLUMN = "RowHash"
+# set per run, so they would mark every row as changed
+DEFAULT_EXCLUDE = (ROW_HASH_COLUMN, "ETLDateUploaded")
+
+_MULTIPLIER = np.uint64(0x100000001B3)
+_NULL = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _canonical(values: pd.Series) -> np.ndarray:
+    # one representation per kind of value, so a column that comes back as
+    # int64 in one run and float64 (it had a NULL) in the next hashes the same
+    if is_datetime64_any_dtype(values.dtype):
+        stamps = values.dt.tz_localize(None) if getattr(values.dt, "tz", None) is not None else values
+        return stamps.astype("datetime64[ms]").to_numpy().view("int64")
+    if is_bool_dtype(values.dtype) or is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    return values.astype(object).map(str, na_action="ignore").to_numpy(dtype=object)
+
+
+def row_hashes(df: pd.DataFrame, exclude: Iterable[str] = DEFAULT_EXCLUDE) -> np.ndarray:
+    """
+    Stable 64-bit content hash per row (int64, fits a BIGINT column).
+
+    Columns are hashed by name in sorted order, so the result does not
+    depend on column order, and NULL hashes the same whatever the dtype.
+    The same values hash the same in every process (no Python hash()).
+    Dtype drift that is not normalised here only makes a row look changed,
+    which costs a write, never a missed change.
+    """
+    skip = set(exclude)
+    combined = np.zeros(len(df), dtype=np.uint64)
+    for name in sorted(str(c) for c in df.columns if c not in skip):
+        values = df[name]
+        hashed = pd.util.hash_array(_canonical(values), categorize=False)
+        hashed = np.where(values.isna().to_numpy(), _NULL, hashed)
+        salt = pd.util.hash_array(np.array([name], dtype=object))[0]
+        with np.errstate(over="ignore"):
+            combined = combined * _MULTIPLIER + (hashed ^ salt)
+    return combined.view(np.int64)
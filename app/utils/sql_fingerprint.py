@@ -0,0 +1,31 @@
+import hashlib
+import re
+from functools import lru_cache
+from typing import Tuple
+
+_COMMENT_LINE = re.compile(r"--[^\n]*")
+_COMMENT_BLOCK = re.compile(r"/\*.*?\*/", re.S)
+_STRING = re.compile(r"N?'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint_sql(sql: str) -> Tuple[str, str]:
+    """
+    Returns (fingerprint, normalized_sql) for a statement.
+
+    Literals become '?', IN-lists of any length collapse to '(?+)' and
+    whitespace/comments are dropped, so the same report query with a
+    different filter mix maps to one fingerprint. Cached because the
+    services reuse a small set of SQL strings.
+    """
+    normalized = _COMMENT_BLOCK.sub(" ", sql)
+    normalized = _COMMENT_LINE.sub(" ", normalized)
+    normalized = _STRING.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?+)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip().lower()
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+    return digest, normalized
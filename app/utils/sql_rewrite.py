@@ -0,0 +1,44 @@
+"""
+T-SQL rewrites shared by the non-SQL Server backends (the SQLite stand-in
+and the DuckDB replica).
+"""
+import re
+
+_SELECT = re.compile(r"\bSELECT\b", re.I)
+_FROM = re.compile(r"FROM\b", re.I)
+_ALIAS_ITEM = re.compile(r"^(\s*)(\w+)\s*=(?!=)\s*(.*?)(\s*)$", re.S)
+
+
+def _select_items(sql: str, start: int):
+    """Spans of the top-level select-list items starting at `start`."""
+    spans, depth, item_start, i = [], 0, start, start
+    while i < len(sql):
+        ch = sql[i]
+        if ch == "'":
+            i = sql.index("'", i + 1) + 1
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0 and ch == ",":
+            spans.append((item_start, i))
+            item_start = i + 1
+        elif depth == 0 and _FROM.match(sql, i) and not sql[i - 1].isalnum():
+            break
+        i += 1
+    spans.append((item_start, i))
+    return spans
+
+
+def rewrite_select_aliases(sql: str) -> str:
+    """T-SQL 'SELECT Alias = expr' -> 'SELECT expr AS Alias'."""
+    for match in reversed(list(_SELECT.finditer(sql))):
+        for start, end in reversed(_select_items(sql, match.end())):
+            item = _ALIAS_ITEM.match(sql[start:end])
+            if item:
+                lead, alias, expr, trail = item.groups()
+                sql = f"{sql[:start]}{lead}{expr} AS {alias}{trail}{sql[end:]}"
+    return sql
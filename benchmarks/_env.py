@@ -0,0 +1,31 @@
+"""
+Placeholder settings so app modules import without a real .env. Values
+already present in the environment (or .env) win. Must be imported before
+anything under app.
+"""
+import os
+
+_DEFAULTS = {
+    "ENVIRONMENT": "benchmark",
+    "SECRET_KEY": "benchmark-secret",
+    "SMTP_SERVER": "localhost",
+    "SMTP_PORT": "25",
+    "SMTP_USER": "bench",
+    "SMTP_PASSWORD": "bench",
+    "EMAIL_FROM": "bench@example.com",
+    "SMTP_USE_TLS": "false",
+    "MAILGUN_DOMAIN": "example.com",
+    "MAILGUN_API_KEY": "bench",
+    "MONGO_URL": "mongodb://localhost:27017",
+    # never reached: benchmarks run against the SQLite stand-in
+    "SLOW_QUERY_THRESHOLD_MS": "100000000",
+}
+for _prefix in ("MIS_DB", "AU_UTS", "NZ_UTS", "UK_AT_DE_UTS"):
+    for _field in ("HOST", "USER", "PASSWORD"):
+        _DEFAULTS[f"{_prefix}_{_field}"] = "bench"
+for _name in ("MIS_DB_NAME", "AU_UTS_DB_NAME", "NZ_UTS_DB_NAME", "UK_UTS_DB_NAME",
+              "AT_UTS_DB_NAME", "DE_UTS_DB_NAME"):
+    _DEFAULTS[_name] = "bench"
+
+for _key, _value in _DEFAULTS.items():
+    os.environ.setdefault(_key, _value)
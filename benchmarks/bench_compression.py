@@ -0,0 +1,154 @@
+"""
+Response compression benchmark: picks the COMPRESSION_*_LEVEL defaults.
+
+    python -m benchmarks.bench_compression --db bench_data/mis_standin.db
+    python -m benchmarks.bench_compression --db bench_data/mis_standin.db --out benchmarks/results/compression.json
+
+Bodies are taken from the stand-in the way the API would send them:
+10,000-row JSON pages (rendered like JSONResponse) and a CSV export
+(compressed message by message with a flush, as CompressionMiddleware
+does for streams). Each encoding app.core.compression has available
+(gzip always, br/zstd when installed) is run at every level in
+LEVELS, through the middleware's own compressors.
+
+For each one it reports the ratio, the CPU time and the time to deliver the
+body at each `--link-mbit` (CPU + compressed bytes on the wire), and the
+level that delivers fastest per link.
+"""
+from benchmarks import _env  # noqa: F401  (must precede app imports)
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import date
+from typing import Any, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core import compression
+from app.core.config import settings
+from app.core.profiling import RequestProfile
+from app.core.request_context import RequestContext, reset_request_context, set_request_context
+from app.db.standin import create_standin_engine
+from app.services.quote import Quote
+from app.services.quote_stream import QuoteStream
+from app.services.sales import Sales
+from benchmarks.cases import windows
+
+logger = logging.getLogger("benchmarks")
+
+LEVELS = {
+    "gzip": ("compression_gzip_level", range(1, 10)),
+    # br 10-11 and zstd 19 run at 1-3 MB/s: seconds per page
+    "br": ("compression_brotli_quality", range(0, 10)),
+    "zstd": ("compression_zstd_level", (1, 2, 3, 4, 5, 6, 7, 9, 12, 15)),
+}
+
+
+async def _bodies(engine, as_of: date) -> Dict[str, List[bytes]]:
+    window = windows(as_of)["13m"]
+    page = {"skip": 0, "limit": 10_000}
+    ctx = RequestContext(endpoint="benchmark", profile=RequestProfile())
+    token = set_request_context(ctx)
+    try:
+        bodies = {}
+        for name, func in (
+            ("quote_conversion_data", Quote.QuoteConversionReport),
+            ("quote_data", Quote.QuoteData),
+            ("sales_data", Sales.SalesData),
+        ):
+            result = await func(engine=engine, **window, **page)
+            # JSONResponse's separators; allow_nan as in benchmarks.run
+            bodies[name] = [
+                json.dumps(jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            ]
+        export = await QuoteStream.stream_quote_csv(engine=engine, **window)
+        bodies["quote_csv_export"] = [chunk async for chunk in export.body_iterator]
+    finally:
+        reset_request_context(token)
+    return bodies
+
+
+def _compress(encoding: str, messages: List[bytes]) -> Dict[str, float]:
+    compressor = compression.COMPRESSORS[encoding]()
+    size = 0
+    started = time.thread_time()
+    for i, message in enumerate(messages):
+        if i == len(messages) - 1:
+            size += len(compressor.finish(message))
+        else:
+            size += len(compressor.compress(message, flush=True))
+    return {"bytes": size, "cpu_s": time.thread_time() - started}
+
+
+def run(bodies: Dict[str, List[bytes]], links: List[float], repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"bodies": {}, "best": {}}
+    for body_name, messages in bodies.items():
+        raw = sum(len(m) for m in messages)
+        cases = {}
+        logger.info("%s: %s bytes in %d message(s)", body_name, f"{raw:,}", len(messages))
+        for encoding in compression.COMPRESSORS:
+            setting, levels = LEVELS[encoding]
+            for level in levels:
+                setattr(settings, setting, level)
+                runs = [_compress(encoding, messages) for _ in range(repeat)]
+                cpu = min(r["cpu_s"] for r in runs)
+                size = runs[0]["bytes"]
+                case = {
+                    "encoding": encoding,
+                    "level": level,
+                    "bytes": size,
+                    "ratio": round(raw / size, 2),
+                    "cpu_ms": round(cpu * 1000, 2),
+                    "mb_per_s": round(raw / cpu / 1e6, 1) if cpu > 0 else None,
+                    "deliver_ms": {
+                        str(mbit): round((cpu + size * 8 / (mbit * 1e6)) * 1000, 1) for mbit in links
+                    },
+                }
+                cases[f"{encoding}:{level}"] = case
+                logger.info(
+                    "  %-8s ratio %6.2f | cpu %8.2f ms | %7.1f MB/s | deliver %s",
+                    f"{encoding}:{level}", case["ratio"], case["cpu_ms"], case["mb_per_s"] or 0,
+                    " ".join(f"{v:7.1f}ms@{k}Mbit" for k, v in case["deliver_ms"].items()),
+                )
+        identity = {str(mbit): round(raw * 8 / (mbit * 1e6) * 1000, 1) for mbit in links}
+        results["bodies"][body_name] = {"raw_bytes": raw, "identity_deliver_ms": identity, "cases": cases}
+
+    # per encoding and link: the level with the lowest delivery time summed over every body
+    for encoding in compression.COMPRESSORS:
+        for mbit in links:
+            totals: Dict[str, float] = {}
+            for body in results["bodies"].values():
+                for key, case in body["cases"].items():
+                    if case["encoding"] == encoding:
+                        totals[key] = totals.get(key, 0.0) + case["deliver_ms"][str(mbit)]
+            best = min(totals, key=totals.get)
+            results["best"][f"{encoding}@{mbit}Mbit"] = best
+            logger.info("best %-5s at %6g Mbit: %s (%.1f ms over all bodies)", encoding, mbit, best, totals[best])
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite stand-in (python -m app.db.standin)")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--link-mbit", type=float, nargs="+", default=[10.0, 50.0, 200.0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("app").setLevel(logging.WARNING)
+    bodies = asyncio.run(_bodies(create_standin_engine(args.db), args.as_of))
+    results = run(bodies, args.link_mbit, args.repeat)
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
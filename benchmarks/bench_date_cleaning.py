@@ -0,0 +1,130 @@
+"""
+ETL date-cleaning benchmark: the old clean_date + per-cell millisecond
+truncation vs app.utils.date_utils.to_sql_datetime.
+
+    python -m benchmarks.bench_date_cleaning --rows 5000000
+    python -m benchmarks.bench_date_cleaning --rows 5000000 --out benchmarks/results/dates.json
+
+Three column shapes are timed, matching what the source queries hand to
+ETL.transform: already-datetime64 (pyodbc DATETIME), datetime objects with
+NULLs (object column) and ISO strings (CONVERT'd dates). Each has ~5% NULLs
+and ~1% pre-1753 values. 'legacy' is the old transform step plus the per-cell
+truncation safe_value did at insert time; 'new' is to_sql_datetime plus the
+loader's column-wise to_python_datetimes and what is left of safe_value. Both sides must produce the same
+datetimes or the run fails.
+"""
+from benchmarks import _env  # noqa: F401  (must precede app imports)
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from app.utils.date_utils import to_python_datetimes, to_sql_datetime
+
+logger = logging.getLogger("benchmarks")
+
+
+def legacy_clean(values: pd.Series) -> pd.Series:
+    # ETL.transform.clean_date before to_sql_datetime
+    parsed = pd.to_datetime(values, errors='coerce')
+    parsed = parsed.where(parsed >= pd.Timestamp('1753-01-01'))
+    return parsed.where(parsed.notna(), np.nan)
+
+
+def legacy_truncate(values: pd.Series) -> list:
+    # DBOperationsServices._insert_frame.safe_value, one cell at a time
+    out = []
+    for val in values:
+        if pd.isna(val):
+            out.append(None)
+            continue
+        dt = val.to_pydatetime()
+        out.append(dt.replace(microsecond=int(dt.microsecond / 1000) * 1000))
+    return out
+
+
+def current_cells(values: pd.Series) -> list:
+    # loader now: one column conversion, then safe_value only sees datetime/None
+    return [None if pd.isna(val) else val for val in to_python_datetimes(values)]
+
+
+def make_columns(rows: int, seed: int) -> Dict[str, pd.Series]:
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2019-01-01T00:00:00", "us").astype(np.int64)
+    span = 6 * 365 * 86_400 * 1_000_000
+    stamps = (start + rng.integers(0, span, rows)).astype("datetime64[us]")
+    early = rng.random(rows) < 0.01
+    stamps[early] = np.datetime64("1700-01-01", "us")
+    nulls = rng.random(rows) < 0.05
+    stamps[nulls] = np.datetime64("NaT", "us")
+
+    native = pd.Series(stamps.astype("datetime64[ns]"), name="CreatedDate")
+    objects = pd.Series(native.dt.to_pydatetime(), dtype=object, name="CreatedDate")
+    objects[nulls] = None
+    strings = pd.Series(native.dt.strftime("%Y-%m-%d %H:%M:%S.%f").str.slice(0, 23), dtype=object)
+    strings[nulls] = None
+    return {"datetime64": native, "pydatetime": objects, "iso_string": strings}
+
+
+def timed(fn: Callable[[], Any]):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def same_instants(legacy: list, new: pd.Series) -> bool:
+    expected = pd.Series(pd.to_datetime(pd.Series(legacy, dtype=object))).to_numpy("datetime64[ms]")
+    return bool(np.array_equal(expected, new.to_numpy("datetime64[ms]"), equal_nan=True))
+
+
+def run(rows: int, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"rows": rows, "pandas": pd.__version__, "cases": {}}
+    for shape, column in make_columns(rows, seed).items():
+        cleaned, legacy_clean_ms = timed(lambda: legacy_clean(column))
+        legacy, legacy_cells_ms = timed(lambda: legacy_truncate(cleaned))
+        new, new_clean_ms = timed(lambda: to_sql_datetime(column))
+        current, new_cells_ms = timed(lambda: current_cells(new))
+        if not same_instants(legacy, new) or current != legacy:
+            raise SystemExit(f"{shape}: to_sql_datetime disagrees with the legacy path")
+        legacy_ms = legacy_clean_ms + legacy_cells_ms
+        new_ms = new_clean_ms + new_cells_ms
+        results["cases"][shape] = {
+            "legacy_clean_ms": round(legacy_clean_ms, 1),
+            "legacy_cell_truncate_ms": round(legacy_cells_ms, 1),
+            "legacy_ms": round(legacy_ms, 1),
+            "to_sql_datetime_ms": round(new_clean_ms, 1),
+            "new_cell_convert_ms": round(new_cells_ms, 1),
+            "new_ms": round(new_ms, 1),
+            "speedup": round(legacy_ms / new_ms, 1) if new_ms else None,
+        }
+        logger.info(
+            "%-11s legacy %9.1f ms (clean %8.1f + cells %8.1f) | new %9.1f ms (clean %8.1f + cells %8.1f) | x%.1f",
+            shape, legacy_ms, legacy_clean_ms, legacy_cells_ms, new_ms, new_clean_ms, new_cells_ms,
+            results["cases"][shape]["speedup"] or 0,
+        )
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = run(args.rows, args.seed)
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
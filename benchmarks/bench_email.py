@@ -0,0 +1,129 @@
+"""
+Outbound email benchmark against the local mail stand-in.
+
+    python -m benchmarks.bench_email --messages 200 --delay 0.05
+    python -m benchmarks.bench_email --out benchmarks/results/email.json
+
+For each transport (SMTP, Mailgun API) it sends `--messages` emails:
+
+- per_message: a new transport (connection, TLS/login, client) per email,
+  awaited inline, as the endpoint used to;
+- outbox: enqueued on app.services.email_service.outbox and drained by
+  its worker over one pooled transport, in batches.
+
+`request_ms` is what the caller waits for one message (send, or enqueue),
+`drain_s` the time until every message reached the sink and `connections`
+how many connections the sink saw.
+"""
+from benchmarks import _env  # noqa: F401  (must precede app imports)
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.services.email_service.outbox import EmailOutbox
+from app.services.email_service.srv.standin import MailSink
+
+logger = logging.getLogger("benchmarks")
+
+HTML = "<p>" + "Reset your password. " * 40 + "</p>"
+
+
+def _configure(sink: MailSink, transport: str) -> None:
+    settings.email_transport = transport
+    settings.smtp_server, settings.smtp_port, settings.smtp_use_tls = sink.host, sink.smtp_port, False
+    settings.mailgun_api_url = f"http://{sink.host}:{sink.http_port}"
+
+
+def _new_transport(transport: str):
+    if transport == "smtp":
+        from app.services.email_service.srv.smpt import SMTPTransport
+
+        return SMTPTransport()
+    from app.services.email_service.srv.mailgun import MailgunTransport
+
+    return MailgunTransport()
+
+
+async def _per_message(transport: str, n: int) -> list:
+    waits = []
+    for i in range(n):
+        started = time.perf_counter()
+        sender = _new_transport(transport)
+        if transport == "smtp":
+            await sender.send(settings.email_from, f"user{i}@example.com", "Reset", HTML)
+        else:
+            await sender.send(f"user{i}@example.com", "Reset", HTML)
+        await sender.close()
+        waits.append(time.perf_counter() - started)
+    return waits
+
+
+async def _outbox(sink: MailSink, n: int) -> list:
+    outbox = EmailOutbox(_new_transport(settings.email_transport))
+    waits = []
+    for i in range(n):
+        started = time.perf_counter()
+        outbox.enqueue(f"user{i}@example.com", "Reset", HTML, settings.email_from)
+        waits.append(time.perf_counter() - started)
+        await asyncio.sleep(0)
+    while len(sink.messages) < n:
+        await asyncio.sleep(0.005)
+    await outbox.shutdown()
+    return waits
+
+
+async def run(messages: int, delay: float) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"messages": messages, "delay_s": delay, "cases": {}}
+    for transport in ("smtp", "mailgun"):
+        for mode in ("per_message", "outbox"):
+            sink = await MailSink(delay=delay).start()
+            _configure(sink, transport)
+            started = time.perf_counter()
+            if mode == "per_message":
+                waits = await _per_message(transport, messages)
+            else:
+                waits = await _outbox(sink, messages)
+            drain = time.perf_counter() - started
+            await sink.stop()
+            assert len(sink.messages) == messages, (transport, mode, len(sink.messages))
+            case = {
+                "request_p50_ms": round(statistics.median(waits) * 1000, 3),
+                "request_max_ms": round(max(waits) * 1000, 3),
+                "drain_s": round(drain, 2),
+                "connections": sum(sink.connections.values()),
+            }
+            results["cases"][f"{transport}.{mode}"] = case
+            logger.info(
+                "%-20s request p50 %8.3f ms | max %8.3f ms | drained in %6.2f s | %4d connections",
+                f"{transport}.{mode}", case["request_p50_ms"], case["request_max_ms"],
+                case["drain_s"], case["connections"],
+            )
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds the sink takes per message")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("app").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(run(args.messages, args.delay))
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
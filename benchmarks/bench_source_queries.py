@@ -0,0 +1,113 @@
+"""
+UK/DE/AT source query benchmark: every registered version of each UTS
+extraction query, run against the local UTS stand-in.
+
+    python -m benchmarks.bench_source_queries --quotes 200000
+    python -m benchmarks.bench_source_queries --db bench_data/uts_standin.db --start 2024-03-01 --end 2024-05-31
+    python -m benchmarks.bench_source_queries --out benchmarks/results/source_queries.json
+
+Each version is bound with its registered parameters (SourceQuery.parameters,
+as the ETL binds them) and timed over `--repeat` runs after a warm-up. Every
+version must return the same rows as v1, compared as sorted frames, or the
+run fails. SQLite is not SQL Server: the timings show what the rewrite
+removes (the per-row correlated STRING_AGG) rather than production numbers,
+which come from the ETL extract metrics once a version is promoted.
+"""
+from benchmarks import _env  # noqa: F401  (must precede app imports)
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from datetime import date
+from typing import Any, Dict
+
+import pandas as pd
+
+from app.db.sql_server_queries.registry import PROMOTED, REGISTRY, UK_DE_AT, versions
+from app.db.standin import UTSConfig, build_uts_database, create_standin_engine
+
+logger = logging.getLogger("benchmarks")
+
+BASELINE = "v1"
+
+
+def _sorted(frame: pd.DataFrame) -> pd.DataFrame:
+    keys = frame.astype(str).fillna("")
+    return frame.loc[keys.sort_values(list(keys.columns)).index].reset_index(drop=True)
+
+
+def run(db: str, start_date: str, end_date: str, repeat: int) -> Dict[str, Any]:
+    engine = create_standin_engine(db)
+    results: Dict[str, Any] = {"db": db, "start_date": start_date, "end_date": end_date, "entities": {}}
+    for (entity, group) in sorted(REGISTRY):
+        if group != UK_DE_AT:
+            continue
+        baseline = None
+        cases = {}
+        for query in versions(entity, group):
+            params = query.parameters(start_date, end_date)
+            frame = pd.read_sql_query(query.text, engine, params=params)  # warm-up
+            timings = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                pd.read_sql_query(query.text, engine, params=params)
+                timings.append((time.perf_counter() - t0) * 1000)
+
+            frame = _sorted(frame)
+            if baseline is None and query.version == BASELINE:
+                baseline = frame
+            elif baseline is not None:
+                try:
+                    pd.testing.assert_frame_equal(frame, baseline, check_dtype=False)
+                except AssertionError as exc:
+                    raise SystemExit(f"{query.name} returns different rows than {entity}.{group}.{BASELINE}:\n{exc}")
+
+            cases[query.version] = {
+                "rows": len(frame),
+                "median_ms": round(statistics.median(timings), 1),
+                "min_ms": round(min(timings), 1),
+            }
+            logger.info(
+                "%-28s %7d rows | median %9.1f ms | min %9.1f ms%s",
+                query.name, len(frame), cases[query.version]["median_ms"], cases[query.version]["min_ms"],
+                "  (promoted)" if PROMOTED[(entity, group)] == query.version else "",
+            )
+        base_ms = cases[BASELINE]["median_ms"]
+        for case in cases.values():
+            case["speedup"] = round(base_ms / case["median_ms"], 1) if case["median_ms"] else None
+        results["entities"][entity] = {"promoted": PROMOTED[(entity, group)], "versions": cases}
+    engine.dispose()
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="bench_data/uts_standin.db")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate --db even if it exists")
+    parser.add_argument("--quotes", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start", default="2024-03-01")
+    parser.add_argument("--end", default="2024-05-31")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.rebuild or not os.path.exists(args.db):
+        os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+        logger.info("Building UTS stand-in at %s (%d quotes)", args.db, args.quotes)
+        build_uts_database(args.db, UTSConfig(quotes=args.quotes, start=date(2024, 1, 1), end=date(2024, 12, 31), seed=args.seed))
+
+    results = run(args.db, args.start, args.end, args.repeat)
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Benchmark case matrix: every Quote/Sales/Policy service method and every
+QuoteStream/PolicyStream export, swept over window types, filter mixes and
+page depths.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Sequence
+
+from dateutil.relativedelta import relativedelta
+
+from app.core.enums import ReportTypeEnum
+from app.services.policy import Policy
+from app.services.policy_stream import PolicyStream
+from app.services.quote import Quote
+from app.services.quote_stream import QuoteStream
+from app.services.sales import Sales
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable
+    kwargs: Dict[str, Any]
+    export: bool = False
+    tags: List[str] = field(default_factory=list)
+
+
+def windows(as_of: date) -> Dict[str, Dict[str, Any]]:
+    first_of_month = as_of.replace(day=1)
+    return {
+        "mtd": {"start_date": first_of_month.isoformat(), "end_date": as_of.isoformat()},
+        "ytd": {"start_date": as_of.replace(month=1, day=1).isoformat(), "end_date": as_of.isoformat()},
+        "13m": {
+            "start_date": (first_of_month - relativedelta(months=12)).isoformat(),
+            "end_date": as_of.isoformat(),
+        },
+    }
+
+
+# Filter mixes: no filter, single region, the multi-filter combination the
+# dashboard sends most often.
+FILTERS: Dict[str, Dict[str, str]] = {
+    "all": {},
+    "uk": {"country_codes": "UK"},
+    "uk_au_dog_cat": {"country_codes": "UK,AU", "pet_types": "dog,cat"},
+}
+
+PAGE_DEPTHS = (0, 1_000, 10_000)
+
+SUMMARY_METHODS: Sequence[Callable] = (
+    Quote.QuoteSummary,
+    Quote.QuoteSummaryByPetType,
+    Quote.QuoteConversionSummary,
+    Sales.SalesSummary,
+    Sales.SalesByPetType,
+    Sales.FreePolicySales,
+    Policy.PolicyMonthlyStatusSummary,
+)
+PAGED_METHODS: Sequence[Callable] = (
+    Quote.QuoteData,
+    Quote.QuoteDataByPetType,
+    Quote.QuoteConversionReport,
+    Sales.FreePolicyData,
+    Sales.SalesData,
+    Policy.PolicyStatusRaw,
+)
+SAME_PERIOD_METHODS: Sequence[Callable] = (
+    Quote.QuoteReceiveMethodSamePeriod,
+    Sales.SalesReceiveMethodSamePeriod,
+)
+SAME_PERIOD_PAGED_METHODS: Sequence[Callable] = (
+    Quote.QuoteReceiveMethodSamePeriodReport,
+)
+EXPORT_METHODS: Sequence[Callable] = (
+    QuoteStream.stream_quote_csv,
+    QuoteStream.stream_quote_by_pet_type_csv,
+    QuoteStream.stream_quote_conversion_csv,
+    QuoteStream.stream_quote_receive_method_csv,
+    PolicyStream.stream_policy_status_raw_csv,
+    PolicyStream.stream_sales_raw_csv,
+    PolicyStream.stream_free_policy_raw_csv,
+)
+
+# Policy methods filter on `regions` instead of `country_codes`
+_REGION_ARG_METHODS = {
+    Policy.PolicyMonthlyStatusSummary,
+    Policy.PolicyStatusRaw,
+    PolicyStream.stream_policy_status_raw_csv,
+}
+
+
+def _qualname(func: Callable) -> str:
+    return func.__qualname__
+
+
+def _filter_kwargs(func: Callable, filter_kwargs: Dict[str, str]) -> Dict[str, str]:
+    kwargs = dict(filter_kwargs)
+    if func in _REGION_ARG_METHODS and "country_codes" in kwargs:
+        kwargs["regions"] = kwargs.pop("country_codes")
+    return kwargs
+
+
+def build_cases(engine, as_of: date, quick: bool = False) -> List[Case]:
+    window_map = windows(as_of)
+    window_names = ["mtd", "13m"] if quick else list(window_map)
+    filter_names = ["all"] if quick else list(FILTERS)
+    depths = (0,) if quick else PAGE_DEPTHS
+    same_period = {"start_date": as_of.replace(day=1).isoformat(), "end_date": as_of.isoformat(), "months": 7}
+
+    cases: List[Case] = []
+
+    def add(func, label, kwargs, export=False, tags=()):
+        cases.append(Case(
+            name=f"{_qualname(func)}[{label}]",
+            func=func,
+            kwargs={"engine": engine, **kwargs},
+            export=export,
+            tags=list(tags),
+        ))
+
+    for func in SUMMARY_METHODS:
+        for w in window_names:
+            for f in filter_names:
+                add(func, f"{w},{f}", {**window_map[w], **_filter_kwargs(func, FILTERS[f])}, tags=[w, f])
+
+    for func in PAGED_METHODS:
+        for w in window_names:
+            for f in filter_names:
+                for skip in depths:
+                    add(
+                        func, f"{w},{f},skip={skip}",
+                        {**window_map[w], **_filter_kwargs(func, FILTERS[f]), "skip": skip, "limit": 100},
+                        tags=[w, f, f"skip={skip}"],
+                    )
+
+    # a full 10,000-row page, built as one JSON document and as an NDJSON
+    # stream ('stream=true'; drained like an export, the first line being
+    # the page header)
+    for func in PAGED_METHODS:
+        page = {**window_map["13m"], "skip": 0, "limit": 10_000}
+        add(func, "13m,all,limit=10000", page, tags=["13m", "all", "limit=10000"])
+        add(func, "13m,all,limit=10000,stream", {**page, "stream": True}, export=True,
+            tags=["13m", "all", "limit=10000", "stream"])
+
+    # every report type of the main quote grid, on the default window
+    for report_type in ReportTypeEnum:
+        add(
+            Quote.QuoteData, f"mtd,all,type={report_type.value}",
+            {**window_map["mtd"], "report_type": report_type, "skip": 0, "limit": 100},
+            tags=["mtd", "all", report_type.value],
+        )
+
+    for func in SAME_PERIOD_METHODS:
+        for f in filter_names:
+            add(func, f"7m_same_period,{f}", {**same_period, **_filter_kwargs(func, FILTERS[f])},
+                tags=["7m_same_period", f])
+
+    for func in SAME_PERIOD_PAGED_METHODS:
+        for f in filter_names:
+            for skip in depths:
+                add(
+                    func, f"7m_same_period,{f},skip={skip}",
+                    {**same_period, **_filter_kwargs(func, FILTERS[f]), "skip": skip, "limit": 100},
+                    tags=["7m_same_period", f, f"skip={skip}"],
+                )
+
+    for func in EXPORT_METHODS:
+        for w in window_names:
+            kwargs = {**window_map[w]}
+            if func is QuoteStream.stream_quote_receive_method_csv:
+                kwargs["months"] = 7
+            add(func, f"{w},all", kwargs, export=True, tags=[w, "all", "export"])
+
+    return cases
@@ -0,0 +1,252 @@
+"""
+Report/export benchmark runner.
+
+    python -m app.db.standin --path bench_data/mis_standin.db --quotes 2000000
+    python -m benchmarks.run --db bench_data/mis_standin.db --out benchmarks/results/latest.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json          # compare, exit 1 on regression
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json     # bless current numbers
+    python -m benchmarks.run --migrate --baseline before.json             # app.db.migrations before/after
+
+Each case is run `--repeat` times after a warm-up. Latency covers the
+service call plus what FastAPI would do with the result (JSON encoding, or
+draining the CSV stream). SQL time comes from read_df via the request
+profile, so 'shaping_ms' isolates pandas/Python work from the database.
+"""
+from benchmarks import _env  # noqa: F401  (must precede app imports)
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.profiling import RequestProfile
+from app.core.request_context import RequestContext, reset_request_context, set_request_context
+from app.db import migrations
+from app.db.standin import GeneratorConfig, build_database, create_standin_engine
+from app.services.fact_store import fact_store
+from benchmarks.cases import Case, build_cases
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("benchmarks")
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _run_once(case: Case) -> Dict[str, Any]:
+    ctx = RequestContext(endpoint="benchmark", profile=RequestProfile())
+    token = set_request_context(ctx)
+    try:
+        started = time.perf_counter()
+        result = await case.func(**case.kwargs)
+        if case.export:
+            size = 0
+            lines = 0
+            async for chunk in result.body_iterator:
+                size += len(chunk)
+                lines += chunk.count(b"\n")
+            rows = max(lines - 1, 0)  # header
+        else:
+            body = json.dumps(jsonable_encoder(result)).encode("utf-8")
+            size = len(body)
+            rows = sum(q["rows"] or 0 for q in ctx.profile.queries)
+        elapsed = time.perf_counter() - started
+    finally:
+        reset_request_context(token)
+    sql = ctx.profile.sql_seconds + ctx.profile.export_stream_seconds
+    return {"elapsed": elapsed, "sql": sql, "rows": rows, "bytes": size}
+
+
+async def _measure(case: Case, repeat: int, trace_memory: bool) -> Dict[str, Any]:
+    await _run_once(case)  # warm-up: page cache, lru caches, imports
+    runs = [await _run_once(case) for _ in range(repeat)]
+    latencies = np.array([r["elapsed"] for r in runs]) * 1000
+    sql_ms = np.array([r["sql"] for r in runs]) * 1000
+    rows = runs[-1]["rows"]
+    p50 = float(np.percentile(latencies, 50))
+    result = {
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "mean_ms": round(float(latencies.mean()), 2),
+        "min_ms": round(float(latencies.min()), 2),
+        "sql_p50_ms": round(float(np.percentile(sql_ms, 50)), 2),
+        "shaping_p50_ms": round(float(np.percentile(latencies - sql_ms, 50)), 2),
+        "rows": rows,
+        "bytes": runs[-1]["bytes"],
+        "rows_per_sec": round(rows / (p50 / 1000), 1) if p50 > 0 else None,
+        "peak_rss_mb": None,
+        "tracemalloc_peak_mb": None,
+    }
+    if trace_memory:
+        # separate pass: tracemalloc slows allocation-heavy code several-fold
+        tracemalloc.start()
+        await _run_once(case)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["tracemalloc_peak_mb"] = round(peak / (1024 * 1024), 2)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _table_counts(db_path: str) -> Dict[str, int]:
+    with sqlite3.connect(db_path) as conn:
+        names = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return {name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] for name in names}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_ms: float) -> List[str]:
+    """Returns human-readable regression lines (empty when within tolerance)."""
+    regressions = []
+    for name, stats in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or "error" in base or "error" in stats:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            now, before = stats[metric], base[metric]
+            if now > before * (1 + tolerance) and now - before > min_delta_ms:
+                regressions.append(
+                    f"{name} {metric}: {before:.1f} -> {now:.1f} ms (+{(now / before - 1) * 100:.0f}%)"
+                )
+        if base.get("rows") is not None and stats["rows"] != base["rows"]:
+            regressions.append(f"{name} rows changed: {base['rows']} -> {stats['rows']}")
+    return regressions
+
+
+async def run(args) -> Dict[str, Any]:
+    engine = create_standin_engine(args.db)
+    if args.migrate:
+        started = time.perf_counter()
+        applied = migrations.migrate(engine)
+        if applied:
+            with engine.begin() as conn:
+                conn.exec_driver_sql("ANALYZE")
+        print(f"Migrations {applied or 'none pending'} applied in {time.perf_counter() - started:.1f}s")
+    if args.fact_store:
+        settings.fact_store_enabled = True
+        history_start = args.as_of.replace(day=1) - relativedelta(months=settings.fact_store_history_months)
+        started = time.perf_counter()
+        fact_store.load_all(engine, history_start)
+        print(f"Fact store loaded in {time.perf_counter() - started:.1f}s")
+    cases = build_cases(engine, args.as_of, quick=args.quick)
+    if args.match:
+        pattern = re.compile(args.match)
+        cases = [c for c in cases if pattern.search(c.name)]
+
+    results: Dict[str, Any] = {}
+    for i, case in enumerate(cases, 1):
+        try:
+            results[case.name] = await _measure(case, args.repeat, not args.no_tracemalloc)
+        except Exception as e:
+            logger.error("%s failed: %s", case.name, getattr(e, "detail", e))
+            results[case.name] = {"error": str(getattr(e, "detail", e))}
+            continue
+        r = results[case.name]
+        print(
+            f"[{i:3d}/{len(cases)}] {case.name:75s} p50={r['p50_ms']:9.1f}ms "
+            f"p95={r['p95_ms']:9.1f}ms sql={r['sql_p50_ms']:8.1f}ms rows={r['rows']:>9,}"
+        )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "db": os.path.abspath(args.db),
+            "tables": _table_counts(args.db),
+            "as_of": args.as_of.isoformat(),
+            "repeat": args.repeat,
+            "quick": args.quick,
+            "fact_store": args.fact_store,
+            "schema_version": migrations.status(engine)["version"],
+        },
+        "cases": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark report services against the SQLite stand-in.")
+    parser.add_argument("--db", default="bench_data/mis_standin.db")
+    parser.add_argument("--build-quotes", type=int, default=1_000_000,
+                        help="quotes to generate when --db does not exist")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="2 windows, no filters, first page only")
+    parser.add_argument("--match", help="regex on case names, e.g. 'Quote\\.QuoteData'")
+    parser.add_argument("--no-tracemalloc", action="store_true")
+    parser.add_argument("--fact-store", action="store_true", help="serve summary tiles from the NumPy fact store")
+    parser.add_argument("--migrate", action="store_true", help="apply app.db.migrations to --db first")
+    parser.add_argument("--out", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", help="compare against this results file; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="also write the results to this path")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(name)s - %(message)s")
+    warnings.filterwarnings("once", category=UserWarning)
+
+    if not os.path.exists(args.db):
+        os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+        print(f"Building {args.db} with {args.build_quotes:,} quotes ...")
+        build_database(args.db, GeneratorConfig(quotes=args.build_quotes, end=args.as_of))
+
+    report = asyncio.run(run(args))
+
+    for path in filter(None, (args.out, args.save_baseline)):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = compare(report, baseline, args.tolerance, args.min_delta_ms)
+        errors = [name for name, r in report["cases"].items() if "error" in r]
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        for name in errors:
+            print(f"ERROR {name}")
+        if regressions or errors:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()